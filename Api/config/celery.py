@@ -16,6 +16,27 @@ app.conf.beat_schedule = {
             'expires': 3600,
         }
     },
+    'auto-link-recurring-transactions': {
+        'task': 'finance.auto_link_recurring_transactions',
+        'schedule': crontab(hour=5, minute=30),
+        'options': {
+            'expires': 3600,
+        }
+    },
+    'refresh-scheduled-occurrences': {
+        'task': 'finance.refresh_scheduled_occurrences',
+        'schedule': crontab(hour=3, minute=30),
+        'options': {
+            'expires': 3600,
+        }
+    },
+    'prune-sync-tombstones': {
+        'task': 'finance.prune_sync_tombstones',
+        'schedule': crontab(hour=4, minute=0),
+        'options': {
+            'expires': 3600,
+        }
+    },
 }
 
 
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
@@ -78,6 +79,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "finance.middleware.RequestMemoMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -198,15 +200,27 @@ SIMPLE_JWT = {
     "TOKEN_OBTAIN_SERIALIZER": "finance.authentication.EmailTokenObtainPairSerializer",
 }
 
+# L1 em memória de cada processo na frente do Redis (ver finance.cache_backends)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'django_cache_table',
+        'BACKEND': 'finance.cache_backends.TieredCache',
         'TIMEOUT': 300,
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': env_int('CACHE_L1_MAX_ENTRIES', 1000),
+            'L1_TIMEOUT': env_int('CACHE_L1_TIMEOUT', 5),
+            # Gerações e versões do dashboard são lidas sempre do Redis, para
+            # que qualquer worker enxergue a escrita recém-feita
+            'L2_ONLY_PREFIXES': ('cache_generation_', 'dashboard_version_'),
         }
-    }
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        # Banco separado do broker: clear() no cache não pode apagar a fila do Celery
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://localhost:6379/1'),
+        'TIMEOUT': 300,
+        'KEY_PREFIX': 'genapp',
+    },
 }
 
 CORS_ALLOWED_ORIGINS = env_list(
@@ -220,6 +234,18 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 
 INDICATORS_CACHE_TTL = env_int("INDICATORS_CACHE_TTL", 300)
 
+# Janela de debounce (segundos) para recalcular missões após escritas de transações
+MISSION_RECOMPUTE_DEBOUNCE_SECONDS = env_int("MISSION_RECOMPUTE_DEBOUNCE_SECONDS", 10)
+
+# Por quanto tempo o último dashboard completo pode ser servido enquanto é reconstruído
+DASHBOARD_STALE_TTL = env_int("DASHBOARD_STALE_TTL", 3600)
+
+# Quanto (segundos) uma leitura espera o dashboard que outra requisição está montando
+DASHBOARD_BUILD_WAIT_SECONDS = env_int("DASHBOARD_BUILD_WAIT_SECONDS", 3)
+
+# Janela (segundos) para coalescer escritas antes de remontar o dashboard
+DASHBOARD_PRECOMPUTE_DEBOUNCE_SECONDS = env_int("DASHBOARD_PRECOMPUTE_DEBOUNCE_SECONDS", 2)
+
 
 CSRF_TRUSTED_ORIGINS = env_list("DJANGO_CSRF_TRUSTED_ORIGINS")
 
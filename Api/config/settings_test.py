@@ -13,3 +13,17 @@ MIGRATION_MODULES = {
 
 CELERY_BROKER_URL = 'memory://'
 CELERY_RESULT_BACKEND = 'cache+memory://'
+
+# Mesmo cache em dois níveis da produção, com LocMem no lugar do Redis
+CACHES = {
+    'default': {
+        'BACKEND': 'finance.cache_backends.TieredCache',
+        'OPTIONS': {'L2': 'shared'},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    },
+}
+
+TEST_RUNNER = 'config.test_runner.CacheIsolatedRunner'
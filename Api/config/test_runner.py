@@ -0,0 +1,20 @@
+import unittest
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+
+
+class _CacheIsolationMixin:
+    def startTest(self, test):
+        # O cache em memória sobrevive ao rollback do banco entre testes
+        for cache in caches.all():
+            cache.clear()
+        super().startTest(test)
+
+
+class CacheIsolatedRunner(DiscoverRunner):
+    """DiscoverRunner que esvazia os caches antes de cada teste."""
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or unittest.TextTestResult
+        return type('CacheIsolatedResult', (_CacheIsolationMixin, base), {})
@@ -21,3 +21,20 @@ class DisableMigrations:
         return None
 
 MIGRATION_MODULES = DisableMigrations()
+
+# Mesmo cache em dois níveis da produção, com LocMem no lugar do Redis
+CACHES = {
+    'default': {
+        'BACKEND': 'finance.cache_backends.TieredCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L2_ONLY_PREFIXES': ('cache_generation_', 'dashboard_version_'),
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    },
+}
+
+TEST_RUNNER = 'config.test_runner.CacheIsolatedRunner'
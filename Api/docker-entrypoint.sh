@@ -119,11 +119,6 @@ case "$SERVICE_TYPE" in
             exit 1
         }
         
-        echo "🗄️  Creating cache table..."
-        python manage.py createcachetable 2>/dev/null || {
-            echo "⚠️  Cache table might already exist (non-critical)"
-        }
-        
         echo "📦 Collecting static files..."
         python manage.py collectstatic --noinput --clear || {
             echo "⚠️  Collectstatic had issues, continuing anyway..."
@@ -0,0 +1,238 @@
+"""
+Cache em dois níveis: LRU em memória do processo (L1) na frente de um cache
+compartilhado (L2, Redis em produção e LocMem nos testes).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+_MISSING = object()
+
+TAG_KEY_PREFIX = 'cache_tag_'
+
+
+class TieredCache(BaseCache):
+    """
+    Backend de cache com L1 por processo e L2 compartilhado.
+
+    Leituras tentam primeiro o L1, um LRU limitado a L1_MAX_ENTRIES entradas
+    que vivem no máximo L1_TIMEOUT segundos; faltas vão ao L2 (o alias de
+    CACHES em OPTIONS['L2']) e preenchem o L1. Escritas vão para os dois.
+
+    O L1 de outros processos só enxerga uma escrita quando a entrada local
+    expira, então L1_TIMEOUT é o atraso máximo entre processos. Travas e
+    contadores (`add`, `incr`) sempre decidem no L2. Chaves que começam com
+    um dos L2_ONLY_PREFIXES nunca ficam no L1: servem para contadores de
+    versão, que precisam ser lidos atualizados por qualquer processo. As
+    versões das tags entram sempre nesse grupo.
+
+    Também oferece invalidação por tags: `set_tagged` grava junto as versões
+    atuais das tags, `get_tagged` descarta a entrada se alguma mudou e
+    `invalidate_tags` incrementa as versões, invalidando de uma vez todas
+    as chaves marcadas. As versões expiram depois de TAG_TIMEOUT segundos,
+    que deve ser maior que o timeout de qualquer entrada marcada.
+
+        CACHES = {
+            "default": {
+                "BACKEND": "finance.cache_backends.TieredCache",
+                "OPTIONS": {"L2": "shared", "L1_MAX_ENTRIES": 1000, "L1_TIMEOUT": 5,
+                            "TAG_TIMEOUT": 604800, "L2_ONLY_PREFIXES": ["cache_generation_"]},
+            },
+            "shared": {"BACKEND": "django.core.cache.backends.redis.RedisCache", ...},
+        }
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', location)
+        self._l1_max_entries = int(options.get('L1_MAX_ENTRIES', 1000))
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 5))
+        self._tag_timeout = int(options.get('TAG_TIMEOUT', 7 * 24 * 3600))
+        self._l2_only_prefixes = (TAG_KEY_PREFIX, *options.get('L2_ONLY_PREFIXES', ()))
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+
+    @cached_property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    # ---- L1 ----
+
+    def _local_key(self, key, version):
+        # Prefixo e versão são os do L2, que é quem de fato guarda os dados.
+        # None indica chave que não passa pelo L1.
+        if key.startswith(self._l2_only_prefixes):
+            return None
+        return self.l2.make_and_validate_key(key, version=version)
+
+    def _local_get(self, local_key):
+        if local_key is None:
+            return _MISSING
+        with self._lock:
+            entry = self._l1.get(local_key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._l1[local_key]
+                return _MISSING
+            self._l1.move_to_end(local_key)
+            return value
+
+    def _local_set(self, local_key, value, timeout=DEFAULT_TIMEOUT):
+        if local_key is None:
+            return
+        ttl = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_discard(local_key)
+            return
+        with self._lock:
+            self._l1[local_key] = (time.monotonic() + ttl, value)
+            self._l1.move_to_end(local_key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _local_discard(self, local_key):
+        if local_key is None:
+            return
+        with self._lock:
+            self._l1.pop(local_key, None)
+
+    def clear_local(self):
+        """Esvazia só o L1 deste processo."""
+        with self._lock:
+            self._l1.clear()
+
+    # ---- API do cache ----
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            return value
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._local_set(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        pending = []
+        for key in keys:
+            value = self._local_get(self._local_key(key, version))
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                found[key] = value
+        if pending:
+            fetched = self.l2.get_many(pending, version=version)
+            for key, value in fetched.items():
+                self._local_set(self._local_key(key, version), value)
+            found.update(fetched)
+        return found
+
+    def has_key(self, key, version=None):
+        if self._local_get(self._local_key(key, version)) is not _MISSING:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout=timeout, version=version)
+        self._local_set(self._local_key(key, version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            if key in failed:
+                self._local_discard(self._local_key(key, version))
+            else:
+                self._local_set(self._local_key(key, version), value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self._local_key(key, version)
+        added = self.l2.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(local_key, value, timeout)
+        else:
+            self._local_discard(local_key)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self._local_key(key, version)
+        try:
+            value = self.l2.incr(key, delta, version=version)
+        except ValueError:
+            self._local_discard(local_key)
+            raise
+        self._local_set(local_key, value)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_discard(self._local_key(key, version))
+        return self.l2.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_discard(self._local_key(key, version))
+        return self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._local_discard(self._local_key(key, version))
+        self.l2.delete_many(keys, version=version)
+
+    def clear(self):
+        self.clear_local()
+        self.l2.clear()
+
+    # ---- Tags ----
+
+    def _tag_key(self, tag):
+        return f'{TAG_KEY_PREFIX}{tag}'
+
+    def _tag_versions(self, tags):
+        tag_keys = {tag: self._tag_key(tag) for tag in tags}
+        current = self.get_many(tag_keys.values())
+        versions = {}
+        for tag, tag_key in tag_keys.items():
+            version = current.get(tag_key)
+            if version is None:
+                # Começa em um valor novo: uma tag descartada do L2 não volta
+                # a validar entradas gravadas com uma versão antiga
+                self.add(tag_key, int(time.time() * 1000), timeout=self._tag_timeout)
+                version = self.get(tag_key)
+            versions[tag] = version
+        return versions
+
+    def set_tagged(self, key, value, tags, timeout=DEFAULT_TIMEOUT, version=None):
+        """Grava `value` associado às versões atuais de `tags`."""
+        self.set(key, (self._tag_versions(tags), value), timeout=timeout, version=version)
+
+    def get_tagged(self, key, default=None, version=None):
+        """Lê uma entrada de `set_tagged`; devolve `default` se alguma tag foi invalidada."""
+        entry = self.get(key, _MISSING, version=version)
+        if entry is _MISSING:
+            return default
+        versions, value = entry
+        if self._tag_versions(versions) != versions:
+            return default
+        return value
+
+    def invalidate_tags(self, *tags):
+        """Invalida todas as entradas marcadas com qualquer uma das `tags`."""
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            try:
+                self.incr(tag_key)
+            except ValueError:
+                self.set(tag_key, int(time.time() * 1000), timeout=self._tag_timeout)
@@ -0,0 +1,97 @@
+"""
+Exportação em streaming (CSV e NDJSON) de transações e vinculações.
+"""
+
+import csv
+import json
+from typing import Callable, Dict, Iterable, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Renderer usado só na negociação de `?format=`; as linhas são escritas
+    pelo StreamingHttpResponse. Respostas de erro saem como JSON.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(self.charset)
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+EXPORT_RENDERERS = {
+    CSVRenderer.format: CSVRenderer,
+    NDJSONRenderer.format: NDJSONRenderer,
+}
+
+
+class _Echo:
+    """Pseudo-buffer: csv.writer devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows: Iterable[Dict], fields: Sequence[str]):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(['' if row[field] is None else row[field] for field in fields])
+
+
+def _ndjson_lines(rows: Iterable[Dict], fields: Sequence[str]):
+    for row in rows:
+        yield json.dumps(
+            {field: row[field] for field in fields},
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def stream_export(
+    queryset,
+    fields: Sequence[str],
+    export_format: str,
+    filename: str,
+    transform: Callable[[Dict], Dict] = None,
+) -> StreamingHttpResponse:
+    """
+    Resposta em streaming com as linhas de `queryset` (um QuerySet de values()).
+
+    As linhas são lidas com iterator(chunk_size=EXPORT_CHUNK_SIZE), então a
+    memória usada não depende do total exportado. `transform` recebe cada
+    linha e devolve o dicionário com as colunas de `fields`.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if transform is not None:
+        rows = map(transform, rows)
+
+    renderer = EXPORT_RENDERERS[export_format]
+    lines = _csv_lines(rows, fields) if export_format == CSVRenderer.format else _ndjson_lines(rows, fields)
+
+    response = StreamingHttpResponse(
+        lines,
+        content_type=f'{renderer.media_type}; charset={renderer.charset}',
+    )
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="{filename}-{stamp}.{export_format}"'
+    return response
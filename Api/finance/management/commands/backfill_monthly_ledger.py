@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from finance.models import Transaction, UserMonthlyLedger
+from finance.services import rebuild_monthly_ledger
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o consolidado mensal (UserMonthlyLedger) a partir das transações ativas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a reconstruir (pode ser repetido). Sem ele, reconstrói todos.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostra quantas linhas seriam geradas sem fazer alterações',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        dry_run = options['dry_run']
+
+        scope = f'{len(user_ids)} usuário(s)' if user_ids else 'todos os usuários'
+        self.stdout.write(f'Reconstruindo consolidado mensal para {scope}...\n')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Modo DRY RUN - Nenhuma alteração será feita'))
+
+            transactions = Transaction.objects.all()
+            ledger = UserMonthlyLedger.objects.all()
+            if user_ids:
+                transactions = transactions.filter(user_id__in=user_ids)
+                ledger = ledger.filter(user_id__in=user_ids)
+
+            expected = (
+                transactions.order_by()
+                .annotate(month=TruncMonth('date'))
+                .values('user_id', 'month', 'type', 'category_id')
+                .annotate(count=Count('id'))
+                .count()
+            )
+            self.stdout.write(f'Linhas atuais: {ledger.count()}')
+            self.stdout.write(f'Linhas após reconstrução: {expected}')
+            return
+
+        created = rebuild_monthly_ledger(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'\n✓ {created} linhas gravadas no consolidado mensal'))
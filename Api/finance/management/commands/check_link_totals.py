@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from finance.services import find_link_total_drift, rebuild_link_totals
+
+
+class Command(BaseCommand):
+    help = 'Confere linked_total/received_total das transações contra a soma dos vínculos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a conferir (pode ser repetido). Sem ele, confere todos.',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Corrige as transações divergentes',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        scope = f'{len(user_ids)} usuário(s)' if user_ids else 'todos os usuários'
+        self.stdout.write(f'Conferindo totais de vínculo para {scope}...\n')
+
+        drift = find_link_total_drift(user_ids)
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✓ Nenhuma divergência encontrada'))
+            return
+
+        for row in drift:
+            self.stdout.write(
+                f"  {row['id']} (usuário {row['user_id']}): "
+                f"linked_total {row['linked_total']} → {row['expected_linked']}, "
+                f"received_total {row['received_total']} → {row['expected_received']}"
+            )
+
+        if not options['fix']:
+            self.stdout.write(self.style.WARNING(
+                f'\n{len(drift)} transação(ões) divergente(s). Use --fix para corrigir.'
+            ))
+            return
+
+        fixed = rebuild_link_totals(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'\n✓ {fixed} transação(ões) corrigida(s)'))
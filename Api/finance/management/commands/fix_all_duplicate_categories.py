@@ -13,6 +13,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db.models import Count
 from finance.models import Category, Transaction
+from finance.services import rebuild_monthly_ledger
 
 
 class Command(BaseCommand):
@@ -151,7 +152,9 @@ class Command(BaseCommand):
                 
                 if execute:
                     with transaction.atomic():
+                        user_ids = set(affected_transactions.values_list('user_id', flat=True))
                         affected_transactions.update(category=primary)
+                        rebuild_monthly_ledger(user_ids)
                 
                 result['transactions'] += tx_count
             
@@ -14,6 +14,7 @@ IMPORTANTE: Faça backup do banco antes de executar com --execute
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from finance.models import Category, Transaction
+from finance.services import rebuild_monthly_ledger
 
 
 class Command(BaseCommand):
@@ -124,7 +125,9 @@ class Command(BaseCommand):
                 if execute:
                     with transaction.atomic():
                         # Migrar transações
+                        user_ids = set(affected_transactions.values_list('user_id', flat=True))
                         affected_transactions.update(category=new_category)
+                        rebuild_monthly_ledger(user_ids)
                         self.stdout.write(self.style.SUCCESS(f'   ✅ Transações migradas'))
                 
                 result['transactions'] += tx_count
@@ -14,6 +14,7 @@ from django.contrib.auth import get_user_model
 from django.db import transaction as db_transaction
 from django.db.models import Q
 from finance.models import Category, Transaction
+from finance.services import rebuild_monthly_ledger
 
 User = get_user_model()
 
@@ -118,6 +119,7 @@ class Command(BaseCommand):
                     # Migrar transações
                     if tx_count > 0:
                         Transaction.objects.filter(category=user_cat).update(category=global_cat)
+                        rebuild_monthly_ledger([user.id])
                         self.stdout.write(self.style.SUCCESS(f'      ✅ Transações migradas'))
                     
                     # Remover categoria do usuário
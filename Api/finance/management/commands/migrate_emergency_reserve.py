@@ -10,6 +10,7 @@ This command:
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from finance.models import Category, Transaction
+from finance.services import rebuild_monthly_ledger
 
 
 class Command(BaseCommand):
@@ -88,7 +89,9 @@ class Command(BaseCommand):
                 # Migrate transactions
                 if not dry_run:
                     with transaction.atomic():
+                        user_ids = set(transactions.values_list('user_id', flat=True))
                         updated = transactions.update(category=savings_cat)
+                        rebuild_monthly_ledger(user_ids)
                         stats['transactions_migrated'] += updated
                         self.stdout.write(self.style.SUCCESS(f'   ✅ {updated} transações migradas'))
                 else:
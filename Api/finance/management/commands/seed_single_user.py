@@ -20,7 +20,7 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from finance.models import (
     Transaction, Category, TransactionLink, 
-    Mission, MissionProgress, UserProfile
+    Mission, MissionProgress, UserMonthlyLedger, UserProfile
 )
 from finance.models.admin import XPTransaction
 from finance.services import calculate_summary, invalidate_indicators_cache
@@ -188,6 +188,7 @@ class Command(BaseCommand):
     def _clear_user_data(self, user):
         """Limpa dados existentes do usuário"""
         Transaction.objects.filter(user=user).delete()
+        UserMonthlyLedger.objects.filter(user=user).delete()
         Category.objects.filter(user=user).delete()
         MissionProgress.objects.filter(user=user).delete()
         XPTransaction.objects.filter(user=user).delete()
@@ -5,7 +5,7 @@ import random
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from finance.models import Transaction, Category, TransactionLink
+from finance.models import Transaction, Category, TransactionLink, UserMonthlyLedger
 from finance.services import calculate_summary, invalidate_indicators_cache
 
 User = get_user_model()
@@ -57,6 +57,7 @@ class Command(BaseCommand):
             
             # Limpar dados antigos desse usuário para evitar duplicidade se rodar 2x
             Transaction.objects.filter(user=user).delete()
+            UserMonthlyLedger.objects.filter(user=user).delete()
             Category.objects.filter(user=user).delete()
 
             # 1. Criar Reserva Inicial (Histórico antigo para contar no IL, mas não no TPS mensal)
@@ -0,0 +1,12 @@
+from .services.memo import request_memo
+
+
+class RequestMemoMiddleware:
+    """Abre um escopo de memoização de resumos para cada requisição."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo():
+            return self.get_response(request)
@@ -0,0 +1,14 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_alter_mission_validation_type'),
+        ('finance', '0002_update_mission_transaction_types'),
+    ]
+
+    operations = [
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:59
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def backfill_monthly_ledger(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    UserMonthlyLedger = apps.get_model('finance', 'UserMonthlyLedger')
+
+    rows = (
+        Transaction.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'month', 'type', 'category_id')
+        .annotate(total=models.Sum('amount'), count=models.Count('id'))
+    )
+
+    entries = []
+    for row in rows.iterator(chunk_size=1000):
+        month = row['month']
+        if hasattr(month, 'date'):
+            month = month.date()
+        entries.append(
+            UserMonthlyLedger(
+                user_id=row['user_id'],
+                month=month,
+                type=row['type'],
+                category_id=row['category_id'],
+                total_amount=row['total'] or Decimal('0.00'),
+                transaction_count=row['count'],
+            )
+        )
+
+    UserMonthlyLedger.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0003_merge_20261017_0259'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMonthlyLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Primeiro dia do mês consolidado')),
+                ('type', models.CharField(max_length=14)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_ledger', to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Consolidado Mensal',
+                'verbose_name_plural': 'Consolidados Mensais',
+                'indexes': [models.Index(fields=['user', 'month'], name='finance_use_user_id_6040c4_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usermonthlyledger',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'type', 'category'), name='ledger_user_month_type_category_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='usermonthlyledger',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'month', 'type'), name='ledger_user_month_type_nocat_uniq'),
+        ),
+        migrations.RunPython(backfill_monthly_ledger, migrations.RunPython.noop),
+    ]
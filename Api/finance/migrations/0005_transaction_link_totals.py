@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:12
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_link_totals(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    TransactionLink = apps.get_model('finance', 'TransactionLink')
+
+    def link_sum(uuid_field):
+        links = (
+            TransactionLink.objects.filter(**{uuid_field: models.OuterRef('id')})
+            .order_by()
+            .values(uuid_field)
+            .annotate(total=models.Sum('linked_amount'))
+            .values('total')
+        )
+        return Coalesce(
+            models.Subquery(links, output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+            models.Value(Decimal('0.00')),
+        )
+
+    Transaction.objects.update(
+        linked_total=link_sum('source_transaction_uuid'),
+        received_total=link_sum('target_transaction_uuid'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_usermonthlyledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='linked_total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Soma dos vínculos em que esta transação é a origem (mantida por TransactionLink)', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='received_total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Soma dos vínculos em que esta transação é o destino (mantida por TransactionLink)', max_digits=12),
+        ),
+        migrations.RunPython(backfill_link_totals, migrations.RunPython.noop),
+    ]
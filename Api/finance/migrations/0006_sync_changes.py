@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0005_transaction_link_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('TRANSACTION', 'Transação'), ('TRANSACTION_LINK', 'Vínculo'), ('CATEGORY', 'Categoria'), ('MISSION_PROGRESS', 'Progresso de missão')], max_length=20)),
+                ('object_id', models.CharField(max_length=36)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Exclusão Sincronizada',
+                'verbose_name_plural': 'Exclusões Sincronizadas',
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_tra_user_id_8b313c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionlink',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_tra_user_id_cc52a2_idx'),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sync_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['user', 'deleted_at'], name='finance_syn_user_id_156224_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['deleted_at'], name='finance_syn_deleted_8f1c07_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0007_transaction_description_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('type', models.CharField(max_length=14)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('description', models.CharField(max_length=255)),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scheduled_occurrences', to='finance.category')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduled_occurrences', to='finance.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduled_occurrences', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Ocorrência Agendada',
+                'verbose_name_plural': 'Ocorrências Agendadas',
+                'ordering': ('date',),
+                'indexes': [models.Index(fields=['user', 'date'], name='finance_sch_user_id_a2cff7_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledoccurrence',
+            constraint=models.UniqueConstraint(fields=('transaction', 'date'), name='scheduled_occurrence_tx_date_uniq'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 
 from .base import BaseMissionValidator
+from .context import MetricsContext
 from .factory import MissionValidatorFactory, update_single_mission_progress
 from .onboarding import OnboardingMissionValidator
 from .indicators import (
@@ -23,6 +24,7 @@ from .percentage_change import PercentageChangeValidator
 
 __all__ = [
     'BaseMissionValidator',
+    'MetricsContext',
     'MissionValidatorFactory',
     'update_single_mission_progress',
     'OnboardingMissionValidator',
@@ -1,8 +1,6 @@
 
 from decimal import Decimal
-from typing import Any, Dict, Tuple
-
-from django.db.models import Sum
+from typing import Any, Dict, Optional, Tuple
 
 from .base import BaseMissionValidator
 
@@ -68,8 +66,8 @@ class AdvancedMissionValidator(BaseMissionValidator):
             'message': f"Você atendeu {completed_criteria} de {total_criteria} critérios"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         
         if result['is_completed']:
             return True, "Parabéns! Você completou todos os critérios desta missão avançada!"
@@ -96,14 +94,12 @@ class MultiCriteriaValidator(BaseMissionValidator):
         criteria_count = 0
         
         if self.mission.target_categories.exists():
-            from ..models import Transaction
             for category in self.mission.target_categories.all():
-                spending = Transaction.objects.filter(
-                    user=self.user,
-                    category=category,
+                spending = self.sum_transactions(
+                    category_id=category.id,
                     type='EXPENSE',
                     date__gte=self.mission_progress.started_at.date()
-                ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+                )
                 
                 limit = self.mission.category_spending_limit or Decimal('500')
                 met = spending <= limit
@@ -120,8 +116,7 @@ class MultiCriteriaValidator(BaseMissionValidator):
         
         # target_goals removido - Goal model deletado em migration 0058
         
-        from ..services import calculate_summary
-        metrics = calculate_summary(self.user)
+        metrics = self.get_current_metrics()
         
         if self.mission.target_tps is not None:
             current_tps = float(metrics.get('tps', 0))
@@ -168,8 +163,8 @@ class MultiCriteriaValidator(BaseMissionValidator):
             'message': f"{sum(1 for c in criteria_results if c['met'])}/{criteria_count} critérios atendidos"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         if result['is_completed']:
             return True, "Parabéns! Você completou todos os critérios desta missão complexa!"
         pending = [c['name'] for c in result['metrics']['criteria'] if not c['met']]
@@ -1,23 +1,61 @@
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
 
 
 class BaseMissionValidator(ABC):
-    
-    def __init__(self, mission, user, mission_progress):
+
+    def __init__(self, mission, user, mission_progress, context=None):
         self.mission = mission
         self.user = user
         self.mission_progress = mission_progress
-        
+        self.context = context
+        self._progress_result = None
+
     @abstractmethod
     def calculate_progress(self) -> Dict[str, Any]:
         pass
-    
+
     @abstractmethod
-    def validate_completion(self) -> Tuple[bool, str]:
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        """
+        Confirma a conclusão a partir de um resultado de calculate_progress().
+
+        Quem já calculou o progresso deve repassá-lo em `result`; sem ele o
+        validador usa evaluate(), que calcula uma única vez por instância.
+        """
         pass
-    
+
+    def evaluate(self) -> Dict[str, Any]:
+        """calculate_progress() memoizado nesta instância do validador."""
+        if self._progress_result is None:
+            self._progress_result = self.calculate_progress()
+        return self._progress_result
+
+    def _resolve_result(self, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return result if result is not None else self.evaluate()
+
     def get_current_metrics(self) -> Dict[str, Any]:
+        if self.context is not None:
+            return self.context.summary
         from ..services import calculate_summary
         return calculate_summary(self.user)
+
+    def count_transactions(self, **criteria) -> int:
+        """Conta transações do usuário; usa o MetricsContext quando disponível."""
+        if self.context is not None and self.context.covers(**criteria):
+            return self.context.count(**criteria)
+        from ..models import Transaction
+        return Transaction.objects.filter(user=self.user, **criteria).count()
+
+    def sum_transactions(self, **criteria) -> Decimal:
+        """Soma `amount` das transações do usuário; usa o MetricsContext quando disponível."""
+        if self.context is not None and self.context.covers(**criteria):
+            return self.context.total(**criteria)
+        from django.db.models import Sum
+        from ..models import Transaction
+        total = Transaction.objects.filter(user=self.user, **criteria).aggregate(
+            total=Sum('amount')
+        )['total']
+        return total or Decimal('0')
@@ -1,9 +1,8 @@
 
 from datetime import timedelta
 from decimal import Decimal
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-from django.db.models import Sum
 from django.utils import timezone
 
 from .base import BaseMissionValidator
@@ -12,8 +11,6 @@ from .base import BaseMissionValidator
 class CategoryReductionValidator(BaseMissionValidator):
     
     def calculate_progress(self) -> Dict[str, Any]:
-        from ..models import Transaction
-        
         if not self.mission.target_category:
             return {
                 'progress_percentage': 0,
@@ -38,27 +35,21 @@ class CategoryReductionValidator(BaseMissionValidator):
         current_start = start_date
         current_end = timezone.now()
         
-        reference_query = Transaction.objects.filter(
-            user=self.user,
+        reference_spending = self.sum_transactions(
             type='EXPENSE',
+            category_id=self.mission.target_category_id,
             date__gte=reference_start.date(),
             date__lt=reference_end.date(),
             date__lte=timezone.now().date()  # Exclude future/scheduled transactions
         )
-        if self.mission.target_category:
-            reference_query = reference_query.filter(category=self.mission.target_category)
-        reference_spending = reference_query.aggregate(total=Sum('amount'))['total'] or Decimal('0')
         
-        current_query = Transaction.objects.filter(
-            user=self.user,
+        current_spending = self.sum_transactions(
             type='EXPENSE',
+            category_id=self.mission.target_category_id,
             date__gte=current_start.date(),
             date__lt=current_end.date(),
             date__lte=timezone.now().date()  # Exclude future/scheduled transactions
         )
-        if self.mission.target_category:
-            current_query = current_query.filter(category=self.mission.target_category)
-        current_spending = current_query.aggregate(total=Sum('amount'))['total'] or Decimal('0')
         
         if reference_spending > 0:
             reduction_percent = ((reference_spending - current_spending) / reference_spending) * 100
@@ -81,8 +72,8 @@ class CategoryReductionValidator(BaseMissionValidator):
             'message': f"Redução de {reduction_percent:.1f}% em {self.mission.target_category.name}"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         if result['is_completed']:
             return True, f"Parabéns! Você reduziu os gastos em {result['metrics']['category_name']}!"
         return False, f"Continue reduzindo gastos em {result['metrics']['category_name']}"
@@ -91,8 +82,6 @@ class CategoryReductionValidator(BaseMissionValidator):
 class CategoryLimitValidator(BaseMissionValidator):
     
     def calculate_progress(self) -> Dict[str, Any]:
-        from ..models import Transaction
-        
         if not self.mission.target_category or not self.mission.category_spending_limit:
             return {
                 'progress_percentage': 0,
@@ -109,15 +98,12 @@ class CategoryLimitValidator(BaseMissionValidator):
                 'message': 'Missão ainda não foi iniciada'
             }
         
-        spending_query = Transaction.objects.filter(
-            user=self.user,
+        current_spending = self.sum_transactions(
             type='EXPENSE',
+            category_id=self.mission.target_category_id,
             date__gte=self.mission_progress.started_at.date(),
             date__lte=timezone.now().date()  # Exclude future/scheduled transactions
         )
-        if self.mission.target_category:
-            spending_query = spending_query.filter(category=self.mission.target_category)
-        current_spending = spending_query.aggregate(total=Sum('amount'))['total'] or Decimal('0')
         
         limit = self.mission.category_spending_limit
         remaining = max(Decimal('0'), limit - current_spending)
@@ -161,8 +147,8 @@ class CategoryLimitValidator(BaseMissionValidator):
             'message': status_message
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         if result['metrics']['exceeded']:
             return False, f"Você excedeu o limite de {self.mission.target_category.name}"
         if result['is_completed']:
@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.exceptions import FieldError
+from django.db.models import Q
+
+
+_LOOKUPS = {
+    'exact': lambda value, arg: value == arg,
+    'in': lambda value, arg: value in arg,
+    'gt': lambda value, arg: value is not None and value > arg,
+    'gte': lambda value, arg: value is not None and value >= arg,
+    'lt': lambda value, arg: value is not None and value < arg,
+    'lte': lambda value, arg: value is not None and value <= arg,
+}
+
+_ROW_FIELDS = (
+    'id',
+    'type',
+    'amount',
+    'date',
+    'created_at',
+    'category_id',
+    'category__group',
+)
+
+
+def _split_lookup(key: str):
+    field, _, lookup = key.rpartition('__')
+    if field and lookup in _LOOKUPS:
+        return field, lookup
+    return key, 'exact'
+
+
+class MetricsContext:
+    """
+    Dados do usuário pré-carregados para avaliar várias missões de uma vez.
+
+    Carrega, em uma única consulta, as transações ativas com data a partir de
+    `date_since` ou criadas a partir de `created_since`. Os validadores
+    consultam esses dados em memória com os mesmos lookups do ORM
+    (`type__in`, `date__gte`, `created_at__gte`, ...) e recorrem ao banco
+    quando o filtro pede algo fora da janela carregada.
+    """
+
+    def __init__(self, user, date_since: Optional[date] = None, created_since: Optional[datetime] = None):
+        from ..models import Transaction
+
+        self.user = user
+        self.date_since = date_since
+        self.created_since = created_since
+        self._summary = None
+
+        window = Q()
+        if date_since is not None:
+            window |= Q(date__gte=date_since)
+        if created_since is not None:
+            window |= Q(created_at__gte=created_since)
+
+        if window:
+            self.rows: List[Dict[str, Any]] = list(
+                Transaction.objects.filter(window, user=user).values(*_ROW_FIELDS)
+            )
+        else:
+            self.rows = []
+
+    @classmethod
+    def for_progresses(cls, user, progresses: Iterable) -> 'MetricsContext':
+        """Monta a janela mínima que atende todas as missões informadas."""
+        date_bounds = []
+        created_bounds = []
+
+        for progress in progresses:
+            if not progress.started_at:
+                continue
+            mission = progress.mission
+            start_date = progress.started_at.date()
+            created_bounds.append(progress.started_at)
+            date_bounds.append(start_date)
+
+            # Período de referência das missões de redução por categoria
+            if mission.mission_type == 'CATEGORY_REDUCTION' and mission.duration_days:
+                date_bounds.append(start_date - timedelta(days=mission.duration_days))
+
+            target_month = (progress.validation_details or {}).get('target_month')
+            if target_month:
+                try:
+                    year, month = map(int, target_month.split('-'))
+                    date_bounds.append(date(year, month, 1))
+                except (TypeError, ValueError):
+                    pass
+
+        return cls(
+            user,
+            date_since=min(date_bounds) if date_bounds else None,
+            created_since=min(created_bounds) if created_bounds else None,
+        )
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        if self._summary is None:
+            from ..services import calculate_summary
+            self._summary = calculate_summary(self.user)
+        return self._summary
+
+    def covers(self, **criteria) -> bool:
+        """
+        Indica se os dados carregados respondem ao filtro sem ir ao banco.
+
+        Filtros sobre campos que não foram carregados (ver _ROW_FIELDS) vão
+        sempre ao banco, que os resolve ou rejeita do mesmo jeito de antes.
+        """
+        if any(_split_lookup(key)[0] not in _ROW_FIELDS for key in criteria):
+            return False
+
+        date_from = criteria.get('date__gte')
+        if date_from is not None and self.date_since is not None:
+            if isinstance(date_from, datetime):
+                date_from = date_from.date()
+            if date_from >= self.date_since:
+                return True
+
+        created_from = criteria.get('created_at__gte')
+        if created_from is not None and self.created_since is not None:
+            return created_from >= self.created_since
+
+        return False
+
+    def select(self, **criteria) -> List[Dict[str, Any]]:
+        checks = []
+        for key, arg in criteria.items():
+            field, lookup = _split_lookup(key)
+            if field not in _ROW_FIELDS:
+                raise FieldError(f"Campo '{field}' não carregado no MetricsContext")
+            if field == 'date' and isinstance(arg, datetime):
+                arg = arg.date()
+            checks.append((field, _LOOKUPS[lookup], arg))
+        return [
+            row for row in self.rows
+            if all(check(row[field], arg) for field, check, arg in checks)
+        ]
+
+    def count(self, **criteria) -> int:
+        return len(self.select(**criteria))
+
+    def total(self, **criteria) -> Decimal:
+        return sum((row['amount'] for row in self.select(**criteria)), Decimal('0'))
+
+    def has_activity_since(self, started_at) -> bool:
+        if not started_at:
+            return False
+        return self.count(created_at__gte=started_at) > 0
@@ -49,8 +49,12 @@ class MissionValidatorFactory:
     """
     
     @classmethod
-    def create_validator(cls, mission, user, mission_progress) -> BaseMissionValidator:
-        """Cria e retorna o validador correto para a missão."""
+    def create_validator(cls, mission, user, mission_progress, context=None) -> BaseMissionValidator:
+        """Cria e retorna o validador correto para a missão.
+        
+        `context` é um MetricsContext opcional compartilhado entre validadores
+        do mesmo usuário para evitar consultas repetidas.
+        """
         
         # 1. Primeiro, tenta pelo mission_type (preferido)
         validator_class = VALIDATOR_MAP.get(mission.mission_type)
@@ -62,26 +66,26 @@ class MissionValidatorFactory:
                 f"Mission {mission.title}: CATEGORY_REDUCTION sem target_category, "
                 "usando PercentageChangeValidator"
             )
-            return PercentageChangeValidator(mission, user, mission_progress)
+            return PercentageChangeValidator(mission, user, mission_progress, context)
         
         if validator_class:
-            return validator_class(mission, user, mission_progress)
+            return validator_class(mission, user, mission_progress, context)
         
         # 2. Se não encontrou, tenta pelo validation_type (fallback)
         if mission.validation_type:
             validator_class = VALIDATION_TYPE_MAP.get(mission.validation_type)
             if validator_class:
-                return validator_class(mission, user, mission_progress)
+                return validator_class(mission, user, mission_progress, context)
         
         # 3. Fallback final: MultiCriteriaValidator
         logger.warning(
             f"Tipo de missão desconhecido: {mission.mission_type} "
             f"(validation_type: {mission.validation_type}), usando MultiCriteriaValidator"
         )
-        return MultiCriteriaValidator(mission, user, mission_progress)
+        return MultiCriteriaValidator(mission, user, mission_progress, context)
 
 
-def update_single_mission_progress(mission_progress) -> Dict[str, Any]:
+def update_single_mission_progress(mission_progress, context=None) -> Dict[str, Any]:
     from decimal import Decimal
     from ..models import MissionProgress as MissionProgressModel, Transaction
     
@@ -89,6 +93,8 @@ def update_single_mission_progress(mission_progress) -> Dict[str, Any]:
         """Verifica se o usuário teve atividade desde o início da missão."""
         if not started_at:
             return False
+        if context is not None and context.covers(created_at__gte=started_at):
+            return context.has_activity_since(started_at)
         return Transaction.objects.filter(
             user=user,
             created_at__gte=started_at
@@ -97,10 +103,11 @@ def update_single_mission_progress(mission_progress) -> Dict[str, Any]:
     validator = MissionValidatorFactory.create_validator(
         mission_progress.mission,
         mission_progress.user,
-        mission_progress
+        mission_progress,
+        context
     )
     
-    result = validator.calculate_progress()
+    result = validator.evaluate()
     
     mission_progress.progress = Decimal(str(result['progress_percentage']))
     
@@ -113,7 +120,7 @@ def update_single_mission_progress(mission_progress) -> Dict[str, Any]:
     )
     
     if can_complete:
-        is_valid, message = validator.validate_completion()
+        is_valid, message = validator.validate_completion(result)
         if is_valid:
             mission_progress.completed_at = timezone.now()
             mission_progress.status = MissionProgressModel.Status.COMPLETED
@@ -1,5 +1,5 @@
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from django.utils import timezone
 
@@ -34,12 +34,12 @@ class TPSImprovementMissionValidator(BaseMissionValidator):
             'message': f"Seu TPS está em {current_tps:.1f}% (meta: {target_tps:.1f}%)"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        metrics = self.get_current_metrics()
-        current_tps = float(metrics.get('tps', 0))
-        target_tps = float(self.mission.target_tps or 20)
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
+        current_tps = result['metrics']['current_tps']
+        target_tps = result['metrics']['target_tps']
         
-        if current_tps >= target_tps:
+        if result['is_completed']:
             return True, f"Excelente! Seu TPS de {current_tps:.1f}% atingiu a meta de {target_tps:.1f}%!"
         
         return False, f"Continue melhorando seu TPS (atual: {current_tps:.1f}%, meta: {target_tps:.1f}%)"
@@ -73,12 +73,12 @@ class RDRReductionMissionValidator(BaseMissionValidator):
             'message': f"Seu RDR está em {current_rdr:.1f}% (meta: {target_rdr:.1f}%)"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        metrics = self.get_current_metrics()
-        current_rdr = float(metrics.get('rdr', 100))
-        target_rdr = float(self.mission.target_rdr or 30)
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
+        current_rdr = result['metrics']['current_rdr']
+        target_rdr = result['metrics']['target_rdr']
         
-        if current_rdr <= target_rdr:
+        if result['is_completed']:
             return True, f"Parabéns! Seu RDR de {current_rdr:.1f}% está abaixo da meta de {target_rdr:.1f}%!"
         
         return False, f"Continue reduzindo seu RDR (atual: {current_rdr:.1f}%, meta: {target_rdr:.1f}%)"
@@ -112,12 +112,12 @@ class ILIBuildingMissionValidator(BaseMissionValidator):
             'message': f"Sua reserva cobre {current_ili:.1f} meses (meta: {target_ili:.1f})"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        metrics = self.get_current_metrics()
-        current_ili = float(metrics.get('ili', 0))
-        target_ili = float(self.mission.min_ili or 6)
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
+        current_ili = result['metrics']['current_ili']
+        target_ili = result['metrics']['target_ili']
         
-        if current_ili >= target_ili:
+        if result['is_completed']:
             return True, f"Fantástico! Sua reserva de {current_ili:.1f} meses atingiu a meta!"
         
         return False, f"Continue construindo sua reserva (atual: {current_ili:.1f}, meta: {target_ili:.1f})"
@@ -1,15 +1,36 @@
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from django.utils import timezone
 
 from .base import BaseMissionValidator
 
 
 class OnboardingMissionValidator(BaseMissionValidator):
     
-    def calculate_progress(self) -> Dict[str, Any]:
-        from django.db.models import Q
-        from ..models import Transaction
+    def _count_criteria(self) -> Dict[str, Any]:
+        """Filtro dinâmico baseado em transaction_type_filter."""
+        criteria = {
+            'created_at__gte': self.mission_progress.started_at,
+            'date__lte': timezone.now().date(),  # Exclude future/scheduled transactions
+        }
+        
+        type_filter = self.mission.transaction_type_filter
+        if type_filter == 'ALL':
+            criteria['type__in'] = ['INCOME', 'EXPENSE']
+        elif type_filter == 'DEPOSIT':
+            # Aportes: transações de categorias de poupança/investimento
+            criteria['category__group__in'] = ['SAVINGS', 'INVESTMENT']
+        elif type_filter == 'PAYMENT':
+            # Pagamentos: transações marcadas como pagas
+            criteria['is_paid'] = True
+        else:
+            # INCOME ou EXPENSE específico
+            criteria['type'] = type_filter
         
+        return criteria
+    
+    def calculate_progress(self) -> Dict[str, Any]:
         if not self.mission_progress.started_at:
             return {
                 'progress_percentage': 0,
@@ -22,23 +43,8 @@ class OnboardingMissionValidator(BaseMissionValidator):
                 'message': 'Missão ainda não foi iniciada'
             }
         
-        # Constrói filtro dinâmico baseado em transaction_type_filter
-        filter_query = Q(user=self.user, created_at__gte=self.mission_progress.started_at)
-        
         type_filter = self.mission.transaction_type_filter
-        if type_filter == 'ALL':
-            filter_query &= Q(type__in=['INCOME', 'EXPENSE'])
-        elif type_filter == 'DEPOSIT':
-            # Aportes: transações de categorias de poupança/investimento
-            filter_query &= Q(category__group__in=['SAVINGS', 'INVESTMENT'])
-        elif type_filter == 'PAYMENT':
-            # Pagamentos: transações marcadas como pagas
-            filter_query &= Q(is_paid=True)
-        else:
-            # INCOME ou EXPENSE específico
-            filter_query &= Q(type=type_filter)
-        
-        transactions_count = Transaction.objects.filter(filter_query).count()
+        transactions_count = self.count_transactions(**self._count_criteria())
         
         target = self.mission.min_transactions or 10
         progress = min(100, (transactions_count / target) * 100)
@@ -66,28 +72,14 @@ class OnboardingMissionValidator(BaseMissionValidator):
         }
 
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        from django.db.models import Q
-        from ..models import Transaction
-        
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
         if not self.mission_progress.started_at:
             return False, 'Missão ainda não foi iniciada'
         
-        # Usa mesma lógica de filtro dinâmico
-        filter_query = Q(user=self.user, created_at__gte=self.mission_progress.started_at)
-        
+        result = self._resolve_result(result)
         type_filter = self.mission.transaction_type_filter
-        if type_filter == 'ALL':
-            filter_query &= Q(type__in=['INCOME', 'EXPENSE'])
-        elif type_filter == 'DEPOSIT':
-            filter_query &= Q(category__group__in=['SAVINGS', 'INVESTMENT'])
-        elif type_filter == 'PAYMENT':
-            filter_query &= Q(is_paid=True)
-        else:
-            filter_query &= Q(type=type_filter)
-        
-        transactions_count = Transaction.objects.filter(filter_query).count()
-        target = self.mission.min_transactions or 10
+        transactions_count = result['metrics']['transactions_registered']
+        target = result['metrics']['target_transactions']
         
         type_labels = {
             'ALL': 'transações',
@@ -5,9 +5,8 @@ Validadores para missões de variação percentual (aumento/redução).
 from datetime import date, timedelta
 from calendar import monthrange
 from decimal import Decimal
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-from django.db.models import Sum, Q
 from django.utils import timezone
 
 from .base import BaseMissionValidator
@@ -29,28 +28,27 @@ class PercentageChangeValidator(BaseMissionValidator):
     - target_month: mês alvo para atingir a meta
     """
     
-    def _get_transaction_filter(self) -> Q:
+    def _get_transaction_criteria(self) -> Dict[str, Any]:
         """Retorna filtro de transações baseado em transaction_type_filter e categorias."""
         # Prioriza tipo de validation_details, depois mission
         details = self.mission_progress.validation_details or {}
         type_filter = details.get('transaction_type_filter') or self.mission.transaction_type_filter or 'EXPENSE'
         
-        base_filter = Q()
         if type_filter == 'INCOME':
-            base_filter = Q(type='INCOME')
+            criteria = {'type': 'INCOME'}
         elif type_filter == 'EXPENSE':
-            base_filter = Q(type='EXPENSE')
+            criteria = {'type': 'EXPENSE'}
         elif type_filter == 'DEPOSIT':
-            base_filter = Q(category__group__in=['SAVINGS', 'INVESTMENT'])
+            criteria = {'category__group__in': ['SAVINGS', 'INVESTMENT']}
         else:
-            base_filter = Q(type='EXPENSE')
+            criteria = {'type': 'EXPENSE'}
         
         # Aplica filtro de categorias selecionadas
         category_ids = details.get('selected_category_ids', [])
         if category_ids:
-            base_filter &= Q(category_id__in=category_ids)
+            criteria['category_id__in'] = [int(category_id) for category_id in category_ids]
         
-        return base_filter
+        return criteria
     
     def _get_baseline_value(self) -> Decimal:
         """Retorna baseline salvo em validation_details ou calcula."""
@@ -68,8 +66,6 @@ class PercentageChangeValidator(BaseMissionValidator):
     
     def _get_current_value(self) -> Decimal:
         """Calcula valor do mês alvo (definido em validation_details)."""
-        from ..models import Transaction
-        
         details = self.mission_progress.validation_details or {}
         target_month = details.get('target_month')
         
@@ -78,16 +74,11 @@ class PercentageChangeValidator(BaseMissionValidator):
             if not self.mission_progress.started_at:
                 return Decimal('0')
             
-            filter_query = Q(
-                user=self.user,
+            return self.sum_transactions(
                 date__gte=self.mission_progress.started_at.date(),
                 date__lte=timezone.now().date(),
-            ) & self._get_transaction_filter()
-            
-            result = Transaction.objects.filter(filter_query).aggregate(
-                total=Sum('amount')
+                **self._get_transaction_criteria()
             )
-            return result['total'] or Decimal('0')
         
         # Usa target_month específico
         year, month = map(int, target_month.split('-'))
@@ -101,16 +92,11 @@ class PercentageChangeValidator(BaseMissionValidator):
             last_day = monthrange(year, month)[1]
             month_end = date(year, month, last_day)
         
-        filter_query = Q(
-            user=self.user,
+        return self.sum_transactions(
             date__gte=month_start,
             date__lte=month_end,
-        ) & self._get_transaction_filter()
-        
-        result = Transaction.objects.filter(filter_query).aggregate(
-            total=Sum('amount')
+            **self._get_transaction_criteria()
         )
-        return result['total'] or Decimal('0')
     
     def calculate_progress(self) -> Dict[str, Any]:
         if not self.mission_progress.started_at:
@@ -223,8 +209,8 @@ class PercentageChangeValidator(BaseMissionValidator):
             'message': message
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         
         details = self.mission_progress.validation_details or {}
         type_filter = details.get('transaction_type_filter') or self.mission.transaction_type_filter or 'EXPENSE'
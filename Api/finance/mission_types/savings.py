@@ -6,9 +6,8 @@ e valida quando o usuário atinge o valor alvo de aportes.
 """
 
 from decimal import Decimal
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-from django.db.models import Sum
 from django.utils import timezone
 
 from .base import BaseMissionValidator
@@ -38,15 +37,14 @@ class SavingsIncreaseValidator(BaseMissionValidator):
                 start_date = start_date.date()
         
         # Busca aportes em poupança/investimento desde o início
-        current_savings = Transaction.objects.filter(
-            user=self.user,
+        current_savings = self.sum_transactions(
             type=Transaction.TransactionType.EXPENSE,
             category__group__in=[
                 Category.CategoryGroup.SAVINGS,
                 Category.CategoryGroup.INVESTMENT
             ],
             date__gte=start_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        )
         
         # Valor inicial (salvo na inicialização da missão)
         initial_savings = self.mission_progress.initial_savings_amount or Decimal('0')
@@ -74,8 +72,8 @@ class SavingsIncreaseValidator(BaseMissionValidator):
             'message': f"Você poupou R$ {added_amount:.2f} (meta: R$ {target_amount:.2f})"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         
         if result['is_completed']:
             added = result['metrics']['added_amount']
@@ -1,8 +1,7 @@
 
 from datetime import timedelta
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-from django.db.models import Q
 from django.utils import timezone
 
 from .base import BaseMissionValidator
@@ -11,8 +10,6 @@ from .base import BaseMissionValidator
 class TransactionConsistencyValidator(BaseMissionValidator):
     
     def calculate_progress(self) -> Dict[str, Any]:
-        from ..models import Transaction
-        
         min_frequency = self.mission.min_transaction_frequency or 3
         duration_weeks = (self.mission.duration_days + 6) // 7
         
@@ -24,9 +21,9 @@ class TransactionConsistencyValidator(BaseMissionValidator):
                 'message': 'Missão ainda não foi iniciada'
             }
         
-        transaction_filter = Q(user=self.user, date__gte=self.mission_progress.started_at.date())
+        type_criteria = {}
         if self.mission.transaction_type_filter != 'ALL':
-            transaction_filter &= Q(type=self.mission.transaction_type_filter)
+            type_criteria['type'] = self.mission.transaction_type_filter
         
         weeks_meeting_criteria = 0
         current_date = self.mission_progress.started_at.date()
@@ -34,12 +31,12 @@ class TransactionConsistencyValidator(BaseMissionValidator):
         
         while current_date < end_date:
             week_end = min(current_date + timedelta(days=7), end_date)
-            week_transactions = Transaction.objects.filter(
-                transaction_filter,
+            week_transactions = self.count_transactions(
                 date__gte=current_date,
                 date__lt=week_end,
-                date__lte=timezone.now().date()  # Exclude future/scheduled transactions
-            ).count()
+                date__lte=timezone.now().date(),  # Exclude future/scheduled transactions
+                **type_criteria
+            )
             
             if week_transactions >= min_frequency:
                 weeks_meeting_criteria += 1
@@ -60,8 +57,8 @@ class TransactionConsistencyValidator(BaseMissionValidator):
             'message': f"{weeks_meeting_criteria}/{duration_weeks} semanas com consistência"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         if result['is_completed']:
             return True, "Parabéns! Você manteve consistência no registro de transações!"
         return False, "Continue registrando transações regularmente"
@@ -70,8 +67,6 @@ class TransactionConsistencyValidator(BaseMissionValidator):
 class PaymentDisciplineValidator(BaseMissionValidator):
     
     def calculate_progress(self) -> Dict[str, Any]:
-        from ..models import Transaction
-        
         if not self.mission.requires_payment_tracking:
             return {
                 'progress_percentage': 0,
@@ -88,11 +83,10 @@ class PaymentDisciplineValidator(BaseMissionValidator):
                 'message': 'Missão ainda não foi iniciada'
             }
         
-        payments_count = Transaction.objects.filter(
-            user=self.user,
+        payments_count = self.count_transactions(
             is_paid=True,
             date__gte=self.mission_progress.started_at.date()
-        ).count()
+        )
         
         target_payments = self.mission.min_payments_count or 5
         progress = min(100, (payments_count / target_payments) * 100)
@@ -108,8 +102,8 @@ class PaymentDisciplineValidator(BaseMissionValidator):
             'message': f"{payments_count}/{target_payments} pagamentos registrados"
         }
     
-    def validate_completion(self) -> Tuple[bool, str]:
-        result = self.calculate_progress()
+    def validate_completion(self, result: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        result = self._resolve_result(result)
         if result['is_completed']:
             return True, "Parabéns! Você manteve a disciplina nos pagamentos!"
         return False, "Continue registrando seus pagamentos"
@@ -1,7 +1,14 @@
+import hashlib
+import json
+import uuid as uuid_lib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import status
 from rest_framework.response import Response
-import uuid as uuid_lib
 
 
 class UUIDLookupMixin:
@@ -70,3 +77,48 @@ class DeprecatedIDWarningMixin:
             )
         
         return obj
+
+
+class ETagListMixin:
+    """
+    ETag e If-None-Match na listagem.
+
+    A ETag combina a URL (filtros e paginação), o usuário, a data de hoje
+    (campos como days_since_created dependem dela) e uma agregação barata
+    do queryset: contagem e o maior valor de cada campo em
+    `etag_timestamp_fields`. Se o cliente envia a ETag atual, a resposta é
+    304 sem consultar nem serializar a lista.
+    """
+
+    etag_timestamp_fields = ('updated_at',)
+
+    def get_etag_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_list_fingerprint(self):
+        aggregates = {'count': Count('pk')}
+        for field in self.etag_timestamp_fields:
+            aggregates[field] = Max(field)
+        return self.get_etag_queryset().order_by().aggregate(**aggregates)
+
+    def get_list_etag(self, request):
+        raw = json.dumps(
+            [
+                request.user.pk,
+                request.get_full_path(),
+                timezone.localdate(),
+                self.get_list_fingerprint(),
+            ],
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+        )
+        return quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
@@ -19,12 +19,18 @@ from .user import UserProfile
 
 from .category import Category
 
+from .ledger import UserMonthlyLedger
+
 from .transaction import Transaction, TransactionLink
 
+from .recurrence import ScheduledOccurrence
+
 
 
 from .mission import Mission, MissionProgress
 
+from .sync import SyncTombstone
+
 from .admin import XPTransaction, AdminActionLog
 
 
@@ -45,9 +51,12 @@ __all__ = [
     'Category',
     'Transaction',
     'TransactionLink',
+    'ScheduledOccurrence',
+    'UserMonthlyLedger',
 
     'Mission',
     'MissionProgress',
+    'SyncTombstone',
     'XPTransaction',
     'AdminActionLog',
 ]
@@ -52,6 +52,7 @@ class Category(models.Model):
         help_text="Categoria padrão do sistema (criada automaticamente para novos usuários)",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("user", "name", "type")
@@ -0,0 +1,102 @@
+"""
+Modelo UserMonthlyLedger - consolidado mensal de transações por usuário.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction as db_transaction
+from django.db.models import F
+
+
+class UserMonthlyLedgerManager(models.Manager):
+
+    def apply(self, user_id, month, tx_type, category_id, amount: Decimal, count: int) -> None:
+        """
+        Soma `amount` e `count` à linha (user, month, type, category).
+
+        Usa UPDATE com F() para não sobrescrever incrementos concorrentes e só
+        cria a linha quando ela ainda não existe.
+        """
+        lookup = {
+            'user_id': user_id,
+            'month': month,
+            'type': tx_type,
+            'category_id': category_id,
+        }
+        increments = {
+            'total_amount': F('total_amount') + amount,
+            'transaction_count': F('transaction_count') + count,
+        }
+
+        if self.filter(**lookup).update(**increments):
+            return
+
+        try:
+            with db_transaction.atomic():
+                self.create(total_amount=amount, transaction_count=count, **lookup)
+        except IntegrityError:
+            self.filter(**lookup).update(**increments)
+
+    def add_entry(self, entry) -> None:
+        user_id, month, tx_type, category_id, amount = entry
+        self.apply(user_id, month, tx_type, category_id, amount, 1)
+
+    def remove_entry(self, entry) -> None:
+        user_id, month, tx_type, category_id, amount = entry
+        self.apply(user_id, month, tx_type, category_id, -amount, -1)
+
+
+class UserMonthlyLedger(models.Model):
+    """
+    Totais mensais de transações ativas por usuário, tipo e categoria.
+
+    Mantido incrementalmente por Transaction.save()/delete(). O grupo da
+    categoria é obtido por join, então alterar o grupo de uma categoria não
+    exige reprocessar o consolidado.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_ledger',
+    )
+    month = models.DateField(help_text="Primeiro dia do mês consolidado")
+    type = models.CharField(max_length=14)
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='monthly_ledger',
+    )
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+    )
+    transaction_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserMonthlyLedgerManager()
+
+    class Meta:
+        verbose_name = "Consolidado Mensal"
+        verbose_name_plural = "Consolidados Mensais"
+        indexes = [
+            models.Index(fields=['user', 'month']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type', 'category'],
+                name='ledger_user_month_type_category_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='ledger_user_month_type_nocat_uniq',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.month:%Y-%m} {self.type} ({self.total_amount})"
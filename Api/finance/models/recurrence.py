@@ -0,0 +1,59 @@
+"""
+Modelo ScheduledOccurrence - próximas ocorrências de transações recorrentes.
+"""
+
+from django.conf import settings
+from django.db import models
+
+from .base import MAX_DESCRIPTION_LENGTH
+
+
+class ScheduledOccurrence(models.Model):
+    """
+    Ocorrência futura, já expandida, de uma transação recorrente.
+
+    Gerada por services.recurrence a partir de date, recurrence_value,
+    recurrence_unit e recurrence_end_date; projeções de fluxo de caixa e a
+    lista de próximas contas leem estas linhas em vez de recalcular as
+    datas a cada requisição.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='scheduled_occurrences',
+    )
+    transaction = models.ForeignKey(
+        'Transaction',
+        on_delete=models.CASCADE,
+        related_name='scheduled_occurrences',
+    )
+    date = models.DateField()
+    type = models.CharField(max_length=14)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scheduled_occurrences',
+    )
+    description = models.CharField(max_length=MAX_DESCRIPTION_LENGTH)
+    generated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('date',)
+        verbose_name = "Ocorrência Agendada"
+        verbose_name_plural = "Ocorrências Agendadas"
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['transaction', 'date'],
+                name='scheduled_occurrence_tx_date_uniq',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.description} em {self.date:%d/%m/%Y} ({self.amount})"
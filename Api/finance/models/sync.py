@@ -0,0 +1,46 @@
+"""
+Modelo SyncTombstone - registro de exclusões para a sincronização incremental.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class SyncTombstone(models.Model):
+    """
+    Marca a exclusão definitiva de um registro sincronizado com o app.
+
+    Transações usam soft delete (`deleted_at`); vínculos, categorias e
+    progresso de missões são apagados de fato, então a exclusão fica
+    registrada aqui para que `sync/changes/` a repasse aos dispositivos.
+    Categorias globais geram marcas com user=None.
+    """
+
+    class Kind(models.TextChoices):
+        TRANSACTION = "TRANSACTION", "Transação"
+        TRANSACTION_LINK = "TRANSACTION_LINK", "Vínculo"
+        CATEGORY = "CATEGORY", "Categoria"
+        MISSION_PROGRESS = "MISSION_PROGRESS", "Progresso de missão"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sync_tombstones',
+        null=True,
+        blank=True,
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.CharField(max_length=36)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Exclusão Sincronizada"
+        verbose_name_plural = "Exclusões Sincronizadas"
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.object_id} ({self.deleted_at:%Y-%m-%d %H:%M})"
@@ -1,10 +1,11 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from decimal import Decimal
 import uuid
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction as db_transaction
+from django.db.models import Case, Count, DecimalField, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from .base import (
@@ -14,8 +15,53 @@ from .base import (
     MAX_FUTURE_DATE_YEARS,
 )
 from .category import Category
+from .ledger import UserMonthlyLedger
 
-class ActiveTransactionManager(models.Manager):
+class TransactionQuerySet(models.QuerySet):
+
+    def with_link_totals(self):
+        """
+        Anota os totais de vinculação lidos pelo TransactionSerializer.
+
+        `linked_amount_annotated` segue a mesma regra de Transaction.linked_amount
+        (lida de linked_total/received_total); `available_amount_annotated`,
+        `outgoing_links_count_annotated` e `incoming_links_count_annotated`
+        completam o contrato. Sem essas anotações o serializer recai nas
+        propriedades do modelo e faz uma consulta por linha.
+        """
+        decimal_field = DecimalField(max_digits=12, decimal_places=2)
+        links = TransactionLink.objects.order_by()
+
+        outgoing_count = links.filter(
+            source_transaction_uuid=OuterRef('id')
+        ).values('source_transaction_uuid').annotate(
+            cnt=Count('id')
+        ).values('cnt')
+
+        incoming_count = links.filter(
+            target_transaction_uuid=OuterRef('id')
+        ).values('target_transaction_uuid').annotate(
+            cnt=Count('id')
+        ).values('cnt')
+
+        return self.annotate(
+            linked_amount_annotated=Case(
+                When(type=Transaction.TransactionType.INCOME, then=F('linked_total')),
+                When(type=Transaction.TransactionType.EXPENSE, then=F('received_total')),
+                default=Value(Decimal('0')),
+                output_field=decimal_field,
+            ),
+            outgoing_links_count_annotated=Coalesce(Subquery(outgoing_count), Value(0)),
+            incoming_links_count_annotated=Coalesce(Subquery(incoming_count), Value(0)),
+        ).annotate(
+            available_amount_annotated=models.ExpressionWrapper(
+                F('amount') - F('linked_amount_annotated'),
+                output_field=decimal_field,
+            ),
+        )
+
+
+class ActiveTransactionManager(models.Manager.from_queryset(TransactionQuerySet)):
     """
     Manager que filtra apenas transações ativas (não deletadas).
     """
@@ -23,7 +69,7 @@ class ActiveTransactionManager(models.Manager):
         return super().get_queryset().filter(deleted_at__isnull=True)
 
 
-class AllTransactionManager(models.Manager):
+class AllTransactionManager(models.Manager.from_queryset(TransactionQuerySet)):
     """
     Manager que retorna todas as transações, incluindo soft-deleted.
     """
@@ -80,6 +126,18 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
+    linked_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Soma dos vínculos em que esta transação é a origem (mantida por TransactionLink)"
+    )
+    received_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Soma dos vínculos em que esta transação é o destino (mantida por TransactionLink)"
+    )
 
     objects = ActiveTransactionManager()
     all_objects = AllTransactionManager()
@@ -94,11 +152,74 @@ class Transaction(models.Model):
             models.Index(fields=['user', 'category']),
             models.Index(fields=['user', '-date', '-created_at']),
             models.Index(fields=['user', 'deleted_at']),
+            models.Index(fields=['user', 'updated_at']),
         ]
 
+    LEDGER_FIELDS = ('user', 'type', 'category', 'amount', 'date', 'deleted_at')
+    LINK_TOTAL_FIELDS = ('linked_total', 'received_total')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = set(field_names)
+        if all(cls._meta.get_field(name).attname in loaded for name in cls.LEDGER_FIELDS):
+            instance._ledger_snapshot = instance.ledger_entry()
+        return instance
+
+    def ledger_entry(self):
+        """
+        Chave e valor com que esta transação contribui para o UserMonthlyLedger.
+
+        Retorna None para transações soft-deleted, que não entram no consolidado.
+        """
+        if self.deleted_at is not None:
+            return None
+        tx_date = self._meta.get_field('date').to_python(self.date)
+        amount = self._meta.get_field('amount').to_python(self.amount)
+        return (self.user_id, tx_date.replace(day=1), self.type, self.category_id, amount)
+
+    def _stored_ledger_entry(self):
+        if self._state.adding:
+            return None
+        if hasattr(self, '_ledger_snapshot'):
+            return self._ledger_snapshot
+        stored = Transaction.all_objects.filter(pk=self.pk).first()
+        return stored.ledger_entry() if stored else None
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # Os totais de vínculo são mantidos por UPDATE com F(); um save
+            # completo de uma instância antiga não pode sobrescrevê-los.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.LINK_TOTAL_FIELDS
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not set(update_fields) & set(self.LEDGER_FIELDS):
+            return super().save(*args, **kwargs)
+
+        previous = self._stored_ledger_entry()
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+            current = self.ledger_entry()
+            if previous != current:
+                if previous is not None:
+                    UserMonthlyLedger.objects.remove_entry(previous)
+                if current is not None:
+                    UserMonthlyLedger.objects.add_entry(current)
+        self._ledger_snapshot = current
+
+    def delete(self, *args, **kwargs):
+        previous = self._stored_ledger_entry()
+        with db_transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if previous is not None:
+                UserMonthlyLedger.objects.remove_entry(previous)
+        return result
+
     def soft_delete(self):
         self.deleted_at = timezone.now()
-        self.save(update_fields=['deleted_at'])
+        self.save(update_fields=['deleted_at', 'updated_at'])
 
     def __str__(self) -> str:
         return f"{self.description} ({self.amount})"
@@ -106,7 +227,9 @@ class Transaction(models.Model):
     @property
     def is_scheduled(self) -> bool:
         """Returns True if this transaction is scheduled for a future date."""
-        return self.date > timezone.now().date()
+        # Antes de recarregar do banco, o default (timezone.now) ainda é datetime
+        date = self.date.date() if isinstance(self.date, datetime) else self.date
+        return date > timezone.now().date()
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -205,13 +328,11 @@ class Transaction(models.Model):
 
     @property
     def linked_amount(self) -> Decimal:
-        outgoing = TransactionLink.objects.filter(
-            source_transaction_uuid=self.id
-        ).aggregate(total=Sum('linked_amount'))['total'] or Decimal('0')
-        
+        """Valor já comprometido: saídas de uma receita ou pagamentos recebidos por uma despesa."""
         if self.type == self.TransactionType.INCOME:
-            return outgoing
-        
+            return self.linked_total
+        if self.type == self.TransactionType.EXPENSE:
+            return self.received_total
         return Decimal('0')
     
     @property
@@ -290,12 +411,15 @@ class TransactionLink(models.Model):
         help_text="Se True, vincular automaticamente transações recorrentes futuras"
     )
 
+    TOTAL_FIELDS = ('source_transaction_uuid', 'target_transaction_uuid', 'linked_amount')
+
     class Meta:
         ordering = ('-created_at',)
         verbose_name = "Vínculo de Transação"
         verbose_name_plural = "Vínculos de Transações"
         indexes = [
             models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['user', 'updated_at']),
             models.Index(fields=['source_transaction_uuid']),
             models.Index(fields=['target_transaction_uuid']),
             models.Index(fields=['user', 'source_transaction_uuid'], name='trl_user_src_uuid_idx'),
@@ -352,7 +476,6 @@ class TransactionLink(models.Model):
 
     def clean(self):
         from django.core.exceptions import ValidationError
-        from django.db import transaction as db_transaction
         
         if self.source_transaction_uuid == self.target_transaction_uuid:
             raise ValidationError(
@@ -384,31 +507,98 @@ class TransactionLink(models.Model):
             raise ValidationError(
                 "O valor vinculado deve ser maior que zero."
             )
-        
-        try:
-            with db_transaction.atomic():
-                source = Transaction.objects.select_for_update().get(
-                    id=self.source_transaction_uuid
-                )
-                target = Transaction.objects.select_for_update().get(
-                    id=self.target_transaction_uuid
-                )
-                
-                if self.linked_amount > source.available_amount:
-                    raise ValidationError(
-                        f"Valor vinculado (R$ {self.linked_amount}) excede o disponível "
-                        f"na transação de origem (R$ {source.available_amount})"
-                    )
-                
-                if target.type == Transaction.TransactionType.EXPENSE:
-                    if self.linked_amount > target.available_amount:
-                        raise ValidationError(
-                            f"Valor vinculado (R$ {self.linked_amount}) excede o pendente "
-                            f"na transação de destino (R$ {target.available_amount})"
-                        )
-        except Transaction.DoesNotExist as e:
-            raise ValidationError(f"Transação não encontrada: {e}")
-    
+
+        # Saldo disponível é conferido em save(), no mesmo UPDATE que atualiza
+        # linked_total/received_total (ver _reserve_totals).
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = set(field_names)
+        if all(cls._meta.get_field(name).attname in loaded for name in cls.TOTAL_FIELDS):
+            instance._totals_snapshot = instance.totals_entry()
+        return instance
+
+    def totals_entry(self):
+        """Origem, destino e valor com que este vínculo contribui para os totais das transações."""
+        amount = self._meta.get_field('linked_amount').to_python(self.linked_amount)
+        return (self.source_transaction_uuid, self.target_transaction_uuid, amount)
+
+    def _stored_totals_entry(self):
+        if self._state.adding:
+            return None
+        if hasattr(self, '_totals_snapshot'):
+            return self._totals_snapshot
+        return TransactionLink.objects.filter(pk=self.pk).values_list(*self.TOTAL_FIELDS).first()
+
+    @staticmethod
+    def _release_totals(entry):
+        source_uuid, target_uuid, amount = entry
+        now = timezone.now()
+        Transaction.all_objects.filter(id=source_uuid).update(
+            linked_total=F('linked_total') - amount, updated_at=now
+        )
+        Transaction.all_objects.filter(id=target_uuid).update(
+            received_total=F('received_total') - amount, updated_at=now
+        )
+
+    @staticmethod
+    def _reserve_totals(entry):
+        """
+        Soma o vínculo aos totais da origem e do destino.
+
+        O UPDATE só afeta a linha se ainda houver saldo (o que saiu da
+        origem e o que o destino recebeu não passam do valor de cada uma,
+        qualquer que seja o tipo), então a checagem e a escrita são atômicas
+        sem SELECT ... FOR UPDATE nem agregação.
+        """
+        from django.core.exceptions import ValidationError
+
+        source_uuid, target_uuid, amount = entry
+        now = timezone.now()
+        source_updated = Transaction.all_objects.filter(
+            id=source_uuid, linked_total__lte=F('amount') - amount,
+        ).update(linked_total=F('linked_total') + amount, updated_at=now)
+        if not source_updated:
+            source = Transaction.all_objects.filter(id=source_uuid).first()
+            if source is None:
+                raise ValidationError(f"Transação não encontrada: {source_uuid}")
+            raise ValidationError(
+                f"Valor vinculado (R$ {amount}) excede o disponível "
+                f"na transação de origem (R$ {source.amount - source.linked_total})"
+            )
+
+        target_updated = Transaction.all_objects.filter(
+            id=target_uuid, received_total__lte=F('amount') - amount,
+        ).update(received_total=F('received_total') + amount, updated_at=now)
+        if not target_updated:
+            target = Transaction.all_objects.filter(id=target_uuid).first()
+            if target is None:
+                raise ValidationError(f"Transação não encontrada: {target_uuid}")
+            raise ValidationError(
+                f"Valor vinculado (R$ {amount}) excede o pendente "
+                f"na transação de destino (R$ {target.amount - target.received_total})"
+            )
+
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        previous = self._stored_totals_entry()
+        current = self.totals_entry()
+        with db_transaction.atomic():
+            if previous != current:
+                if previous is not None:
+                    self._release_totals(previous)
+                self._reserve_totals(current)
+            super().save(*args, **kwargs)
+        self._totals_snapshot = current
+        # Instâncias em cache ficariam com totais antigos
+        self.__dict__.pop('_source_transaction_cache', None)
+        self.__dict__.pop('_target_transaction_cache', None)
+
+    def delete(self, *args, **kwargs):
+        previous = self._stored_totals_entry()
+        with db_transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if previous is not None:
+                self._release_totals(previous)
+        return result
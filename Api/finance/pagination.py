@@ -0,0 +1,132 @@
+"""
+Paginações específicas de listas de transações.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TransactionKeysetPagination(BasePagination):
+    """
+    Paginação keyset em (date, created_at, id), sempre em ordem decrescente.
+
+    Cada página filtra a partir da última linha da página anterior em vez de
+    usar OFFSET, então o custo é constante em qualquer profundidade e a busca
+    é servida pelo índice (user, -date, -created_at).
+
+    É opt-in: ativada com `?pagination=cursor` na primeira página; as
+    seguintes usam o link `next`, que carrega `?cursor=...`.
+    """
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode_value = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 200
+    ordering = ('-date', '-created_at', '-id')
+    invalid_cursor_message = 'Cursor inválido.'
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        params = request.query_params
+        return (
+            cls.cursor_query_param in params
+            or params.get(cls.mode_query_param) == cls.mode_value
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def encode_cursor(self, obj) -> str:
+        position = {
+            'd': obj.date.isoformat(),
+            'c': obj.created_at.isoformat(),
+            'i': str(obj.id),
+        }
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return (
+                date.fromisoformat(position['d']),
+                datetime.fromisoformat(position['c']),
+                position['i'],
+            )
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            last_date, last_created_at, last_id = position
+            queryset = queryset.filter(
+                Q(date__lt=last_date)
+                | Q(date=last_date, created_at__lt=last_created_at)
+                | Q(date=last_date, created_at=last_created_at, id__lt=last_id)
+            )
+
+        # Uma linha extra indica se há próxima página sem precisar de COUNT
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class OptionalLimitOffsetPagination(LimitOffsetPagination):
+    """
+    LIMIT/OFFSET aplicado só quando a requisição envia `?limit=`.
+
+    Para relatórios que antes devolviam a lista completa e continuam
+    devolvendo-a por padrão.
+    """
+
+    default_limit = None
+    max_limit = 200
@@ -0,0 +1,48 @@
+"""
+Busca textual de transações com índice trigram (pg_trgm).
+"""
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q
+from rest_framework import filters
+
+from .models import Category
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    `?search=` por similaridade de trigramas no PostgreSQL.
+
+    A descrição é comparada com `%>` (word_similarity), servido pelo índice
+    GIN gin_trgm_ops: termos parciais ou com erros de digitação também casam.
+    Categorias entram por nome, resolvidas em uma subconsulta à tabela de
+    categorias do usuário. Sem `?ordering=`, o resultado vem ordenado por
+    relevância (`search_rank`).
+
+    Em outros bancos (SQLite nos testes) cai no SearchFilter padrão.
+    """
+
+    trigram_field = 'description'
+    category_field = 'category'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        term = ' '.join(terms)
+        categories = Category.objects.filter(
+            Q(user=request.user) | Q(user__isnull=True),
+            name__icontains=term,
+        ).values('id')
+        queryset = queryset.filter(
+            Q(**{f'{self.trigram_field}__trigram_word_similar': term})
+            | Q(**{f'{self.category_field}__in': categories})
+        ).annotate(search_rank=TrigramWordSimilarity(term, self.trigram_field))
+
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
@@ -4,6 +4,8 @@ from .transaction import (
     TransactionSerializer,
     TransactionLinkSerializer,
     TransactionLinkSummarySerializer,
+    TransactionSyncItemSerializer,
+    ScheduledOccurrenceSerializer,
 )
 from .mission import MissionSerializer, MissionProgressSerializer
 from .dashboard import (
@@ -28,4 +30,6 @@ __all__ = [
     'DashboardSerializer',
     'TransactionLinkSerializer',
     'TransactionLinkSummarySerializer',
+    'TransactionSyncItemSerializer',
+    'ScheduledOccurrenceSerializer',
 ]
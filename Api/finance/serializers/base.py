@@ -9,6 +9,7 @@ from ..models import (
     Category,
     Mission,
     MissionProgress,
+    ScheduledOccurrence,
     Transaction,
     TransactionLink,
     UserProfile,
@@ -22,6 +23,7 @@ __all__ = [
     'Category',
     'Mission',
     'MissionProgress',
+    'ScheduledOccurrence',
     'Transaction',
     'TransactionLink',
     'UserProfile',
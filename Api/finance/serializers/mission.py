@@ -325,20 +325,33 @@ class MissionProgressSerializer(serializers.ModelSerializer):
     def get_progress_percentage(self, obj):
         return f"{float(obj.progress):.1f}%"
     
-    def get_detailed_metrics(self, obj):
-        if not obj.started_at:
-            return None
-            
-        try:
-            from ..mission_types import MissionValidatorFactory
-            
+    def _evaluate_progress(self, obj):
+        """
+        Resultado do validador da missão, calculado uma vez por objeto.
+        
+        detailed_metrics e progress_status compartilham o mesmo validador.
+        """
+        from ..mission_types import MissionValidatorFactory
+        
+        if not hasattr(self, '_progress_validators'):
+            self._progress_validators = {}
+        
+        validator = self._progress_validators.get(obj.pk)
+        if validator is None:
             validator = MissionValidatorFactory.create_validator(
                 obj.mission,
                 obj.user,
                 obj
             )
+            self._progress_validators[obj.pk] = validator
+        return validator.evaluate()
+    
+    def get_detailed_metrics(self, obj):
+        if not obj.started_at:
+            return None
             
-            result = validator.calculate_progress()
+        try:
+            result = self._evaluate_progress(obj)
             raw_metrics = result.get('metrics', {})
             
             if not raw_metrics or 'error' in str(raw_metrics):
@@ -476,15 +489,7 @@ class MissionProgressSerializer(serializers.ModelSerializer):
     
     def get_progress_status(self, obj):
         try:
-            from ..mission_types import MissionValidatorFactory
-            
-            validator = MissionValidatorFactory.create_validator(
-                obj.mission,
-                obj.user,
-                obj
-            )
-            
-            result = validator.calculate_progress()
+            result = self._evaluate_progress(obj)
             
             return {
                 'message': result.get('message', ''),
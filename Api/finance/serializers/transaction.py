@@ -1,7 +1,7 @@
 
 from django.db.models import Q
 
-from .base import serializers, Category, Transaction, TransactionLink
+from .base import serializers, Category, ScheduledOccurrence, Transaction, TransactionLink
 from .category import CategorySerializer
 
 
@@ -360,3 +360,46 @@ class TransactionLinkSummarySerializer(serializers.Serializer):
     total_available = serializers.DecimalField(max_digits=12, decimal_places=2)
     links_count = serializers.IntegerField()
     coverage_percentage = serializers.FloatField()
+
+
+class TransactionSyncItemSerializer(serializers.Serializer):
+    """
+    Item do envio em lote do app offline (`transactions/sync/`).
+
+    `id` é o UUID gerado no dispositivo e `updated_at` o momento da última
+    edição local. Os demais campos são opcionais em atualizações; as regras
+    do modelo (Transaction.clean) são aplicadas pelo serviço de sincronização.
+    """
+
+    id = serializers.UUIDField()
+    updated_at = serializers.DateTimeField()
+    deleted = serializers.BooleanField(required=False, default=False)
+    type = serializers.ChoiceField(choices=Transaction.TransactionType.choices, required=False)
+    description = serializers.CharField(required=False)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    date = serializers.DateField(required=False)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+    is_recurring = serializers.BooleanField(required=False)
+    recurrence_value = serializers.IntegerField(required=False, allow_null=True)
+    recurrence_unit = serializers.ChoiceField(
+        choices=Transaction.RecurrenceUnit.choices, required=False, allow_null=True
+    )
+    recurrence_end_date = serializers.DateField(required=False, allow_null=True)
+
+
+class ScheduledOccurrenceSerializer(serializers.ModelSerializer):
+
+    transaction_id = serializers.UUIDField(read_only=True)
+    category = CategorySerializer(read_only=True)
+
+    class Meta:
+        model = ScheduledOccurrence
+        fields = (
+            "transaction_id",
+            "date",
+            "type",
+            "amount",
+            "description",
+            "category",
+        )
+        read_only_fields = fields
@@ -10,6 +10,38 @@ from .indicators import (
     profile_snapshot,
 )
 
+from .cache_keys import (
+    bump_catalog_generation,
+    bump_user_generation,
+    user_cache_key,
+)
+
+from .dashboard import (
+    DASHBOARD_CHANGES,
+    DASHBOARD_FRAGMENT_TTL,
+    DASHBOARD_FRAGMENTS,
+    acquire_dashboard_build,
+    invalidate_dashboard_fragments,
+    read_dashboard,
+    release_dashboard_build,
+    wait_for_dashboard,
+    write_dashboard,
+)
+
+from .ledger import (
+    rebuild_monthly_ledger,
+)
+
+from .link_totals import (
+    find_link_total_drift,
+    rebuild_link_totals,
+)
+
+from .memo import (
+    bump_data_version,
+    request_memo,
+)
+
 from .context import (
     analyze_user_context,
     identify_improvement_opportunities,
@@ -36,8 +68,31 @@ from .analytics import (
     get_comprehensive_mission_context,
 )
 
+from .imports import (
+    decode_statement,
+    detect_statement_format,
+    import_transactions,
+)
+
+from .recurrence import (
+    occurrence_dates,
+    projected_monthly_totals,
+    refresh_scheduled_occurrences,
+    upcoming_occurrences,
+)
+
+from .sync import (
+    collect_sync_changes,
+    decode_sync_cursor,
+    encode_sync_cursor,
+    prune_sync_tombstones,
+    record_sync_tombstones,
+    sync_transactions,
+)
+
 from .transactions import (
     auto_link_recurring_transactions,
+    create_bulk_payments,
 )
 
 __all__ = [
@@ -51,6 +106,28 @@ __all__ = [
     'cashflow_series',
     'profile_snapshot',
     
+    'bump_catalog_generation',
+    'bump_user_generation',
+    'user_cache_key',
+    
+    'DASHBOARD_CHANGES',
+    'DASHBOARD_FRAGMENT_TTL',
+    'DASHBOARD_FRAGMENTS',
+    'acquire_dashboard_build',
+    'invalidate_dashboard_fragments',
+    'read_dashboard',
+    'release_dashboard_build',
+    'wait_for_dashboard',
+    'write_dashboard',
+    
+    'rebuild_monthly_ledger',
+    
+    'find_link_total_drift',
+    'rebuild_link_totals',
+    
+    'bump_data_version',
+    'request_memo',
+    
     'analyze_user_context',
     'identify_improvement_opportunities',
     
@@ -72,5 +149,22 @@ __all__ = [
     'get_mission_distribution_analysis',
     'get_comprehensive_mission_context',
     
+    'decode_statement',
+    'detect_statement_format',
+    'import_transactions',
+    
+    'occurrence_dates',
+    'projected_monthly_totals',
+    'refresh_scheduled_occurrences',
+    'upcoming_occurrences',
+    
+    'collect_sync_changes',
+    'decode_sync_cursor',
+    'encode_sync_cursor',
+    'prune_sync_tombstones',
+    'record_sync_tombstones',
+    'sync_transactions',
+    
     'auto_link_recurring_transactions',
+    'create_bulk_payments',
 ]
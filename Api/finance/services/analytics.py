@@ -10,6 +10,7 @@ from ..models import (
     Category, Mission, MissionProgress, Transaction, UserProfile
 )
 from .base import _decimal, logger
+from .cache_keys import user_cache_key
 from .indicators import calculate_summary
 
 
@@ -120,7 +121,7 @@ def analyze_category_patterns(user, days=90):
     if not user or days <= 0:
         return {'has_data': False, 'error': 'Parâmetros inválidos'}
     
-    cache_key = f'category_patterns_{user.id}_{days}'
+    cache_key = user_cache_key('category_patterns', user.id, days)
     cached_result = cache.get(cache_key)
     if cached_result:
         return cached_result
@@ -226,7 +227,7 @@ def analyze_tier_progression(user):
     if not user:
         return {'error': 'Usuário inválido'}
     
-    cache_key = f'tier_progression_{user.id}'
+    cache_key = user_cache_key('tier_progression', user.id)
     cached_result = cache.get(cache_key)
     if cached_result:
         return cached_result
@@ -337,7 +338,7 @@ def get_mission_distribution_analysis(user):
     if not user:
         return {'error': 'Usuário inválido', 'total_missions': 0}
     
-    cache_key = f'mission_distribution_{user.id}'
+    cache_key = user_cache_key('mission_distribution', user.id)
     cached_result = cache.get(cache_key)
     if cached_result:
         return cached_result
@@ -435,7 +436,7 @@ def get_mission_distribution_analysis(user):
 def get_comprehensive_mission_context(user):
     from django.core.cache import cache
     
-    cache_key = f'mission_context_{user.id}'
+    cache_key = user_cache_key('mission_context', user.id)
     cached_context = cache.get(cache_key)
     if cached_context:
         logger.debug(f"Usando contexto em cache para usuário {user.id}")
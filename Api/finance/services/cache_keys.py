@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache
+
+CATALOG_GENERATION_KEY = 'cache_generation_catalog'
+
+# Os contadores expiram bem depois de qualquer entrada que versionam (a mais
+# longa é o dashboard, DASHBOARD_STALE_TTL), para não acumularem no cache
+# de usuários inativos. Ao expirar, recomeçam em _initial_counter().
+COUNTER_TTL = 7 * 24 * 3600
+
+
+def user_generation_key(user_id: int) -> str:
+    return f'cache_generation_user_{user_id}'
+
+
+def _initial_counter() -> int:
+    # Se o contador for descartado do cache, recomeçar de um valor novo evita
+    # reaproveitar entradas gravadas com uma geração antiga.
+    return int(time.time() * 1000)
+
+
+def read_counters(keys: Iterable[str], values: Optional[Dict] = None) -> Dict[str, int]:
+    """
+    Valores atuais dos contadores em `keys`, criando os que não existem.
+
+    `values` permite reaproveitar um get_many já feito pelo chamador.
+    """
+    keys = list(keys)
+    if values is None:
+        values = cache.get_many(keys)
+    counters = {}
+    for key in keys:
+        value = values.get(key)
+        if value is None:
+            cache.add(key, _initial_counter(), timeout=COUNTER_TTL)
+            value = cache.get(key)
+        counters[key] = value
+    return counters
+
+
+def bump_counter(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_counter(), timeout=COUNTER_TTL)
+
+
+def user_cache_key(name: str, user_id: int, *parts) -> str:
+    """
+    Chave de cache de dados do usuário, com a geração do usuário e a do
+    catálogo de missões.
+
+    Trocar de geração torna inalcançáveis todas as chaves antigas de uma vez,
+    sem precisar conhecê-las; elas expiram sozinhas.
+    """
+    user_key = user_generation_key(user_id)
+    counters = read_counters([user_key, CATALOG_GENERATION_KEY])
+    suffix = ''.join(f'_{part}' for part in parts)
+    return f'{name}_{user_id}{suffix}_g{counters[user_key]}_c{counters[CATALOG_GENERATION_KEY]}'
+
+
+def bump_user_generation(user_id: int) -> None:
+    """Invalida todas as chaves de `user_cache_key` do usuário com um incremento."""
+    bump_counter(user_generation_key(user_id))
+
+
+def bump_catalog_generation() -> None:
+    """Invalida, para todos os usuários, o que depende do catálogo de missões."""
+    bump_counter(CATALOG_GENERATION_KEY)
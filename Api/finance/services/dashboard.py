@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_keys import CATALOG_GENERATION_KEY, bump_counter, read_counters
+
+DASHBOARD_FRAGMENTS = (
+    'summary',
+    'categories',
+    'cashflow',
+    'insights',
+    'active_missions',
+    'profile',
+)
+DASHBOARD_FRAGMENT_TTL = 300
+DASHBOARD_STALE_TTL = 3600
+# Trava do cálculo inline: expira sozinha se o processo morrer no meio
+DASHBOARD_BUILD_LOCK_TTL = 60
+DASHBOARD_BUILD_WAIT_SECONDS = 3
+DASHBOARD_BUILD_POLL_SECONDS = 0.1
+
+# Fragmentos afetados por cada tipo de escrita. O perfil entra junto com o
+# resumo porque serializa os indicadores em cache (cached_tps etc.), e os
+# insights dependem tanto do resumo quanto das metas do perfil.
+DASHBOARD_CHANGES = {
+    'transactions': ('summary', 'categories', 'cashflow', 'insights', 'profile'),
+    'links': ('summary', 'cashflow', 'insights', 'profile'),
+    'categories': ('categories',),
+    'missions': ('active_missions', 'profile'),
+    'profile': ('profile', 'insights'),
+}
+
+# Fragmentos que também dependem do catálogo de missões (título, recompensa)
+CATALOG_FRAGMENTS = ('active_missions',)
+
+
+def _version_key(user_id: int, fragment: str) -> str:
+    return f'dashboard_version_{fragment}_{user_id}'
+
+
+def _snapshot_key(user_id: int) -> str:
+    return f'dashboard_snapshot_{user_id}'
+
+
+def _build_lock_key(user_id: int) -> str:
+    return f'dashboard_build_lock_{user_id}'
+
+
+def read_dashboard(user_id: int):
+    """
+    Lê em uma única ida ao cache as versões dos fragmentos e o último
+    dashboard serializado do usuário.
+
+    Retorna (snapshot, versões, frescos): `snapshot` guarda por fragmento o
+    payload, a versão e o instante em que foi montado (vazio se expirou);
+    um fragmento é fresco quando foi montado na versão atual há menos de
+    DASHBOARD_FRAGMENT_TTL segundos. Os demais podem ser servidos como
+    versão antiga enquanto são reconstruídos.
+    """
+    version_keys = {fragment: _version_key(user_id, fragment) for fragment in DASHBOARD_FRAGMENTS}
+    counter_keys = [*version_keys.values(), CATALOG_GENERATION_KEY]
+    values = cache.get_many([*counter_keys, _snapshot_key(user_id)])
+    counters = read_counters(counter_keys, values)
+
+    versions = {}
+    for fragment, version_key in version_keys.items():
+        version = counters[version_key]
+        if fragment in CATALOG_FRAGMENTS:
+            version = f'{version}.{counters[CATALOG_GENERATION_KEY]}'
+        versions[fragment] = version
+
+    snapshot = values.get(_snapshot_key(user_id)) or {'fragments': {}, 'versions': {}, 'built_at': {}}
+    oldest = time.time() - DASHBOARD_FRAGMENT_TTL
+    fresh = {
+        fragment
+        for fragment in snapshot['fragments']
+        if snapshot['versions'].get(fragment) == versions[fragment]
+        and snapshot['built_at'].get(fragment, 0) > oldest
+    }
+    return snapshot, versions, fresh
+
+
+def write_dashboard(user_id: int, snapshot: Dict, versions: Dict, fragments: Dict) -> Dict:
+    """
+    Grava os `fragments` recém-serializados no snapshot, sob as `versions`
+    lidas antes do cálculo: se uma escrita invalidar algum fragmento no
+    meio do caminho, ele continua marcado como desatualizado.
+
+    O snapshot não expira com as invalidações, só depois de
+    DASHBOARD_STALE_TTL segundos. Retorna o snapshot gravado.
+    """
+    now = time.time()
+    snapshot = {
+        'fragments': {**snapshot['fragments'], **fragments},
+        'versions': {**snapshot['versions'], **{name: versions[name] for name in fragments}},
+        'built_at': {**snapshot['built_at'], **{name: now for name in fragments}},
+    }
+    ttl = getattr(settings, 'DASHBOARD_STALE_TTL', DASHBOARD_STALE_TTL)
+    cache.set(_snapshot_key(user_id), snapshot, timeout=ttl)
+    return snapshot
+
+
+def acquire_dashboard_build(user_id: int) -> bool:
+    """
+    Tenta reservar o cálculo inline do dashboard do usuário.
+
+    Só uma requisição por usuário monta o dashboard sem versão anterior; as
+    demais esperam por ele (ver wait_for_dashboard). Quem recebe True deve
+    chamar release_dashboard_build ao terminar.
+    """
+    return cache.add(_build_lock_key(user_id), True, timeout=DASHBOARD_BUILD_LOCK_TTL)
+
+
+def release_dashboard_build(user_id: int) -> None:
+    cache.delete(_build_lock_key(user_id))
+
+
+def wait_for_dashboard(user_id: int):
+    """
+    Espera até DASHBOARD_BUILD_WAIT_SECONDS que o cálculo em andamento grave
+    um dashboard completo. Retorna o mesmo que read_dashboard, ou None se o
+    tempo acabar antes.
+    """
+    deadline = time.monotonic() + getattr(
+        settings, 'DASHBOARD_BUILD_WAIT_SECONDS', DASHBOARD_BUILD_WAIT_SECONDS
+    )
+    while True:
+        snapshot, versions, fresh = read_dashboard(user_id)
+        if all(name in snapshot['fragments'] for name in DASHBOARD_FRAGMENTS):
+            return snapshot, versions, fresh
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(DASHBOARD_BUILD_POLL_SECONDS)
+
+
+def invalidate_dashboard_fragments(user_id: int, change: Optional[str] = None) -> tuple:
+    """
+    Invalida os fragmentos afetados por `change` (chave de DASHBOARD_CHANGES).
+
+    Cada fragmento tem a própria versão; incrementá-la basta para que o
+    fragmento guardado deixe de ser fresco. Sem `change`, invalida todos.
+    Retorna os fragmentos invalidados.
+    """
+    fragments = DASHBOARD_FRAGMENTS if change is None else DASHBOARD_CHANGES[change]
+    for fragment in fragments:
+        bump_counter(_version_key(user_id, fragment))
+    return fragments
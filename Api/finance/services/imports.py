@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import csv
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import (
+    MAX_AMOUNT,
+    MAX_DESCRIPTION_LENGTH,
+    MAX_FUTURE_DATE_YEARS,
+    Category,
+    Transaction,
+    UserMonthlyLedger,
+)
+from .base import logger
+
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 50
+IMPORT_FORMATS = ('csv', 'ofx')
+IMPORT_UPLOAD_DIR = 'imports'
+
+_CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y')
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+_TYPE_ALIASES = {
+    'INCOME': Transaction.TransactionType.INCOME,
+    'RECEITA': Transaction.TransactionType.INCOME,
+    'CREDIT': Transaction.TransactionType.INCOME,
+    'CREDITO': Transaction.TransactionType.INCOME,
+    'CRÉDITO': Transaction.TransactionType.INCOME,
+    'EXPENSE': Transaction.TransactionType.EXPENSE,
+    'DESPESA': Transaction.TransactionType.EXPENSE,
+    'DEBIT': Transaction.TransactionType.EXPENSE,
+    'DEBITO': Transaction.TransactionType.EXPENSE,
+    'DÉBITO': Transaction.TransactionType.EXPENSE,
+}
+
+
+class StatementRowError(ValueError):
+    pass
+
+
+def decode_statement(raw: bytes) -> str:
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        # Extratos OFX de bancos brasileiros costumam vir em latin-1
+        return raw.decode('latin-1')
+
+
+def detect_statement_format(filename: str, head: str) -> str:
+    """Deduz o formato pelo nome do arquivo ou, na falta dele, pelo conteúdo."""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in IMPORT_FORMATS:
+        return extension
+    if 'OFXHEADER' in head.upper() or '<OFX>' in head.upper():
+        return 'ofx'
+    return 'csv'
+
+
+def _parse_amount(value: str) -> Decimal:
+    raw = (value or '').strip().replace('R$', '').replace(' ', '')
+    if ',' in raw:
+        # Formato brasileiro: 1.234,56
+        raw = raw.replace('.', '').replace(',', '.')
+    try:
+        amount = Decimal(raw)
+    except InvalidOperation:
+        raise StatementRowError(f"valor inválido '{value}'")
+    if not amount.is_finite():
+        raise StatementRowError(f"valor inválido '{value}'")
+    return amount
+
+
+def _parse_date(value: str) -> date:
+    raw = (value or '').strip()
+    for fmt in _CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    # OFX: AAAAMMDD[HHMMSS[.XXX]][fuso]
+    if len(raw) >= 8 and raw[:8].isdigit():
+        try:
+            return datetime.strptime(raw[:8], '%Y%m%d').date()
+        except ValueError:
+            pass
+    raise StatementRowError(f"data inválida '{value}'")
+
+
+def iter_csv_statement(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Linhas de um CSV com cabeçalho `date,description,amount[,type][,category]`.
+
+    Aceita `;` como separador e os nomes de coluna em português
+    (data, descricao, valor, tipo, categoria).
+    """
+    lines = iter(lines)
+    header = next(lines, '')
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    aliases = {
+        'data': 'date', 'descricao': 'description', 'descrição': 'description',
+        'valor': 'amount', 'tipo': 'type', 'categoria': 'category',
+    }
+    fields = [
+        aliases.get(name.strip().lower(), name.strip().lower())
+        for name in next(csv.reader([header], delimiter=delimiter), [])
+    ]
+    for line_number, values in enumerate(csv.reader(lines, delimiter=delimiter), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        yield line_number, dict(zip(fields, values))
+
+
+def iter_ofx_statement(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lançamentos (<STMTTRN>) de um extrato OFX, SGML ou XML.
+
+    Lê linha a linha e aceita várias tags na mesma linha, como no OFX 2.x
+    compactado.
+    """
+    current = None
+    for line_number, line in enumerate(lines, start=1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield current.pop('_line'), current
+                    current = None
+                elif not closing:
+                    current = {'_line': line_number}
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+    if current is not None:
+        yield current.pop('_line'), current
+
+
+def _ofx_row(raw: Dict[str, str]) -> Dict[str, str]:
+    return {
+        'date': raw.get('DTPOSTED', ''),
+        'description': raw.get('MEMO') or raw.get('NAME') or '',
+        'amount': raw.get('TRNAMT', ''),
+        'type': '',
+        'category': '',
+    }
+
+
+class CategoryResolver:
+    """Resolve nomes de categoria (sem diferenciar maiúsculas) com uma única consulta."""
+
+    def __init__(self, user):
+        self._by_key = {}
+        categories = Category.objects.filter(
+            Q(user=user) | Q(user__isnull=True)
+        ).order_by(F('user_id').asc(nulls_first=True)).values('id', 'name', 'type')
+        for category in categories:
+            # Globais (user nulo) primeiro, em qualquer banco: as do usuário vêm
+            # por último e prevalecem
+            self._by_key[(category['name'].strip().lower(), category['type'])] = category['id']
+
+    def resolve(self, name: str, tx_type: str) -> Optional[int]:
+        if not name:
+            return None
+        return self._by_key.get((name.strip().lower(), tx_type))
+
+
+def _build_transaction(user, raw: Dict[str, str], categories: CategoryResolver, max_date: date) -> Transaction:
+    amount = _parse_amount(raw.get('amount', ''))
+    tx_type = _TYPE_ALIASES.get((raw.get('type') or '').strip().upper())
+    if tx_type is None:
+        tx_type = Transaction.TransactionType.EXPENSE if amount < 0 else Transaction.TransactionType.INCOME
+    amount = abs(amount)
+    if amount > MAX_AMOUNT:
+        raise StatementRowError('valor excede o limite máximo')
+    try:
+        amount = amount.quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise StatementRowError(f"valor inválido '{raw.get('amount')}'")
+
+    if amount == 0:
+        raise StatementRowError('valor deve ser maior que zero')
+
+    tx_date = _parse_date(raw.get('date', ''))
+    if tx_date > max_date:
+        raise StatementRowError(f'data {tx_date.isoformat()} muito distante no futuro')
+
+    description = (raw.get('description') or '').strip()[:MAX_DESCRIPTION_LENGTH]
+    if not description:
+        raise StatementRowError('descrição vazia')
+
+    return Transaction(
+        user=user,
+        type=tx_type,
+        amount=amount,
+        date=tx_date,
+        description=description,
+        category_id=categories.resolve(raw.get('category', ''), tx_type),
+    )
+
+
+def _duplicate_key(tx) -> tuple:
+    return (tx.date, tx.type, tx.amount, tx.description)
+
+
+def _save_batch(user, batch: List[Transaction]) -> int:
+    """
+    Grava um lote com bulk_create e atualiza o consolidado mensal.
+
+    Lançamentos iguais (data, tipo, valor, descrição) a transações já
+    existentes são ignorados na mesma quantidade em que já existem, então
+    reimportar o mesmo extrato não duplica nada.
+    """
+    existing = Counter(
+        (row['date'], row['type'], row['amount'], row['description'])
+        for row in Transaction.objects.filter(
+            user=user,
+            date__gte=min(tx.date for tx in batch),
+            date__lte=max(tx.date for tx in batch),
+            amount__in={tx.amount for tx in batch},
+        ).values('date', 'type', 'amount', 'description')
+    )
+
+    new = []
+    for tx in batch:
+        key = _duplicate_key(tx)
+        if existing[key] > 0:
+            existing[key] -= 1
+            continue
+        new.append(tx)
+
+    ledger = defaultdict(lambda: [Decimal('0'), 0])
+    for tx in new:
+        entry = ledger[(tx.date.replace(day=1), tx.type, tx.category_id)]
+        entry[0] += tx.amount
+        entry[1] += 1
+
+    with transaction.atomic():
+        Transaction.objects.bulk_create(new, batch_size=IMPORT_BATCH_SIZE)
+        for (month, tx_type, category_id), (amount, count) in ledger.items():
+            UserMonthlyLedger.objects.apply(user.id, month, tx_type, category_id, amount, count)
+
+    return len(new)
+
+
+def import_transactions(
+    user,
+    lines: Iterable[str],
+    statement_format: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Importa um extrato CSV ou OFX para o usuário.
+
+    As linhas são lidas em streaming e gravadas em lotes de
+    IMPORT_BATCH_SIZE com bulk_create, sem passar por Transaction.save() nem
+    pelos signals de post_save; o consolidado mensal é atualizado por lote.
+    Recalcular missões e indicadores fica a cargo de quem chama, uma vez ao
+    final. `progress(processed, created)` é chamado após cada lote.
+    """
+    if statement_format not in IMPORT_FORMATS:
+        raise ValueError(f"Formato não suportado: {statement_format}")
+
+    if statement_format == 'ofx':
+        rows = ((line, _ofx_row(raw)) for line, raw in iter_ofx_statement(lines))
+    else:
+        rows = iter_csv_statement(lines)
+
+    categories = CategoryResolver(user)
+    max_date = timezone.now().date() + timedelta(days=MAX_FUTURE_DATE_YEARS * 365)
+
+    processed = 0
+    created = 0
+    skipped = 0
+    errors = []
+    batch = []
+
+    def flush():
+        nonlocal created, skipped
+        if not batch:
+            return
+        saved = _save_batch(user, batch)
+        created += saved
+        skipped += len(batch) - saved
+        batch.clear()
+        if progress is not None:
+            progress(processed, created)
+
+    for line_number, raw in rows:
+        processed += 1
+        try:
+            batch.append(_build_transaction(user, raw, categories, max_date))
+        except StatementRowError as e:
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({'line': line_number, 'error': str(e)})
+            continue
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+
+    flush()
+
+    logger.info(
+        f"Importação de extrato ({statement_format}) do usuário {user.id}: "
+        f"{created} criadas, {skipped} duplicadas, {processed - created - skipped} com erro"
+    )
+
+    return {
+        'format': statement_format,
+        'processed': processed,
+        'created': created,
+        'skipped_duplicates': skipped,
+        'failed': processed - created - skipped,
+        'errors': errors,
+    }
@@ -6,177 +6,173 @@ from decimal import Decimal
 from typing import Any, Dict, List
 
 from dateutil.relativedelta import relativedelta
-from django.db.models import Sum
-from django.db.models.functions import Coalesce, TruncMonth
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from ..models import Category, Transaction, TransactionLink, UserProfile
+from ..models import (
+    CACHE_EXPIRATION_SECONDS,
+    Category,
+    Transaction,
+    TransactionLink,
+    UserMonthlyLedger,
+    UserProfile,
+)
 from .base import _decimal, logger
+from .memo import bump_data_version, memoize_for_user
+from .recurrence import projected_monthly_totals
 
 
-def calculate_summary(user) -> Dict[str, Decimal]:
-    profile, _ = UserProfile.objects.get_or_create(user=user)
-    
-    today = timezone.now().date()
-    start_date = today.replace(day=1)  # Calendar Month (1st of current month)
-    
-    # total_aportes is always calculated (not cached)
-    total_aportes = _decimal(
-        Transaction.objects.filter(
-            user=user,
-            type=Transaction.TransactionType.EXPENSE,
-            date__gte=start_date,
-            date__lte=today,
-            category__group__in=[
-                Category.CategoryGroup.SAVINGS,
-                Category.CategoryGroup.INVESTMENT
-            ]
-        ).aggregate(total=Coalesce(Sum('amount'), Decimal("0")))['total']
-    )
-    
-    if not profile.should_recalculate_indicators():
-        # Check if there are essential expenses for the cached period
-        has_essential = Transaction.objects.filter(
-            user=user,
-            category__group=Category.CategoryGroup.ESSENTIAL_EXPENSE,
-            type=Transaction.TransactionType.EXPENSE,
-            date__gte=start_date,
-            date__lte=today,
-        ).exists()
-        
-        return {
-            "tps": profile.cached_tps or Decimal("0.00"),
-            "rdr": profile.cached_rdr or Decimal("0.00"),
-            "ili": profile.cached_ili or Decimal("0.00"),
-            "total_income": profile.cached_total_income or Decimal("0.00"),
-            "total_expense": profile.cached_total_expense or Decimal("0.00"),
-            "total_aportes": total_aportes.quantize(Decimal("0.01")),
-            "has_essential_expenses": has_essential,
-        }
-    
-    today = timezone.now().date()
-    start_date = today.replace(day=1)  # Calendar Month (1st of current month)
-    
-    total_income = _decimal(
-        Transaction.objects.filter(
-            user=user,
-            type=Transaction.TransactionType.INCOME,
-            date__gte=start_date,
-            date__lte=today
-        ).aggregate(total=Coalesce(Sum('amount'), Decimal("0")))['total']
-    )
+_RESERVE_GROUPS = (
+    Category.CategoryGroup.SAVINGS,
+    Category.CategoryGroup.INVESTMENT,
+)
 
-    total_expense = _decimal(
-        Transaction.objects.filter(
-            user=user,
-            type=Transaction.TransactionType.EXPENSE,
-            date__gte=start_date,
-            date__lte=today
-        ).exclude(
-            category__group__in=[
-                Category.CategoryGroup.SAVINGS,
-                Category.CategoryGroup.INVESTMENT
-            ]
-        ).aggregate(total=Coalesce(Sum('amount'), Decimal("0")))['total']
+
+def _summary_totals(user, start_date: date, end_date: date) -> Dict[str, Decimal]:
+    """
+    Calcula os totais do período em uma única agregação condicional.
+
+    Os totais ficam restritos a [start_date, end_date] direto nas transações,
+    pois lançamentos futuros do mês corrente não entram no resumo.
+    """
+    is_income = Q(type=Transaction.TransactionType.INCOME)
+    is_expense = Q(type=Transaction.TransactionType.EXPENSE)
+    is_reserve = Q(category__group__in=_RESERVE_GROUPS)
+    is_essential = Q(category__group=Category.CategoryGroup.ESSENTIAL_EXPENSE)
+
+    def _total(condition: Q):
+        return Coalesce(Sum("amount", filter=condition), Decimal("0"))
+
+    totals = Transaction.objects.filter(
+        user=user,
+        date__gte=start_date,
+        date__lte=end_date,
+    ).aggregate(
+        total_income=_total(is_income),
+        total_expense=_total(is_expense & ~is_reserve),
+        total_aportes=_total(is_expense & is_reserve),
+        essential_expense=_total(is_expense & is_essential),
     )
+    return {key: _decimal(value) for key, value in totals.items()}
 
-    total_aportes = _decimal(
-        Transaction.objects.filter(
-            user=user,
-            type=Transaction.TransactionType.EXPENSE,
-            date__gte=start_date,
-            date__lte=today,
-            category__group__in=[
-                Category.CategoryGroup.SAVINGS,
-                Category.CategoryGroup.INVESTMENT
-            ]
-        ).aggregate(total=Coalesce(Sum('amount'), Decimal("0")))['total']
+
+def _reserve_balance(user) -> Decimal:
+    """Saldo histórico da reserva (aportes menos resgates) via consolidado mensal."""
+    totals = UserMonthlyLedger.objects.filter(
+        user=user,
+        category__group__in=_RESERVE_GROUPS,
+    ).aggregate(
+        deposits=Coalesce(
+            Sum("total_amount", filter=Q(type=Transaction.TransactionType.EXPENSE)),
+            Decimal("0"),
+        ),
+        withdrawals=Coalesce(
+            Sum("total_amount", filter=Q(type=Transaction.TransactionType.INCOME)),
+            Decimal("0"),
+        ),
     )
+    return _decimal(totals["deposits"]) - _decimal(totals["withdrawals"])
 
-    source_transaction_ids = Transaction.objects.filter(
+
+def _debt_payments_total(user, start_date: date, end_date: date) -> Decimal:
+    period_sources = Transaction.objects.filter(
         user=user,
         date__gte=start_date,
-        date__lte=today
-    ).values_list('id', flat=True)
-    
-    debt_payments = _decimal(
+        date__lte=end_date,
+    ).values("id")
+
+    return _decimal(
         TransactionLink.objects.filter(
             user=user,
-            source_transaction_uuid__in=source_transaction_ids,
-            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT
-        ).aggregate(total=Coalesce(Sum('linked_amount'), Decimal("0")))['total']
+            source_transaction_uuid__in=period_sources,
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+        ).aggregate(total=Coalesce(Sum("linked_amount"), Decimal("0")))["total"]
     )
-    
-    reserve_transactions = Transaction.objects.filter(
-        user=user, 
-        category__group__in=[
-            Category.CategoryGroup.SAVINGS,
-            Category.CategoryGroup.INVESTMENT
-        ]
-    ).values("type").annotate(total=Sum("amount"))
-    
-    reserve_deposits = Decimal("0")
-    reserve_withdrawals = Decimal("0")
-    
-    for item in reserve_transactions:
-        tx_type = item["type"]
-        total = _decimal(item["total"])
-        if tx_type == Transaction.TransactionType.EXPENSE:
-            reserve_deposits += total
-        elif tx_type == Transaction.TransactionType.INCOME:
-            reserve_withdrawals += total
-
-    reserve_balance = reserve_deposits - reserve_withdrawals
-
-    essential_expense = _decimal(
-        Transaction.objects.filter(
-            user=user,
-            category__group=Category.CategoryGroup.ESSENTIAL_EXPENSE,
-            type=Transaction.TransactionType.EXPENSE,
-            date__gte=start_date,
-            date__lte=today,
-        ).aggregate(total=Coalesce(Sum("amount"), Decimal("0")))["total"]
+
+
+def _store_cached_indicators(user, summary: Dict[str, Decimal]) -> None:
+    """
+    Persiste os indicadores no UserProfile quando o cache expirou ou quando
+    os valores mudaram.
+
+    Um único UPDATE condicional substitui o get_or_create + save: dentro do
+    TTL e com os mesmos valores nenhuma linha é afetada. Comparar os valores
+    dispensa zerar `indicators_updated_at` a cada escrita do usuário.
+    """
+    now = timezone.now()
+    ttl = getattr(settings, "INDICATORS_CACHE_TTL", CACHE_EXPIRATION_SECONDS)
+    UserProfile.objects.filter(user=user).filter(
+        Q(indicators_updated_at__isnull=True)
+        | Q(indicators_updated_at__lt=now - timedelta(seconds=ttl))
+        | ~Q(
+            cached_tps=summary["tps"],
+            cached_rdr=summary["rdr"],
+            cached_ili=summary["ili"],
+            cached_total_income=summary["total_income"],
+            cached_total_expense=summary["total_expense"],
+        )
+    ).update(
+        cached_tps=summary["tps"],
+        cached_rdr=summary["rdr"],
+        cached_ili=summary["ili"],
+        cached_total_income=summary["total_income"],
+        cached_total_expense=summary["total_expense"],
+        indicators_updated_at=now,
     )
 
+
+def calculate_summary(user) -> Dict[str, Decimal]:
+    """
+    Resumo de indicadores do mês corrente.
+
+    Dentro de um escopo `request_memo` o cálculo roda uma vez por usuário e
+    versão de dados; validadores, serializers e análises compartilham o valor.
+    """
+    summary = memoize_for_user("summary", user.id, lambda: _compute_summary(user))
+    return dict(summary)
+
+
+def _compute_summary(user) -> Dict[str, Decimal]:
+    today = timezone.now().date()
+    start_date = today.replace(day=1)  # Calendar Month (1st of current month)
+
+    totals = _summary_totals(user, start_date, today)
+    total_income = totals["total_income"]
+    total_expense = totals["total_expense"]
+    essential_expense = totals["essential_expense"]
+
     tps = Decimal("0")
     rdr = Decimal("0")
     ili = Decimal("0")
-    
+
     if total_income > 0:
+        debt_payments = _debt_payments_total(user, start_date, today)
         savings = total_income - total_expense
         tps = (savings / total_income) * Decimal("100")
         rdr = (debt_payments / total_income) * Decimal("100")
-    
-    if essential_expense > 0:
-        ili = reserve_balance / essential_expense
-
-    profile.cached_tps = tps.quantize(Decimal("0.01")) if total_income > 0 else Decimal("0.00")
-    profile.cached_rdr = rdr.quantize(Decimal("0.01")) if total_income > 0 else Decimal("0.00")
-    profile.cached_ili = ili.quantize(Decimal("0.01")) if essential_expense > 0 else Decimal("0.00")
-    profile.cached_total_income = total_income.quantize(Decimal("0.01"))
-    profile.cached_total_expense = total_expense.quantize(Decimal("0.01"))
-    profile.indicators_updated_at = timezone.now()
-    profile.save(update_fields=[
-        'cached_tps',
-        'cached_rdr', 
-        'cached_ili', 
-        'cached_total_income',
-        'cached_total_expense',
-        'indicators_updated_at'
-    ])
 
-    return {
-        "tps": profile.cached_tps,
-        "rdr": profile.cached_rdr,
-        "ili": profile.cached_ili,
-        "total_income": profile.cached_total_income,
-        "total_expense": profile.cached_total_expense,
-        "total_aportes": total_aportes.quantize(Decimal("0.01")),
+    if essential_expense > 0:
+        ili = _reserve_balance(user) / essential_expense
+
+    summary = {
+        "tps": tps.quantize(Decimal("0.01")),
+        "rdr": rdr.quantize(Decimal("0.01")),
+        "ili": ili.quantize(Decimal("0.01")),
+        "total_income": total_income.quantize(Decimal("0.01")),
+        "total_expense": total_expense.quantize(Decimal("0.01")),
+        "total_aportes": totals["total_aportes"].quantize(Decimal("0.01")),
         "has_essential_expenses": essential_expense > 0,
     }
 
+    _store_cached_indicators(user, summary)
+
+    return summary
+
 
 def invalidate_indicators_cache(user) -> None:
+    bump_data_version(user.id)
     try:
         profile = UserProfile.objects.get(user=user)
         profile.indicators_updated_at = None
@@ -297,9 +293,11 @@ def indicator_insights(summary: Dict[str, Decimal], profile: UserProfile) -> Dic
 def category_breakdown(user) -> Dict[str, List[Dict[str, str]]]:
     buckets: Dict[str, List[Dict[str, str]]] = defaultdict(list)
     queryset = (
-        Transaction.objects.filter(user=user, category__isnull=False)
+        UserMonthlyLedger.objects.filter(
+            user=user, category__isnull=False, transaction_count__gt=0
+        )
         .values("category__name", "type", "category__group")
-        .annotate(total=Coalesce(Sum("amount"), Decimal("0")))
+        .annotate(total=Coalesce(Sum("total_amount"), Decimal("0")))
         .order_by("category__name")
     )
 
@@ -333,10 +331,11 @@ def cashflow_series(user, months: int = 6) -> List[Dict[str, str]]:
     first_day = (now.replace(day=1) - timedelta(days=months * 31)).replace(day=1)
     
     data = (
-        Transaction.objects.filter(user=user, date__gte=first_day)
-        .annotate(month=TruncMonth("date"))
+        UserMonthlyLedger.objects.filter(
+            user=user, month__gte=first_day, transaction_count__gt=0
+        )
         .values("month", "type", "category__group")
-        .annotate(total=Sum("amount"))
+        .annotate(total=Sum("total_amount"))
     )
 
     buckets: Dict[date, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
@@ -353,39 +352,8 @@ def cashflow_series(user, months: int = 6) -> List[Dict[str, str]]:
         else:
             buckets[month][item["type"]] += _decimal(item["total"])
 
-    recurrence_projections: Dict[date, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
-    
-    from django.db.models import Q
-    from django.db.models.functions import ExtractYear, ExtractMonth
-    
-    active_recurrences = Transaction.objects.filter(
-        user=user,
-        is_recurring=True,
-    ).filter(
-        Q(recurrence_end_date__isnull=True) | Q(recurrence_end_date__gte=now)
-    ).select_related('category')
-    
-    for transaction in active_recurrences:
-        projection_month = current_month
-        for _ in range(3):
-            projection_month = projection_month + timedelta(days=32)
-            projection_month = projection_month.replace(day=1)
-            
-            # Track aportes separately in projections
-            if transaction.type == Transaction.TransactionType.EXPENSE and transaction.category and transaction.category.group in [Category.CategoryGroup.SAVINGS, Category.CategoryGroup.INVESTMENT]:
-                recurrence_projections[projection_month]["APORTES"] += transaction.amount
-                continue
-
-            if transaction.recurrence_unit == Transaction.RecurrenceUnit.MONTHS:
-                recurrence_projections[projection_month][transaction.type] += transaction.amount
-            elif transaction.recurrence_unit == Transaction.RecurrenceUnit.WEEKS:
-                recurrence_projections[projection_month][transaction.type] += transaction.amount * 4
-            elif transaction.recurrence_unit == Transaction.RecurrenceUnit.DAYS:
-                if transaction.recurrence_value:
-                    occurrences_per_month = 30 // transaction.recurrence_value
-                    recurrence_projections[projection_month][transaction.type] += transaction.amount * occurrences_per_month
-                else:
-                    recurrence_projections[projection_month][transaction.type] += transaction.amount * 30
+    # Ocorrências futuras pré-calculadas (ver services.recurrence)
+    recurrence_projections = projected_monthly_totals(user, months=3)
 
     # Get IDs of potential source transactions in the date range
     source_tx_qs = Transaction.objects.filter(
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from ..models import Transaction, UserMonthlyLedger
+from .base import _decimal, logger
+
+LEDGER_BATCH_SIZE = 1000
+
+
+def rebuild_monthly_ledger(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula o UserMonthlyLedger a partir das transações ativas.
+
+    Sem `user_ids`, reconstrói o consolidado de todos os usuários. Retorna o
+    número de linhas gravadas.
+    """
+    transactions = Transaction.objects.all()
+    ledger = UserMonthlyLedger.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        transactions = transactions.filter(user_id__in=user_ids)
+        ledger = ledger.filter(user_id__in=user_ids)
+
+    rows = (
+        transactions.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "month", "type", "category_id")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+
+    entries = []
+    for row in rows.iterator(chunk_size=LEDGER_BATCH_SIZE):
+        month = row["month"]
+        if isinstance(month, datetime):
+            month = month.date()
+        entries.append(
+            UserMonthlyLedger(
+                user_id=row["user_id"],
+                month=month,
+                type=row["type"],
+                category_id=row["category_id"],
+                total_amount=_decimal(row["total"]),
+                transaction_count=row["count"],
+            )
+        )
+
+    with transaction.atomic():
+        ledger.delete()
+        UserMonthlyLedger.objects.bulk_create(entries, batch_size=LEDGER_BATCH_SIZE)
+
+    logger.info(f"Consolidado mensal reconstruído: {len(entries)} linhas")
+    return len(entries)
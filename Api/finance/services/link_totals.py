@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Transaction, TransactionLink
+from .base import logger
+
+LINK_TOTALS_BATCH_SIZE = 1000
+
+
+def _link_sum(uuid_field: str) -> Coalesce:
+    links = (
+        TransactionLink.objects.filter(**{uuid_field: OuterRef("id")})
+        .order_by()
+        .values(uuid_field)
+        .annotate(total=Sum("linked_amount"))
+        .values("total")
+    )
+    decimal_field = DecimalField(max_digits=12, decimal_places=2)
+    return Coalesce(
+        Subquery(links, output_field=decimal_field),
+        Value(Decimal("0")),
+        output_field=decimal_field,
+    )
+
+
+def find_link_total_drift(user_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Lista transações cujo linked_total/received_total difere da soma dos vínculos.
+
+    Sem `user_ids`, confere todos os usuários.
+    """
+    transactions = Transaction.all_objects.all()
+    if user_ids is not None:
+        transactions = transactions.filter(user_id__in=list(user_ids))
+
+    rows = (
+        transactions.order_by()
+        .annotate(
+            expected_linked=_link_sum("source_transaction_uuid"),
+            expected_received=_link_sum("target_transaction_uuid"),
+        )
+        .values("id", "user_id", "linked_total", "received_total", "expected_linked", "expected_received")
+    )
+
+    drift = []
+    for row in rows.iterator(chunk_size=LINK_TOTALS_BATCH_SIZE):
+        if row["linked_total"] != row["expected_linked"] or row["received_total"] != row["expected_received"]:
+            drift.append(row)
+    return drift
+
+
+def rebuild_link_totals(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Corrige linked_total/received_total a partir dos vínculos existentes.
+
+    Só as transações divergentes são gravadas. Retorna quantas foram corrigidas.
+    """
+    drift = find_link_total_drift(user_ids)
+
+    now = timezone.now()
+    with transaction.atomic():
+        for row in drift:
+            Transaction.all_objects.filter(id=row["id"]).update(
+                linked_total=row["expected_linked"],
+                received_total=row["expected_received"],
+                updated_at=now,
+            )
+
+    logger.info(f"Totais de vínculo corrigidos: {len(drift)} transações")
+    return len(drift)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+_request_memo: ContextVar[Optional[Dict[str, Dict]]] = ContextVar(
+    "finance_request_memo", default=None
+)
+
+
+@contextmanager
+def request_memo() -> Iterator[None]:
+    """
+    Abre um escopo de memoização (uma requisição ou uma task Celery).
+
+    Dentro do escopo, valores memoizados por usuário são reaproveitados até
+    que a versão de dados daquele usuário mude. Fora dele nada é guardado.
+    """
+    token = _request_memo.set({"versions": {}, "values": {}})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+def data_version(user_id: int) -> int:
+    memo = _request_memo.get()
+    if memo is None:
+        return 0
+    return memo["versions"].get(user_id, 0)
+
+
+def bump_data_version(user_id: int) -> None:
+    """Marca os dados do usuário como alterados no escopo atual."""
+    memo = _request_memo.get()
+    if memo is None:
+        return
+    memo["versions"][user_id] = memo["versions"].get(user_id, 0) + 1
+
+
+def memoize_for_user(name: str, user_id: int, compute: Callable[[], Any]) -> Any:
+    """
+    Retorna `compute()` memoizado por (name, user_id, versão de dados).
+
+    Sem escopo ativo apenas executa `compute()`.
+    """
+    memo = _request_memo.get()
+    if memo is None:
+        return compute()
+
+    key = (name, user_id, data_version(user_id))
+    if key not in memo["values"]:
+        memo["values"][key] = compute()
+    return memo["values"][key]
@@ -359,7 +359,7 @@ def assign_missions_automatically(user) -> List[MissionProgress]:
     return created_progress
 
 
-def _has_activity_since_start(user, started_at) -> bool:
+def _has_activity_since_start(user, started_at, context=None) -> bool:
     """
     Verifica se o usuário teve pelo menos 1 transação desde o início da missão.
     Isso evita completar missões automaticamente sem que o usuário tenha "trabalhado" nelas.
@@ -369,6 +369,9 @@ def _has_activity_since_start(user, started_at) -> bool:
     if not started_at:
         return False
     
+    if context is not None and context.covers(created_at__gte=started_at):
+        return context.has_activity_since(started_at)
+    
     return Transaction.objects.filter(
         user=user,
         created_at__gte=started_at
@@ -377,18 +380,26 @@ def _has_activity_since_start(user, started_at) -> bool:
 
 def update_mission_progress(user) -> List[MissionProgress]:
     from django.db import transaction
-    from ..mission_types import MissionValidatorFactory
+    from django.db.models import prefetch_related_objects
+    from ..mission_types import MetricsContext, MissionValidatorFactory
     
     with transaction.atomic():
-        active_missions = MissionProgress.objects.select_for_update().filter(
+        active_missions = MissionProgress.objects.select_for_update(of=('self',)).select_related(
+            'mission', 'mission__target_category'
+        ).filter(
             user=user,
             status__in=[MissionProgress.Status.PENDING, MissionProgress.Status.ACTIVE]
         )
         
-        if not active_missions:
-            return []
-        
         missions_to_update = list(active_missions)
+        
+        if not missions_to_update:
+            return []
+    
+    prefetch_related_objects(missions_to_update, 'mission__target_categories')
+    
+    # Transações e resumo carregados uma vez para todas as missões do usuário
+    context = MetricsContext.for_progresses(user, missions_to_update)
     
     updated = []
     
@@ -397,10 +408,11 @@ def update_mission_progress(user) -> List[MissionProgress]:
             validator = MissionValidatorFactory.create_validator(
                 progress.mission,
                 user,
-                progress
+                progress,
+                context
             )
             
-            result = validator.calculate_progress()
+            result = validator.evaluate()
             
             old_progress = float(progress.progress)
             new_progress = result['progress_percentage']
@@ -412,11 +424,11 @@ def update_mission_progress(user) -> List[MissionProgress]:
                 result['is_completed'] 
                 and not progress.completed_at
                 and progress.status == MissionProgress.Status.ACTIVE
-                and _has_activity_since_start(user, progress.started_at)
+                and _has_activity_since_start(user, progress.started_at, context)
             )
             
             if can_complete:
-                is_valid, message = validator.validate_completion()
+                is_valid, message = validator.validate_completion(result)
                 
                 if is_valid:
                     progress.completed_at = timezone.now()
@@ -504,7 +516,7 @@ def validate_mission_progress_manual(progress):
             progress
         )
         
-        result = validator.calculate_progress()
+        result = validator.evaluate()
         
         progress.progress = Decimal(str(result['progress_percentage']))
         
@@ -517,7 +529,7 @@ def validate_mission_progress_manual(progress):
         )
         
         if can_complete:
-            is_valid, message = validator.validate_completion()
+            is_valid, message = validator.validate_completion(result)
             
             if is_valid:
                 progress.status = MissionProgress.Status.COMPLETED
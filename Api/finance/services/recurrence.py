@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Category, ScheduledOccurrence, Transaction
+from .base import logger
+
+# Mês corrente e os três seguintes, o que a projeção do fluxo de caixa usa
+SCHEDULE_HORIZON_MONTHS = 4
+SCHEDULE_MAX_OCCURRENCES = 120
+SCHEDULE_USER_CHUNK = 500
+
+
+def add_months(start: date, months: int) -> date:
+    """Soma meses mantendo o dia de `start`, limitado ao fim do mês (31/01 -> 28/02)."""
+    return start + relativedelta(months=months)
+
+
+def occurrence_dates(
+    start: date,
+    unit: str,
+    value: int,
+    after: date,
+    until: date,
+    end_date: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> List[date]:
+    """
+    Datas exatas das ocorrências de uma recorrência no intervalo (after, until].
+
+    `start` é a data da própria transação (ocorrência zero, nunca incluída).
+    A primeira ocorrência depois de `after` é calculada diretamente pelo
+    índice, sem percorrer a série desde `start`; DAYS e WEEKS são progressões
+    aritméticas e MONTHS ancora cada ocorrência no dia original.
+    """
+    if not value or value < 1 or unit not in Transaction.RecurrenceUnit.values:
+        return []
+
+    last = until if end_date is None else min(until, end_date)
+    lower = max(after, start)
+    if last <= lower:
+        return []
+
+    if unit == Transaction.RecurrenceUnit.MONTHS:
+        elapsed = (lower.year - start.year) * 12 + lower.month - start.month
+        index = max(1, elapsed // value)
+        while add_months(start, index * value) <= lower:
+            index += 1
+
+        dates = []
+        while limit is None or len(dates) < limit:
+            occurrence = add_months(start, index * value)
+            if occurrence > last:
+                break
+            dates.append(occurrence)
+            index += 1
+        return dates
+
+    step = value * 7 if unit == Transaction.RecurrenceUnit.WEEKS else value
+    index = max(1, (lower - start).days // step + 1)
+    first = start + timedelta(days=index * step)
+    if first > last:
+        return []
+
+    count = (last - first).days // step + 1
+    if limit is not None:
+        count = min(count, limit)
+    return [first + timedelta(days=i * step) for i in range(count)]
+
+
+def _series_key(tx: Transaction) -> tuple:
+    return (tx.type, tx.category_id, tx.description, tx.amount, tx.recurrence_unit, tx.recurrence_value)
+
+
+def _expand(transactions: Iterable[Transaction], today: date, horizon: date) -> List[ScheduledOccurrence]:
+    # Cópias de uma mesma série (mesmo tipo, categoria, descrição, valor e
+    # frequência) são expandidas só a partir da mais recente, para não
+    # projetar a mesma conta várias vezes.
+    latest: Dict[tuple, Transaction] = {}
+    for tx in transactions:
+        key = (tx.user_id, *_series_key(tx))
+        if key not in latest or tx.date >= latest[key].date:
+            latest[key] = tx
+
+    occurrences = []
+    for tx in latest.values():
+        for occurrence in occurrence_dates(
+            tx.date,
+            tx.recurrence_unit,
+            tx.recurrence_value,
+            after=today,
+            until=horizon,
+            end_date=tx.recurrence_end_date,
+            limit=SCHEDULE_MAX_OCCURRENCES,
+        ):
+            occurrences.append(ScheduledOccurrence(
+                user_id=tx.user_id,
+                transaction=tx,
+                date=occurrence,
+                type=tx.type,
+                amount=tx.amount,
+                category_id=tx.category_id,
+                description=tx.description,
+            ))
+    return occurrences
+
+
+def refresh_scheduled_occurrences(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula as ocorrências futuras (até o fim do SCHEDULE_HORIZON_MONTHS-ésimo
+    mês, contando o atual) dos usuários.
+
+    As linhas de cada usuário são substituídas em uma transação. Sem
+    `user_ids`, processa todos em lotes de SCHEDULE_USER_CHUNK usuários e
+    remove as linhas de quem não tem mais recorrências. Retorna o número de
+    ocorrências geradas.
+    """
+    today = timezone.localdate()
+    horizon = add_months(today.replace(day=1), SCHEDULE_HORIZON_MONTHS) - timedelta(days=1)
+
+    recurring = Transaction.objects.filter(
+        is_recurring=True,
+        recurrence_unit__isnull=False,
+        recurrence_value__gte=1,
+    ).filter(
+        Q(recurrence_end_date__isnull=True) | Q(recurrence_end_date__gt=today)
+    ).only(
+        'id', 'user_id', 'type', 'amount', 'category_id', 'description', 'date',
+        'recurrence_unit', 'recurrence_value', 'recurrence_end_date',
+    )
+
+    if user_ids is None:
+        pending = sorted(set(recurring.values_list('user_id', flat=True).distinct()))
+        ScheduledOccurrence.objects.exclude(user_id__in=pending).delete()
+    else:
+        pending = list(user_ids)
+
+    generated = 0
+    for start in range(0, len(pending), SCHEDULE_USER_CHUNK):
+        chunk = pending[start:start + SCHEDULE_USER_CHUNK]
+        occurrences = _expand(recurring.filter(user_id__in=chunk), today, horizon)
+        with transaction.atomic():
+            ScheduledOccurrence.objects.filter(user_id__in=chunk).delete()
+            ScheduledOccurrence.objects.bulk_create(occurrences, batch_size=1000)
+        generated += len(occurrences)
+
+    logger.info(f"Ocorrências agendadas: {generated} geradas para {len(pending)} usuários")
+    return generated
+
+
+def upcoming_occurrences(user, days: int = 30, tx_type: Optional[str] = None):
+    """
+    Próximas ocorrências (de amanhã até `days` dias) lidas da tabela pré-calculada.
+
+    Ignora transações excluídas ou que deixaram de ser recorrentes desde a
+    última atualização.
+    """
+    today = timezone.localdate()
+    occurrences = ScheduledOccurrence.objects.filter(
+        user=user,
+        date__gt=today,
+        date__lte=today + timedelta(days=days),
+        transaction__deleted_at__isnull=True,
+        transaction__is_recurring=True,
+    )
+    if tx_type:
+        occurrences = occurrences.filter(type=tx_type)
+    return occurrences.select_related('category').order_by('date', 'description')
+
+
+def projected_monthly_totals(user, months: int = 3) -> Dict[date, Dict[str, Decimal]]:
+    """
+    Totais projetados por mês (primeiro dia) e tipo para os próximos `months` meses.
+
+    Despesas em categorias de poupança/investimento ficam em "APORTES".
+    """
+    current_month = timezone.localdate().replace(day=1)
+    first = add_months(current_month, 1)
+    last = add_months(current_month, months + 1) - timedelta(days=1)
+
+    rows = ScheduledOccurrence.objects.filter(
+        user=user,
+        date__gte=first,
+        date__lte=last,
+        transaction__deleted_at__isnull=True,
+        transaction__is_recurring=True,
+    ).values_list('date', 'type', 'amount', 'category__group')
+
+    totals: Dict[date, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    savings_groups = (Category.CategoryGroup.SAVINGS, Category.CategoryGroup.INVESTMENT)
+    for occurrence_date, tx_type, amount, group in rows:
+        month = occurrence_date.replace(day=1)
+        if tx_type == Transaction.TransactionType.EXPENSE and group in savings_groups:
+            totals[month]["APORTES"] += amount
+        else:
+            totals[month][tx_type] += amount
+    return totals
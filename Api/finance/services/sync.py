@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import (
+    Category,
+    MissionProgress,
+    SyncTombstone,
+    Transaction,
+    TransactionLink,
+    UserMonthlyLedger,
+)
+from .base import logger
+
+SYNC_MAX_ITEMS = 500
+SYNC_FIELDS = (
+    'type',
+    'description',
+    'amount',
+    'date',
+    'category_id',
+    'is_recurring',
+    'recurrence_value',
+    'recurrence_unit',
+    'recurrence_end_date',
+)
+SYNC_REQUIRED_FIELDS = ('type', 'description', 'amount', 'date')
+RECURRENCE_FIELDS = ('recurrence_value', 'recurrence_unit', 'recurrence_end_date')
+
+# Escritas que começaram antes do cursor podem ser confirmadas depois dele;
+# a busca volta um pouco no tempo e o cliente ignora o que já tem.
+SYNC_CURSOR_OVERLAP = timedelta(seconds=5)
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+_TOMBSTONE_GROUPS = {
+    SyncTombstone.Kind.TRANSACTION: 'transactions',
+    SyncTombstone.Kind.TRANSACTION_LINK: 'links',
+    SyncTombstone.Kind.CATEGORY: 'categories',
+    SyncTombstone.Kind.MISSION_PROGRESS: 'mission_progress',
+}
+
+
+_TOMBSTONE_KINDS = {
+    Transaction: SyncTombstone.Kind.TRANSACTION,
+    TransactionLink: SyncTombstone.Kind.TRANSACTION_LINK,
+    Category: SyncTombstone.Kind.CATEGORY,
+    MissionProgress: SyncTombstone.Kind.MISSION_PROGRESS,
+}
+
+
+def record_sync_tombstones(queryset) -> int:
+    """
+    Registra para `sync/changes/` a exclusão definitiva dos registros de
+    `queryset`, em lote; deve ser chamada na mesma transação e antes do
+    delete. Retorna o número de marcas gravadas.
+    """
+    kind = _TOMBSTONE_KINDS[queryset.model]
+    now = timezone.now()
+    tombstones = [
+        SyncTombstone(user_id=user_id, kind=kind, object_id=str(pk), deleted_at=now)
+        for user_id, pk in queryset.order_by().values_list('user_id', 'pk').iterator()
+    ]
+    SyncTombstone.objects.bulk_create(tombstones, batch_size=500)
+    return len(tombstones)
+
+
+def encode_sync_cursor(moment: datetime) -> str:
+    raw = json.dumps({'t': moment.isoformat()}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_sync_cursor(value: str) -> datetime:
+    """Converte o cursor de sincronização em datetime; ValueError se for inválido."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        moment = datetime.fromisoformat(position['t'])
+    except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+        raise ValueError('Cursor inválido.')
+    if timezone.is_naive(moment):
+        raise ValueError('Cursor inválido.')
+    return moment
+
+
+def _server_version(tx: Transaction) -> datetime:
+    # soft_delete() grava só deleted_at, então o tombstone também conta como edição
+    if tx.deleted_at is not None and tx.deleted_at > tx.updated_at:
+        return tx.deleted_at
+    return tx.updated_at
+
+
+def _error_detail(error: ValidationError) -> Dict[str, List[str]]:
+    if hasattr(error, 'error_dict'):
+        return error.message_dict
+    return {'non_field_errors': error.messages}
+
+
+def _apply_item(
+    user,
+    item: Dict[str, Any],
+    current: Optional[Transaction],
+    categories: Dict[int, Category],
+    now: datetime,
+):
+    """
+    Aplica um item sobre a transação atual (ou uma nova) sem gravar.
+
+    Retorna (status, transação). Levanta ValidationError com as mesmas regras
+    da API: Transaction.clean(), valor não menor que o já vinculado e sem
+    exclusão ou troca de tipo de transações com vínculos.
+    """
+    if item.get('deleted'):
+        if current is None or current.deleted_at is not None:
+            return 'unchanged', current
+        if current.linked_total or current.received_total:
+            raise ValidationError(
+                'Esta transação possui vínculos. Remova os vínculos antes de excluir.'
+            )
+        current.deleted_at = now
+        current.updated_at = now
+        return 'deleted', current
+
+    fields = {name: item[name] for name in SYNC_FIELDS if name in item}
+
+    category_id = fields.pop('category_id', None)
+    if category_id is not None and category_id not in categories:
+        raise ValidationError({'category_id': 'Categoria não encontrada.'})
+
+    if current is None:
+        missing = [name for name in SYNC_REQUIRED_FIELDS if name not in fields]
+        if missing:
+            raise ValidationError({name: 'Campo obrigatório.' for name in missing})
+        tx = Transaction(id=item['id'], user=user)
+        status = 'created'
+    else:
+        tx = current
+        status = 'updated'
+        # A edição local é mais recente que a exclusão no servidor
+        tx.deleted_at = None
+
+    previous_type = tx.type
+    for name, value in fields.items():
+        setattr(tx, name, value)
+    if 'category_id' in item:
+        tx.category = categories.get(category_id)
+
+    if not tx.is_recurring:
+        for name in RECURRENCE_FIELDS:
+            setattr(tx, name, None)
+
+    if current is not None:
+        if tx.type != previous_type and (tx.linked_total or tx.received_total):
+            raise ValidationError({'type': 'Não é possível alterar o tipo de uma transação com vínculos.'})
+        if tx.amount < tx.linked_amount:
+            raise ValidationError({
+                'amount': f'O novo valor ({tx.amount}) não pode ser menor que o já vinculado ({tx.linked_amount}).'
+            })
+
+    tx.clean()
+    tx.updated_at = now
+    return status, tx
+
+
+def sync_transactions(user, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplica um lote de transações criadas ou editadas offline.
+
+    Cada item é identificado pelo UUID gerado no dispositivo. Conflitos são
+    resolvidos por `updated_at`: se a versão do servidor for mais recente que
+    a edição local, o item volta como `conflict` e nada é gravado para ele.
+    Itens inválidos voltam como `error` sem impedir os demais.
+
+    Tudo é gravado em uma única transação com bulk_create/bulk_update, sem
+    passar por Transaction.save() nem pelos signals de post_save; o
+    consolidado mensal é atualizado uma vez por chave. Invalidar o cache e
+    recalcular missões fica a cargo de quem chama.
+
+    O `cursor` devolvido marca o início da sincronização e serve de `since`
+    para a próxima busca de alterações; as linhas gravadas aqui voltam nessa
+    busca, então o cliente deve tratá-las de forma idempotente pelo `id`.
+    """
+    now = timezone.now()
+    cursor = encode_sync_cursor(now)
+
+    category_ids = {item['category_id'] for item in items if item.get('category_id') is not None}
+    categories = {}
+    if category_ids:
+        categories = {
+            category.id: category
+            for category in Category.objects.filter(
+                Q(user=user) | Q(user__isnull=True),
+                id__in=category_ids,
+            ).select_related('user')
+        }
+
+    results = []
+    applied = []
+    created = []
+    updated = []
+
+    with transaction.atomic():
+        existing = {
+            tx.id: tx
+            for tx in Transaction.all_objects.select_for_update().filter(
+                id__in={item['id'] for item in items}
+            )
+        }
+
+        seen = set()
+        for item in items:
+            tx_id = item['id']
+            result = {'id': str(tx_id)}
+            results.append(result)
+
+            current = existing.get(tx_id)
+            if tx_id in seen:
+                result.update(status='error', errors={'id': ['Identificador repetido no lote.']})
+                continue
+            seen.add(tx_id)
+
+            if current is not None and current.user_id != user.id:
+                result.update(status='error', errors={'id': ['Identificador já utilizado.']})
+                continue
+
+            if current is not None and _server_version(current) > item['updated_at']:
+                result['status'] = 'conflict'
+                continue
+
+            try:
+                status, tx = _apply_item(user, item, current, categories, now)
+            except ValidationError as e:
+                result.update(status='error', errors=_error_detail(e))
+                continue
+
+            result['status'] = status
+            if status == 'created':
+                created.append(tx)
+            elif status != 'unchanged':
+                updated.append(tx)
+            if tx is not None:
+                applied.append((result, tx))
+
+        if created:
+            Transaction.objects.bulk_create(created, batch_size=SYNC_MAX_ITEMS)
+        if updated:
+            Transaction.all_objects.bulk_update(
+                updated,
+                [*SYNC_FIELDS, 'deleted_at', 'updated_at'],
+                batch_size=SYNC_MAX_ITEMS,
+            )
+
+        ledger = defaultdict(lambda: [Decimal('0'), 0])
+        for tx in created:
+            entry = tx.ledger_entry()
+            ledger[entry[:4]][0] += entry[4]
+            ledger[entry[:4]][1] += 1
+        for tx in updated:
+            previous = tx._ledger_snapshot
+            current = tx.ledger_entry()
+            if previous == current:
+                continue
+            if previous is not None:
+                ledger[previous[:4]][0] -= previous[4]
+                ledger[previous[:4]][1] -= 1
+            if current is not None:
+                ledger[current[:4]][0] += current[4]
+                ledger[current[:4]][1] += 1
+
+        for (user_id, month, tx_type, category_id), (amount, count) in ledger.items():
+            if amount or count:
+                UserMonthlyLedger.objects.apply(user_id, month, tx_type, category_id, amount, count)
+
+    # bulk_create preenche updated_at (auto_now) na gravação
+    for result, tx in applied:
+        result['updated_at'] = tx.updated_at
+
+    summary = Counter(result['status'] for result in results)
+    logger.info(
+        f"Sincronização do usuário {user.id}: {len(items)} itens, "
+        + ', '.join(f'{count} {status}' for status, count in sorted(summary.items()))
+    )
+
+    return {
+        'cursor': cursor,
+        'results': results,
+        'summary': dict(summary),
+        'changed': bool(created or updated),
+        'recurring_changed': any(tx.is_recurring for tx in created + updated),
+    }
+
+
+def collect_sync_changes(user, since: Optional[datetime]) -> Dict[str, Any]:
+    """
+    Registros do usuário alterados desde `since` (vindo de decode_sync_cursor).
+
+    Retorna querysets de transações, vínculos, categorias (do usuário e
+    globais) e progresso de missões, mais os ids excluídos por tipo: soft
+    delete das transações e SyncTombstone para o que é apagado de fato.
+
+    Sem `since`, ou com um cursor mais antigo que a retenção das marcas de
+    exclusão, devolve tudo com `full=True`: o cliente substitui o estado local.
+    """
+    now = timezone.now()
+    retention = now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+    full = since is None or since < retention
+
+    transactions = Transaction.objects.filter(user=user)
+    links = TransactionLink.objects.filter(user=user)
+    categories = Category.objects.filter(Q(user=user) | Q(user__isnull=True))
+    progress = MissionProgress.objects.filter(user=user).select_related('mission')
+    deleted = {group: [] for group in _TOMBSTONE_GROUPS.values()}
+
+    if not full:
+        threshold = since - SYNC_CURSOR_OVERLAP
+        transactions = transactions.filter(updated_at__gte=threshold)
+        links = links.filter(updated_at__gte=threshold)
+        categories = categories.filter(updated_at__gte=threshold)
+        progress = progress.filter(Q(updated_at__gte=threshold) | Q(mission__updated_at__gte=threshold))
+
+        deleted['transactions'].extend(
+            str(tx_id) for tx_id in Transaction.all_objects.filter(
+                user=user, deleted_at__gte=threshold
+            ).values_list('id', flat=True)
+        )
+        tombstones = SyncTombstone.objects.filter(
+            Q(user=user) | Q(user__isnull=True, kind=SyncTombstone.Kind.CATEGORY),
+            deleted_at__gte=threshold,
+        ).values_list('kind', 'object_id')
+        for kind, object_id in tombstones:
+            deleted[_TOMBSTONE_GROUPS[kind]].append(object_id)
+
+    return {
+        'cursor': encode_sync_cursor(now),
+        'full': full,
+        'transactions': transactions.select_related('category').with_link_totals(),
+        'links': links.order_by('-created_at'),
+        'categories': categories.order_by('name'),
+        'mission_progress': progress,
+        'deleted': deleted,
+    }
+
+
+def prune_sync_tombstones(days: int = SYNC_TOMBSTONE_RETENTION_DAYS) -> int:
+    """Remove marcas de exclusão mais antigas que a retenção. Retorna quantas."""
+    cutoff = timezone.now() - timedelta(days=days)
+    removed, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return removed
@@ -1,87 +1,275 @@
 from __future__ import annotations
 
-from decimal import Decimal
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List
+from uuid import UUID
 
-from django.db.models import Sum
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from ..models import Transaction, TransactionLink
-from .base import logger
 from .indicators import invalidate_indicators_cache
 
+MAX_BULK_PAYMENTS = 100
+MAX_PAYMENT_AMOUNT = Decimal('999999999.99')
+
+
+def _recurring_source_key(tx: Transaction) -> tuple:
+    return (tx.type, tx.category_id, tx.description, tx.amount)
+
+
+def _recurring_target_key(tx: Transaction) -> tuple:
+    return (tx.category_id, tx.description, tx.amount)
+
 
 def auto_link_recurring_transactions(user) -> int:
-    links_created = 0
-    
-    recurring_links = TransactionLink.objects.filter(
-        user=user,
-        is_recurring=True
+    """
+    Replica vínculos recorrentes para as próximas ocorrências das transações.
+
+    Para cada vínculo com is_recurring=True cujas duas pontas são recorrentes,
+    procura a próxima ocorrência ainda não vinculada (mesmo tipo, categoria,
+    descrição e valor, data posterior) da origem e do destino e cria o mesmo
+    vínculo entre elas, se houver saldo.
+
+    Vínculos, transações recorrentes e vínculos existentes são carregados uma
+    vez; o casamento é feito em memória e os novos vínculos entram com
+    bulk_create, depois de reconferidos com as transações travadas.
+    Retorna o número de vínculos criados.
+    """
+    recurring_links = list(
+        TransactionLink.objects.filter(user=user, is_recurring=True).order_by('created_at')
     )
-    
+    if not recurring_links:
+        return 0
+
+    transactions = {
+        tx.id: tx
+        for tx in Transaction.objects.filter(user=user, is_recurring=True).order_by('date', 'created_at')
+    }
+
+    sources_by_key = defaultdict(list)
+    targets_by_key = defaultdict(list)
+    for tx in transactions.values():
+        sources_by_key[_recurring_source_key(tx)].append(tx)
+        targets_by_key[_recurring_target_key(tx)].append(tx)
+
+    claimed_sources = defaultdict(set)
+    claimed_targets = defaultdict(set)
+    for link_type, source_uuid, target_uuid in TransactionLink.objects.filter(user=user).values_list(
+        'link_type', 'source_transaction_uuid', 'target_transaction_uuid'
+    ):
+        claimed_sources[link_type].add(source_uuid)
+        claimed_targets[link_type].add(target_uuid)
+
+    def next_occurrence(candidates, after, claimed):
+        for tx in candidates:
+            if tx.date > after and tx.id not in claimed:
+                return tx
+        return None
+
+    candidates = []
+
     for link in recurring_links:
-        source = link.source_transaction
-        target = link.target_transaction
-        
-        if not (source.is_recurring and target.is_recurring):
+        source = transactions.get(link.source_transaction_uuid)
+        target = transactions.get(link.target_transaction_uuid)
+        if source is None or target is None:
             continue
-        
-        if source.recurrence_unit == Transaction.RecurrenceUnit.DAYS:
-            delta_days = source.recurrence_value
-        elif source.recurrence_unit == Transaction.RecurrenceUnit.WEEKS:
-            delta_days = source.recurrence_value * 7
-        elif source.recurrence_unit == Transaction.RecurrenceUnit.MONTHS:
-            delta_days = source.recurrence_value * 30
-        else:
+
+        if source.recurrence_unit not in Transaction.RecurrenceUnit.values:
             continue
-        
-        next_sources = Transaction.objects.filter(
-            user=user,
-            type=source.type,
-            category=source.category,
-            description=source.description,
-            amount=source.amount,
-            date__gt=source.date,
-            is_recurring=True,
-        ).exclude(
-            id__in=TransactionLink.objects.filter(
-                user=user,
-                link_type=link.link_type
-            ).values_list('source_transaction_uuid', flat=True)
+
+        next_source = next_occurrence(
+            sources_by_key[_recurring_source_key(source)], source.date, claimed_sources[link.link_type]
         )
-        
-        next_targets = Transaction.objects.filter(
-            user=user,
-            category=target.category,
-            description=target.description,
-            amount=target.amount,
-            date__gt=target.date,
-            is_recurring=True,
-        ).exclude(
-            id__in=TransactionLink.objects.filter(
-                user=user,
-                link_type=link.link_type
-            ).values_list('target_transaction_uuid', flat=True)
+        next_target = next_occurrence(
+            targets_by_key[_recurring_target_key(target)], target.date, claimed_targets[link.link_type]
         )
-        
-        for next_source in next_sources[:1]:
-            for next_target in next_targets[:1]:
-                if next_source.available_amount >= link.linked_amount:
-                    if next_target.available_amount >= link.linked_amount:
-                        try:
-                            TransactionLink.objects.create(
-                                user=user,
-                                source_transaction_uuid=next_source.id,
-                                target_transaction_uuid=next_target.id,
-                                linked_amount=link.linked_amount,
-                                link_type=link.link_type,
-                                description=f"Auto: {link.description}" if link.description else "Vinculação automática recorrente",
-                                is_recurring=True
-                            )
-                            links_created += 1
-                        except Exception as e:
-                            logger.error(f"Erro ao criar link automático: {e}")
-                            continue
-    
-    if links_created > 0:
-        invalidate_indicators_cache(user)
-    
-    return links_created
+        if next_source is None or next_target is None or next_source.id == next_target.id:
+            continue
+
+        amount = link.linked_amount
+        if next_source.available_amount < amount or next_target.available_amount < amount:
+            continue
+
+        candidates.append((link, next_source.id, next_target.id, amount))
+        claimed_sources[link.link_type].add(next_source.id)
+        claimed_targets[link.link_type].add(next_target.id)
+
+        # Saldo corrente para os próximos casamentos desta execução
+        next_source.linked_total += amount
+        next_target.received_total += amount
+
+    if not candidates:
+        return 0
+
+    transaction_ids = {tx_id for _, source_id, target_id, _ in candidates for tx_id in (source_id, target_id)}
+
+    with db_transaction.atomic():
+        # O casamento acima leu saldos sem trava; um vínculo manual, um
+        # pagamento em lote ou outra varredura podem ter usado o saldo ou a
+        # ocorrência no meio do caminho. Com as linhas travadas (em ordem de
+        # id, como nos pagamentos em lote), saldos e vínculos são relidos.
+        locked = {
+            tx.id: tx
+            for tx in Transaction.objects.select_for_update(of=('self',))
+            .filter(id__in=transaction_ids, user=user)
+            .order_by('id')
+        }
+        claimed = set(TransactionLink.objects.filter(user=user).filter(
+            Q(source_transaction_uuid__in=transaction_ids) | Q(target_transaction_uuid__in=transaction_ids)
+        ).values_list('link_type', 'source_transaction_uuid', 'target_transaction_uuid'))
+        claimed_sources = {(link_type, source_id) for link_type, source_id, _ in claimed}
+        claimed_targets = {(link_type, target_id) for link_type, _, target_id in claimed}
+
+        new_links = []
+        touched = {}
+        for link, source_id, target_id, amount in candidates:
+            source = locked.get(source_id)
+            target = locked.get(target_id)
+            if source is None or target is None:
+                continue
+            if (link.link_type, source_id) in claimed_sources or (link.link_type, target_id) in claimed_targets:
+                continue
+            if source.amount - source.linked_total < amount or target.amount - target.received_total < amount:
+                continue
+
+            source.linked_total += amount
+            target.received_total += amount
+            touched[source.id] = source
+            touched[target.id] = target
+
+            new_links.append(TransactionLink(
+                user=user,
+                source_transaction_uuid=source_id,
+                target_transaction_uuid=target_id,
+                linked_amount=amount,
+                link_type=link.link_type,
+                description=f"Auto: {link.description}" if link.description else "Vinculação automática recorrente",
+                is_recurring=True,
+            ))
+
+        if not new_links:
+            return 0
+
+        now = timezone.now()
+        for tx in touched.values():
+            tx.updated_at = now
+        TransactionLink.objects.bulk_create(new_links)
+        Transaction.all_objects.bulk_update(touched.values(), ['linked_total', 'received_total', 'updated_at'])
+
+    invalidate_indicators_cache(user)
+    return len(new_links)
+
+
+def _parse_bulk_payments(payments: List[Any]) -> List[tuple]:
+    parsed = []
+    for idx, payment in enumerate(payments):
+        if not isinstance(payment, dict):
+            raise ValueError(f"Pagamento #{idx+1} inválido: deve ser um objeto")
+
+        source_id = payment.get('source_id')
+        target_id = payment.get('target_id')
+        amount = payment.get('amount')
+
+        if not source_id or not target_id or amount is None:
+            raise ValueError(f"Pagamento #{idx+1} inválido: faltam campos obrigatórios")
+
+        try:
+            source_uuid = UUID(str(source_id))
+            target_uuid = UUID(str(target_id))
+        except (ValueError, AttributeError):
+            raise ValueError(f"Pagamento #{idx+1}: IDs devem ser UUIDs válidos")
+
+        if source_uuid == target_uuid:
+            raise ValueError(f"Pagamento #{idx+1}: source_id e target_id não podem ser iguais")
+
+        try:
+            amount = Decimal(str(amount))
+        except (ValueError, TypeError, InvalidOperation):
+            raise ValueError(f"Pagamento #{idx+1}: valor inválido '{amount}'")
+
+        if amount <= 0:
+            raise ValueError(f"Pagamento #{idx+1}: valor deve ser positivo")
+
+        if amount > MAX_PAYMENT_AMOUNT:
+            raise ValueError(f"Pagamento #{idx+1}: valor muito alto")
+
+        parsed.append((source_uuid, target_uuid, amount))
+    return parsed
+
+
+def create_bulk_payments(user, payments: List[Any], description: str) -> Dict[str, Any]:
+    """
+    Cria vários pagamentos (EXPENSE_PAYMENT) de forma atômica.
+
+    Todas as transações envolvidas são travadas em um único SELECT ... FOR
+    UPDATE ordenado por id, o que evita deadlock entre lotes concorrentes.
+    Os saldos são conferidos em memória: as próprias instâncias travadas
+    acumulam linked_total/received_total a cada pagamento, e ao final os
+    vínculos entram com bulk_create e os totais com um bulk_update.
+
+    Levanta ValueError com a mensagem do primeiro pagamento inválido.
+    """
+    from ..payment_validator import PaymentValidator
+
+    parsed = _parse_bulk_payments(payments)
+    transaction_ids = {tx_id for source, target, _ in parsed for tx_id in (source, target)}
+
+    with db_transaction.atomic():
+        locked = {
+            tx.id: tx
+            for tx in Transaction.objects.select_for_update(of=('self',))
+            .select_related('user')
+            .filter(id__in=transaction_ids, user=user)
+            .order_by('id')
+        }
+
+        validator = PaymentValidator(user)
+        links = []
+        touched = {}
+        fully_paid_expenses = []
+        total_amount = Decimal('0')
+
+        for idx, (source_id, target_id, amount) in enumerate(parsed):
+            source = locked.get(source_id)
+            target = locked.get(target_id)
+            if source is None or target is None:
+                raise ValueError(f"Pagamento #{idx+1}: transação não encontrada")
+
+            is_valid, errors = validator.validate_payment(source, target, amount)
+            if not is_valid:
+                error_messages = [f"{k}: {v}" for k, v in errors.items()]
+                raise ValueError(f"Pagamento #{idx+1}: {'; '.join(error_messages)}")
+
+            source.linked_total += amount
+            target.received_total += amount
+            touched[source.id] = source
+            touched[target.id] = target
+
+            links.append(TransactionLink(
+                user=user,
+                source_transaction_uuid=source_id,
+                target_transaction_uuid=target_id,
+                linked_amount=amount,
+                link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+                description=description,
+            ))
+            total_amount += amount
+            if target.available_amount == 0:
+                fully_paid_expenses.append(str(target_id))
+
+        now = timezone.now()
+        for tx in touched.values():
+            tx.updated_at = now
+        TransactionLink.objects.bulk_create(links)
+        Transaction.all_objects.bulk_update(touched.values(), ['linked_total', 'received_total', 'updated_at'])
+
+    return {
+        'links': links,
+        'total_amount': total_amount,
+        'sources_used': len({link.source_transaction_uuid for link in links}),
+        'targets_paid': len({link.target_transaction_uuid for link in links}),
+        'fully_paid_expenses': fully_paid_expenses,
+    }
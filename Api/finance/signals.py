@@ -1,11 +1,20 @@
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 import uuid
 
-from .models import Category, Transaction, TransactionLink, UserProfile
+from .models import (
+    Category,
+    Mission,
+    MissionProgress,
+    Transaction,
+    TransactionLink,
+    UserMonthlyLedger,
+    UserProfile,
+)
 
 
 from django.db.models import Q
@@ -102,24 +111,39 @@ def sync_user_profile(sender, instance, **kwargs):
 @receiver(post_save, sender=Transaction)
 def update_missions_on_transaction(sender, instance, created, **kwargs):
     """
-    Atualiza progresso das missões e atribui novas quando necessário após cada transação.
-    Executa após commit para evitar race conditions.
-    Transações agendadas (futuras) não atualizam progresso até a data efetiva.
+    Agenda o recálculo de missões do usuário após cada escrita de transação.
+    O job é assíncrono e coalescido por usuário (ver schedule_mission_recompute),
+    então rajadas de escritas geram um único recálculo.
+    Transações agendadas (futuras) também agendam: a atribuição de missões
+    vale para elas, e uma transação movida para o futuro precisa sair do
+    progresso. Os validadores só contam transações até a data de hoje.
     """
-    if created:
-        from django.db import transaction as db_transaction
-        
-        def update_after_commit():
-            from .services import update_mission_progress, assign_missions_automatically
-            
-            # Only update mission progress for non-scheduled (past/present) transactions
-            if not instance.is_scheduled:
-                update_mission_progress(instance.user)
-            
-            # Always assign new missions regardless of transaction date
-            assign_missions_automatically(instance.user)
-        
-        db_transaction.on_commit(update_after_commit)
+    from django.db import transaction as db_transaction
+    
+    def schedule_after_commit():
+        from .tasks import schedule_mission_recompute
+        schedule_mission_recompute(instance.user_id)
+    
+    db_transaction.on_commit(schedule_after_commit)
+
+
+@receiver(post_save, sender=Transaction)
+def refresh_schedule_on_recurring_transaction(sender, instance, **kwargs):
+    """
+    Agenda o recálculo das ocorrências futuras do usuário quando uma
+    transação recorrente é gravada. Transações que deixam de ser recorrentes
+    ou são excluídas já são ignoradas na leitura e saem na atualização diária.
+    """
+    if not instance.is_recurring:
+        return
+    
+    from django.db import transaction as db_transaction
+    
+    def refresh_after_commit():
+        from .tasks import schedule_occurrences_refresh
+        schedule_occurrences_refresh(instance.user_id)
+    
+    db_transaction.on_commit(refresh_after_commit)
 
 
 # ======= Signals para garantir UUID em novos registros =======
@@ -136,3 +160,110 @@ def ensure_transaction_link_uuid(sender, instance, **kwargs):
     """Garante que todo link tenha UUID antes de salvar."""
     if not instance.id:
         instance.id = uuid.uuid4()
+
+
+# ======= Versão de dados para memoização por requisição =======
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=TransactionLink)
+@receiver(post_delete, sender=TransactionLink)
+def bump_user_data_version(sender, instance, **kwargs):
+    """Invalida resumos memoizados no escopo atual após qualquer escrita."""
+    from .services.memo import bump_data_version
+
+    bump_data_version(instance.user_id)
+
+
+# ======= Consolidado mensal =======
+
+@receiver(pre_delete, sender=Category)
+def move_ledger_rows_to_uncategorized(sender, instance, **kwargs):
+    """
+    Transações de uma categoria removida ficam sem categoria (SET_NULL);
+    move os totais do consolidado para a linha sem categoria antes do CASCADE.
+    """
+    rows = UserMonthlyLedger.objects.filter(category=instance, transaction_count__gt=0)
+    for row in rows:
+        UserMonthlyLedger.objects.apply(
+            row.user_id, row.month, row.type, None,
+            row.total_amount, row.transaction_count,
+        )
+    UserMonthlyLedger.objects.filter(category=instance).delete()
+
+
+# ======= Sincronização incremental =======
+
+@receiver(pre_delete, sender=Category)
+def touch_transactions_of_deleted_category(sender, instance, **kwargs):
+    """O SET_NULL em transações não passa por save(); marca-as como alteradas."""
+    from django.utils import timezone
+
+    Transaction.all_objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+# ======= Pré-cálculo do dashboard =======
+
+# Campos do perfil que aparecem no dashboard
+DASHBOARD_PROFILE_FIELDS = {
+    'target_tps', 'target_rdr', 'target_ili',
+    'level', 'experience_points', 'is_first_access',
+}
+
+
+def _precompute_dashboard_after_commit(user_id, change):
+    def precompute():
+        from .services.cache_keys import bump_user_generation
+        from .services.dashboard import invalidate_dashboard_fragments
+        from .tasks import schedule_dashboard_precompute
+
+        invalidate_dashboard_fragments(user_id, change)
+        bump_user_generation(user_id)
+        schedule_dashboard_precompute(user_id)
+
+    transaction.on_commit(precompute)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=TransactionLink)
+@receiver(post_delete, sender=TransactionLink)
+@receiver(post_save, sender=MissionProgress)
+@receiver(post_delete, sender=MissionProgress)
+def precompute_dashboard_on_write(sender, instance, origin=None, **kwargs):
+    """
+    Remonta o dashboard em background depois que a escrita é confirmada.
+
+    Rajadas de escritas viram um único job por usuário (ver
+    schedule_dashboard_rebuild). Exclusões em cascata da conta são ignoradas.
+    """
+    user_model = get_user_model()
+    if isinstance(origin, user_model) or getattr(origin, 'model', None) is user_model:
+        return
+
+    changes = {
+        Transaction: 'transactions',
+        TransactionLink: 'links',
+        MissionProgress: 'missions',
+    }
+    _precompute_dashboard_after_commit(instance.user_id, changes[sender])
+
+
+@receiver(post_save, sender=UserProfile)
+def precompute_dashboard_on_profile_change(sender, instance, created, update_fields=None, **kwargs):
+    """Metas, nível e XP aparecem no dashboard; indicadores em cache não disparam nada."""
+    if created or (update_fields is not None and not DASHBOARD_PROFILE_FIELDS & set(update_fields)):
+        return
+    _precompute_dashboard_after_commit(instance.user_id, 'profile')
+
+
+@receiver(post_save, sender=Mission)
+@receiver(post_delete, sender=Mission)
+def bump_catalog_on_mission_change(sender, instance, **kwargs):
+    """
+    Título, recompensa e estado das missões aparecem nos caches de todos os
+    usuários; um incremento da geração do catálogo invalida todos de uma vez.
+    """
+    from .services.cache_keys import bump_catalog_generation
+
+    transaction.on_commit(bump_catalog_generation)
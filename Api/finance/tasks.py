@@ -4,6 +4,7 @@ from datetime import timedelta
 from decimal import Decimal
 
 from celery import shared_task
+from celery.signals import task_postrun, task_prerun
 from django.contrib.auth import get_user_model
 from django.db.models import Avg, Count, Min, Max, Sum, Q
 from django.utils import timezone
@@ -14,11 +15,41 @@ from .models import (
     MissionProgress,
     Transaction,
 )
-from .services import calculate_summary, apply_mission_reward
+from .services import (
+    apply_mission_reward,
+    bump_user_generation,
+    calculate_summary,
+    invalidate_dashboard_fragments,
+    record_sync_tombstones,
+    request_memo,
+)
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Folga para a marca de debounce cobrir a espera na fila do broker
+CELERY_QUEUE_GRACE_SECONDS = 300
+
+# Linhas de MissionProgress expiradas por UPDATE em check_expired_missions
+EXPIRATION_CHUNK_SIZE = 1000
+
+_task_memo_scopes = {}
+
+
+@task_prerun.connect
+def open_task_memo(task_id=None, **kwargs):
+    """Cada task roda em seu próprio escopo de memoização de resumos."""
+    scope = request_memo()
+    scope.__enter__()
+    _task_memo_scopes[task_id] = scope
+
+
+@task_postrun.connect
+def close_task_memo(task_id=None, **kwargs):
+    scope = _task_memo_scopes.pop(task_id, None)
+    if scope is not None:
+        scope.__exit__(None, None, None)
+
 
 @shared_task(bind=True, name='finance.generate_missions_async')
 def generate_missions_async(
@@ -124,33 +155,84 @@ def generate_missions_async(
 
 
 @shared_task(name='finance.check_expired_missions')
-def check_expired_missions():
+def check_expired_missions(chunk_size: int = EXPIRATION_CHUNK_SIZE):
     """
     Marca missões ativas que passaram do prazo como FAILED.
     Deve ser executada periodicamente (ex: diariamente).
+
+    O prazo (started_at + mission.duration_days) é comparado no banco e as
+    linhas vencidas são atualizadas com UPDATE em lotes de `chunk_size`,
+    cada lote em sua própria transação curta. Como o UPDATE não dispara
+    signals, os fragmentos de missões e a geração de cache dos usuários
+    afetados são invalidados a cada lote.
     """
     from datetime import timedelta
-    
+    from django.db import transaction
+
     now = timezone.now()
-    expired_count = 0
-    
-    active_missions = MissionProgress.objects.filter(
-        status__in=[MissionProgress.Status.PENDING, MissionProgress.Status.ACTIVE],
-        started_at__isnull=False
-    ).select_related('mission')
-    
-    for progress in active_missions:
-        deadline = progress.started_at + timedelta(days=progress.mission.duration_days)
-        if now > deadline:
-            progress.status = MissionProgress.Status.FAILED
-            progress.save(update_fields=['status'])
-            expired_count += 1
-            logger.info(f"Missão expirada: {progress.mission.title} (usuário: {progress.user_id})")
-    
-    logger.info(f"Verificação de expiração: {expired_count} missões marcadas como FAILED")
-    
+    open_statuses = [MissionProgress.Status.PENDING, MissionProgress.Status.ACTIVE]
+
+    open_progress = MissionProgress.objects.filter(
+        status__in=open_statuses,
+        started_at__isnull=False,
+    )
+
+    # Uma condição por duração distinta: started_at < now - duration_days.
+    # Evita aritmética de intervalos no SQL, que não é portável entre bancos.
+    durations = (
+        open_progress.order_by()
+        .values_list('mission__duration_days', flat=True)
+        .distinct()
+    )
+    deadline_passed = Q()
+    for duration_days in durations:
+        deadline_passed |= Q(
+            mission__duration_days=duration_days,
+            started_at__lt=now - timedelta(days=duration_days),
+        )
+
+    expired = open_progress.filter(deadline_passed).order_by('pk')
+
+    chunk_counts = []
+    while deadline_passed:
+        ids = list(expired.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            chunk = MissionProgress.objects.filter(pk__in=ids, status__in=open_statuses)
+            user_ids = set(chunk.values_list('user_id', flat=True))
+            count = chunk.update(status=MissionProgress.Status.FAILED)
+
+        # O UPDATE não dispara post_save: invalida aqui o que os signals invalidariam
+        for user_id in user_ids:
+            invalidate_dashboard_fragments(user_id, 'missions')
+            bump_user_generation(user_id)
+
+        chunk_counts.append(count)
+        logger.info(
+            f"Expiração de missões: lote {len(chunk_counts)} com {count} missões marcadas como FAILED",
+            extra={
+                'event': 'missions_expired_chunk',
+                'chunk': len(chunk_counts),
+                'chunk_size': len(ids),
+                'expired': count,
+            },
+        )
+
+    expired_count = sum(chunk_counts)
+    logger.info(
+        f"Verificação de expiração: {expired_count} missões marcadas como FAILED em {len(chunk_counts)} lotes",
+        extra={
+            'event': 'missions_expired_total',
+            'expired': expired_count,
+            'chunks': len(chunk_counts),
+        },
+    )
+
     return {
         'expired_count': expired_count,
+        'chunks': chunk_counts,
         'checked_at': now.isoformat()
     }
 
@@ -158,6 +240,7 @@ def check_expired_missions():
 @shared_task(name='finance.cleanup_old_missions')
 def cleanup_old_missions(days: int = 90):
     from datetime import timedelta
+    from django.db import transaction
     
     cutoff_date = timezone.now() - timedelta(days=days)
     
@@ -167,7 +250,9 @@ def cleanup_old_missions(days: int = 90):
     )
     
     count = old_missions.count()
-    old_missions.delete()
+    with transaction.atomic():
+        record_sync_tombstones(MissionProgress.objects.filter(mission__in=old_missions))
+        old_missions.delete()
     
     logger.info(f"Limpeza: {count} missões inativas (>{days} dias) removidas")
     
@@ -178,6 +263,289 @@ def cleanup_old_missions(days: int = 90):
     }
 
 
+@shared_task(name='finance.refresh_scheduled_occurrences')
+def refresh_scheduled_occurrences_task(user_ids=None):
+    """Rola a janela de ocorrências futuras das transações recorrentes."""
+    from .services.recurrence import refresh_scheduled_occurrences
+    
+    generated = refresh_scheduled_occurrences(user_ids)
+    return {'generated': generated}
+
+
+def schedule_occurrences_refresh(user_id: int) -> bool:
+    """
+    Enfileira a atualização das ocorrências agendadas do usuário.
+
+    Sem broker a atualização roda inline, como no recálculo de missões.
+    Retorna True quando o job foi enfileirado.
+    """
+    try:
+        refresh_scheduled_occurrences_task.delay([user_id])
+    except Exception as e:
+        from .services.recurrence import refresh_scheduled_occurrences
+
+        logger.warning(f"[Agenda] Falha ao enfileirar ocorrências do usuário {user_id}, executando inline: {e}")
+        refresh_scheduled_occurrences([user_id])
+        return False
+
+    return True
+
+
+@shared_task(name='finance.prune_sync_tombstones')
+def prune_sync_tombstones_task(days: int = None):
+    from .services.sync import SYNC_TOMBSTONE_RETENTION_DAYS, prune_sync_tombstones
+    
+    days = days or SYNC_TOMBSTONE_RETENTION_DAYS
+    removed = prune_sync_tombstones(days)
+    
+    logger.info(f"Limpeza: {removed} marcas de exclusão da sincronização (>{days} dias) removidas")
+    
+    return {
+        'removed': removed,
+        'days': days,
+    }
+
+
+@shared_task(name='finance.auto_link_recurring_transactions')
+def auto_link_recurring_sweep(user_ids=None):
+    """
+    Replica vínculos recorrentes de todos os usuários que têm algum.
+
+    Cada usuário é processado por auto_link_recurring_transactions(); uma
+    falha é registrada e não interrompe a varredura dos demais.
+    """
+    from .models import TransactionLink
+    from .services import auto_link_recurring_transactions
+
+    owners = TransactionLink.objects.filter(is_recurring=True)
+    if user_ids is not None:
+        owners = owners.filter(user_id__in=user_ids)
+    owner_ids = list(owners.order_by('user_id').values_list('user_id', flat=True).distinct())
+
+    links_created = 0
+    failed = []
+    for user in User.objects.filter(id__in=owner_ids).order_by('id').iterator():
+        try:
+            links_created += auto_link_recurring_transactions(user)
+        except Exception as e:
+            failed.append(user.id)
+            logger.error(f"Vinculação recorrente: erro no usuário {user.id}: {e}")
+
+    logger.info(
+        f"Vinculação recorrente: {links_created} vínculos criados para {len(owner_ids)} usuários",
+        extra={
+            'event': 'recurring_links_sweep',
+            'users': len(owner_ids),
+            'links_created': links_created,
+            'failed': len(failed),
+        },
+    )
+
+    return {
+        'users': len(owner_ids),
+        'links_created': links_created,
+        'failed_users': failed,
+    }
+
+
+def transaction_import_key(task_id: str) -> str:
+    return f'transaction_import_{task_id}'
+
+
+def _estimate_statement_rows(content: str, statement_format: str) -> int:
+    if statement_format == 'ofx':
+        return content.upper().count('<STMTTRN>')
+    return max(content.count('\n') - 1, 0)
+
+
+@shared_task(bind=True, name='finance.import_transactions')
+def import_transactions_async(self, user_id: int, upload_path: str, statement_format: str):
+    """
+    Importa um extrato (CSV/OFX) e recalcula missões e indicadores uma vez no final.
+
+    `upload_path` aponta para o arquivo no default_storage, removido ao fim
+    da importação; a mensagem no broker leva só o caminho. O progresso fica
+    em cache em `transaction_import_{task_id}`, no mesmo formato de
+    generate_missions_async.
+    """
+    import io
+    from django.core.cache import cache
+    from django.core.files.storage import default_storage
+    from .services import decode_statement, import_transactions
+    from .views.base import invalidate_user_dashboard_cache
+
+    task_id = self.request.id
+    cache_key = transaction_import_key(task_id)
+    status_data = {
+        'task_id': task_id,
+        'user_id': user_id,
+        'status': 'STARTED',
+        'current': 0,
+        'total': 0,
+        'percent': 0,
+        'created': 0,
+        'message': 'Lendo extrato...',
+        'format': statement_format,
+    }
+    cache.set(cache_key, status_data, timeout=3600)
+
+    def update_progress(processed: int, created: int):
+        total = status_data['total']
+        percent = min(int((processed / total) * 100), 99) if total > 0 else 0
+        status_data.update({
+            'current': processed,
+            'percent': percent,
+            'created': created,
+            'message': f'{processed} lançamentos processados',
+        })
+        cache.set(cache_key, status_data, timeout=3600)
+
+    try:
+        try:
+            with default_storage.open(upload_path, 'rb') as upload:
+                content = decode_statement(upload.read())
+        finally:
+            default_storage.delete(upload_path)
+        status_data['total'] = _estimate_statement_rows(content, statement_format)
+
+        user = User.objects.get(id=user_id)
+        try:
+            result = import_transactions(user, io.StringIO(content), statement_format, progress=update_progress)
+        finally:
+            # Lotes já gravados continuam valendo mesmo se a importação falhar
+            if status_data['created']:
+                invalidate_user_dashboard_cache(user, 'transactions')
+                refresh_user_missions_async(user_id)
+
+        status_data.update({
+            'status': 'SUCCESS',
+            'current': result['processed'],
+            'total': result['processed'],
+            'percent': 100,
+            'created': result['created'],
+            'result': result,
+            'message': f"✅ Concluído: {result['created']} transações importadas",
+        })
+        cache.set(cache_key, status_data, timeout=3600)
+        return result
+
+    except Exception as e:
+        logger.error(f"[Task {task_id}] Erro na importação: {str(e)}", exc_info=True)
+        status_data.update({
+            'status': 'FAILURE',
+            'error': str(e),
+            'message': f'❌ Erro: {str(e)}',
+        })
+        cache.set(cache_key, status_data, timeout=3600)
+        raise
+
+
+def _mission_recompute_key(user_id: int) -> str:
+    return f'mission_recompute_pending_{user_id}'
+
+
+def schedule_mission_recompute(user_id: int) -> bool:
+    """
+    Agenda um recálculo de missões do usuário com debounce.
+
+    Só existe um job pendente por usuário: escritas feitas dentro da janela
+    são absorvidas por ele. Retorna True quando um novo job foi enfileirado.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+
+    debounce = getattr(settings, 'MISSION_RECOMPUTE_DEBOUNCE_SECONDS', 10)
+    key = _mission_recompute_key(user_id)
+
+    # A marca expira sozinha caso o worker nunca execute o job
+    if not cache.add(key, True, timeout=debounce + CELERY_QUEUE_GRACE_SECONDS):
+        return False
+
+    try:
+        recompute_user_missions.apply_async(args=[user_id], countdown=debounce)
+    except Exception as e:
+        cache.delete(key)
+        logger.warning(f"[Debounce] Falha ao enfileirar recálculo do usuário {user_id}, executando inline: {e}")
+        refresh_user_missions_async(user_id)
+        return False
+
+    return True
+
+
+@shared_task(name='finance.recompute_user_missions')
+def recompute_user_missions(user_id: int):
+    """
+    Job único de recálculo de missões após uma rajada de escritas.
+
+    A marca de pendência é removida antes do cálculo, então escritas que
+    ocorrerem durante a execução agendam um novo job em vez de se perderem.
+    """
+    from django.core.cache import cache
+
+    cache.delete(_mission_recompute_key(user_id))
+    return refresh_user_missions_async(user_id)
+
+
+def _dashboard_rebuild_key(user_id: int) -> str:
+    return f'dashboard_rebuild_pending_{user_id}'
+
+
+def schedule_dashboard_rebuild(user_id: int, countdown: int = 0) -> bool:
+    """
+    Enfileira a reconstrução do dashboard do usuário, no máximo uma por vez.
+
+    A marca de pendência funciona como trava: leituras com o cache vencido
+    e rajadas de escritas dentro da janela são absorvidas pelo job já
+    enfileirado. Retorna True quando um novo job foi enfileirado.
+    """
+    from django.core.cache import cache
+
+    key = _dashboard_rebuild_key(user_id)
+    if not cache.add(key, True, timeout=countdown + CELERY_QUEUE_GRACE_SECONDS):
+        return False
+
+    try:
+        rebuild_dashboard_task.apply_async(args=[user_id], countdown=countdown)
+    except Exception as e:
+        # A versão antiga continua sendo servida até a próxima tentativa
+        cache.delete(key)
+        logger.warning(f"[Dashboard] Falha ao enfileirar reconstrução do usuário {user_id}: {e}")
+        return False
+
+    return True
+
+
+def schedule_dashboard_precompute(user_id: int) -> bool:
+    """Reconstrução disparada por escrita, com debounce para coalescer rajadas."""
+    from django.conf import settings
+
+    debounce = getattr(settings, 'DASHBOARD_PRECOMPUTE_DEBOUNCE_SECONDS', 2)
+    return schedule_dashboard_rebuild(user_id, countdown=debounce)
+
+
+@shared_task(name='finance.rebuild_dashboard')
+def rebuild_dashboard_task(user_id: int):
+    """
+    Recalcula e grava os fragmentos desatualizados do dashboard.
+
+    A marca de pendência sai antes do cálculo, então escritas feitas durante
+    a execução agendam outro job. Missões não são avaliadas aqui: isso fica
+    com recompute_user_missions, que invalida o fragmento quando algo muda.
+    """
+    from django.core.cache import cache
+    from .views.dashboard import rebuild_dashboard
+
+    cache.delete(_dashboard_rebuild_key(user_id))
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        logger.warning(f"[Dashboard] Usuário {user_id} não encontrado")
+        return None
+
+    _, rebuilt = rebuild_dashboard(user)
+    return {'user_id': user_id, 'fragments': rebuilt}
+
+
 @shared_task(name='finance.refresh_user_missions')
 def refresh_user_missions_async(user_id: int):
     """
@@ -199,7 +567,7 @@ def refresh_user_missions_async(user_id: int):
             logger.info(f"[Async] Atribuídas {len(assigned)} novas missões para usuário {user_id}")
         
         if updated or assigned:
-            invalidate_user_dashboard_cache(user)
+            invalidate_user_dashboard_cache(user, 'missions')
         
         return {
             'user_id': user_id,
@@ -0,0 +1,92 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from finance.cache_backends import TieredCache
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TieredCache('', {'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 2, 'L1_TIMEOUT': 5}})
+        self.l2 = caches['shared']
+        self.l2.clear()
+
+    def test_reads_are_served_from_l1_until_it_expires(self):
+        with mock.patch('finance.cache_backends.time.monotonic', return_value=100):
+            self.cache.set('chave', 'valor')
+            self.l2.set('chave', 'novo')
+            self.assertEqual(self.cache.get('chave'), 'valor')
+
+        with mock.patch('finance.cache_backends.time.monotonic', return_value=106):
+            self.assertEqual(self.cache.get('chave'), 'novo')
+
+        self.l2.set('outra', 1)
+        self.assertEqual(self.cache.get_many(['chave', 'outra', 'nenhuma']), {'chave': 'novo', 'outra': 1})
+
+    def test_l1_is_bounded_lru(self):
+        for key in ('a', 'b'):
+            self.cache.set(key, key)
+        self.cache.get('a')
+        self.cache.set('c', 'c')
+        self.l2.clear()
+
+        self.assertEqual(self.cache.get('a'), 'a')
+        self.assertEqual(self.cache.get('c'), 'c')
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_locks_and_counters_are_decided_in_l2(self):
+        self.assertTrue(self.cache.add('trava', True))
+        self.l2.delete('trava')
+        self.assertTrue(self.cache.add('trava', True))
+        self.assertFalse(self.cache.add('trava', True))
+
+        self.cache.set('contador', 1)
+        self.l2.set('contador', 10)
+        self.assertEqual(self.cache.incr('contador'), 11)
+        self.assertEqual(self.cache.get('contador'), 11)
+
+        self.cache.delete('contador')
+        self.assertIsNone(self.l2.get('contador'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('contador')
+
+    def test_l2_only_prefixes_skip_l1(self):
+        cache = TieredCache('', {'OPTIONS': {'L2': 'shared', 'L2_ONLY_PREFIXES': ['versao_']}})
+        cache.set('versao_resumo', 1)
+        cache.set('resumo', 1)
+        cache.set_tagged('tagueada', 'valor', tags=['user:1'])
+        self.l2.set('versao_resumo', 2)
+        self.l2.set('resumo', 2)
+        self.l2.incr('cache_tag_user:1')
+
+        self.assertEqual(cache.get_many(['versao_resumo', 'resumo']), {'versao_resumo': 2, 'resumo': 1})
+        self.assertEqual(cache.incr('versao_resumo'), 3)
+        self.assertEqual(cache.get('versao_resumo'), 3)
+        self.assertIsNone(cache.get_tagged('tagueada'))
+
+    def test_tag_invalidation(self):
+        self.cache.set_tagged('resumo_1', {'total': 10}, tags=['user:1'])
+        self.cache.set_tagged('resumo_2', {'total': 20}, tags=['user:2', 'catalogo'])
+        self.assertEqual(self.cache.get_tagged('resumo_1'), {'total': 10})
+
+        self.cache.invalidate_tags('catalogo')
+        self.assertEqual(self.cache.get_tagged('resumo_1'), {'total': 10})
+        self.assertIsNone(self.cache.get_tagged('resumo_2'))
+
+        # Outro processo, com L1 vazio, enxerga a mesma invalidação
+        other = TieredCache('', {'OPTIONS': {'L2': 'shared'}})
+        self.cache.invalidate_tags('user:1')
+        self.assertEqual(other.get_tagged('resumo_1', 'vazio'), 'vazio')
+
+    def test_tag_versions_expire_after_tag_timeout(self):
+        cache = TieredCache('', {'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 0, 'TAG_TIMEOUT': 60}})
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000):
+            cache.set_tagged('resumo_1', {'total': 10}, tags=['user:1'], timeout=None)
+            cache.invalidate_tags('user:2')
+            self.assertIsNotNone(self.l2.get('cache_tag_user:1'))
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1061):
+            self.assertIsNone(self.l2.get('cache_tag_user:1'))
+            self.assertIsNone(self.l2.get('cache_tag_user:2'))
+            # Uma versão descartada recomeça em outro valor e não revalida a entrada
+            self.assertIsNone(cache.get_tagged('resumo_1'))
@@ -0,0 +1,118 @@
+from unittest import mock
+from django.core.cache import cache, caches
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from finance.models import Category, Mission, MissionProgress, Transaction
+from finance.services.cache_keys import CATALOG_GENERATION_KEY, COUNTER_TTL, bump_counter
+from finance.services import (
+    bump_catalog_generation,
+    bump_user_generation,
+    read_dashboard,
+    user_cache_key,
+)
+
+User = get_user_model()
+
+
+@mock.patch('finance.tasks.rebuild_dashboard_task.apply_async')
+class CacheGenerationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='geracao', email='geracao@example.com', password='password123'
+        )
+        self.other = User.objects.create_user(
+            username='outro', email='outro@example.com', password='password123'
+        )
+        self.category = Category.objects.create(
+            user=self.user, name='Mercado', type=Category.CategoryType.EXPENSE
+        )
+
+    def test_bumps_change_only_the_affected_keys(self, delay):
+        key = user_cache_key('category_patterns', self.user.id, 90)
+        other_key = user_cache_key('category_patterns', self.other.id, 90)
+        self.assertEqual(user_cache_key('category_patterns', self.user.id, 90), key)
+        self.assertTrue(key.startswith(f'category_patterns_{self.user.id}_90_g'))
+
+        bump_user_generation(self.user.id)
+        user_bumped = user_cache_key('category_patterns', self.user.id, 90)
+        self.assertNotEqual(user_bumped, key)
+        self.assertEqual(user_cache_key('category_patterns', self.other.id, 90), other_key)
+
+        bump_catalog_generation()
+        self.assertNotEqual(user_cache_key('category_patterns', self.user.id, 90), user_bumped)
+        self.assertNotEqual(user_cache_key('category_patterns', self.other.id, 90), other_key)
+
+    def test_counters_expire_and_restart_from_a_new_value(self, delay):
+        shared = caches['shared']
+        user_key = f'cache_generation_user_{self.user.id}'
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000):
+            key = user_cache_key('category_patterns', self.user.id, 90)
+            bump_counter('dashboard_version_summary_1')
+            self.assertIsNotNone(shared.get(user_key))
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000 + COUNTER_TTL + 1):
+            self.assertIsNone(shared.get(user_key))
+            self.assertIsNone(shared.get(CATALOG_GENERATION_KEY))
+            self.assertIsNone(shared.get('dashboard_version_summary_1'))
+            self.assertNotEqual(user_cache_key('category_patterns', self.user.id, 90), key)
+
+    def test_counters_written_by_another_process_are_seen_at_once(self, delay):
+        _, versions, _ = read_dashboard(self.user.id)
+        key = user_cache_key('tier_progression', self.user.id)
+
+        # Outro worker grava direto no L2; o L1 deste processo não pode mascarar
+        shared = caches['shared']
+        shared.incr(f'dashboard_version_summary_{self.user.id}')
+        shared.incr(f'cache_generation_user_{self.user.id}')
+
+        self.assertNotEqual(read_dashboard(self.user.id)[1]['summary'], versions['summary'])
+        self.assertNotEqual(user_cache_key('tier_progression', self.user.id), key)
+
+    def test_write_through_api_moves_user_to_new_generation(self, delay):
+        key = user_cache_key('tier_progression', self.user.id)
+        other_key = user_cache_key('tier_progression', self.other.id)
+        cache.set(key, {'level': 1})
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('transaction-list'), {
+            'type': Transaction.TransactionType.EXPENSE,
+            'description': 'Compras',
+            'amount': '50.00',
+            'date': timezone.localdate().isoformat(),
+            'category': str(self.category.id),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertIsNone(cache.get(user_cache_key('tier_progression', self.user.id)))
+        self.assertEqual(user_cache_key('tier_progression', self.other.id), other_key)
+
+    def test_mission_edit_invalidates_every_user_with_one_bump(self, delay):
+        mission = Mission.objects.create(
+            title='Poupar mais',
+            description='Aumente sua taxa de poupança',
+            mission_type=Mission.MissionType.TPS_IMPROVEMENT,
+            reward_points=100,
+            difficulty=Mission.Difficulty.MEDIUM,
+            is_active=True,
+        )
+        for user in (self.user, self.other):
+            MissionProgress.objects.create(user=user, mission=mission)
+        before = {user.id: read_dashboard(user.id)[1]['active_missions'] for user in (self.user, self.other)}
+
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password123', is_staff=True
+        )
+        self.client.force_authenticate(user=admin)
+        with mock.patch('finance.services.cache_keys.bump_counter', wraps=bump_counter) as bump, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('mission-detail', args=[mission.id]), {'reward_points': 150}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bump.assert_called_once_with(CATALOG_GENERATION_KEY)
+        for user_id, version in before.items():
+            self.assertNotEqual(read_dashboard(user_id)[1]['active_missions'], version)
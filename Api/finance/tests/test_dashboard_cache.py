@@ -0,0 +1,192 @@
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from finance.models import Category, Transaction
+from finance.services import (
+    DASHBOARD_FRAGMENTS,
+    acquire_dashboard_build,
+    calculate_summary,
+    release_dashboard_build,
+)
+from finance.tasks import rebuild_dashboard_task, schedule_dashboard_rebuild
+from finance.views.dashboard import rebuild_dashboard
+
+User = get_user_model()
+
+
+@mock.patch('finance.tasks.schedule_mission_recompute')
+@mock.patch('finance.tasks.rebuild_dashboard_task.apply_async')
+class DashboardFragmentCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='dashuser',
+            email='dash@example.com',
+            password='password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('dashboard-list')
+        self.category = Category.objects.create(
+            user=self.user, name='Feira', type=Category.CategoryType.EXPENSE
+        )
+        Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Feira da semana',
+            amount=Decimal('80.00'),
+            date=timezone.localdate(),
+            category=self.category,
+        )
+
+    def _get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_second_request_is_served_from_fragments(self, delay, recompute):
+        with mock.patch('finance.views.dashboard.update_mission_progress') as missions:
+            first = self._get()
+            second = self._get()
+
+        self.assertFalse(first['from_cache'])
+        self.assertEqual(first['categories']['EXPENSE'][0]['name'], 'Feira')
+        recompute.assert_called_once_with(self.user.id)
+        missions.assert_not_called()
+
+        self.assertTrue(second['from_cache'])
+        self.assertFalse(second['stale'])
+        self.assertEqual(second['cached_fragments'], list(DASHBOARD_FRAGMENTS))
+        for fragment in DASHBOARD_FRAGMENTS:
+            self.assertEqual(second[fragment], first[fragment])
+        delay.assert_not_called()
+
+    def test_category_rename_serves_stale_and_rebuilds_only_categories(self, delay, recompute):
+        self._get()
+
+        response = self.client.patch(
+            reverse('category-detail', args=[self.category.id]), {'name': 'Hortifruti'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self._get()
+        self.assertTrue(data['stale'])
+        self.assertEqual(data['categories']['EXPENSE'][0]['name'], 'Feira')
+        self.assertEqual(set(data['cached_fragments']), set(DASHBOARD_FRAGMENTS) - {'categories'})
+        delay.assert_called_once_with(args=[self.user.id], countdown=0)
+
+        with mock.patch('finance.views.dashboard.cashflow_series') as cashflow:
+            result = rebuild_dashboard_task(self.user.id)
+        cashflow.assert_not_called()
+        self.assertEqual(result['fragments'], ['categories'])
+
+        data = self._get()
+        self.assertFalse(data['stale'])
+        self.assertEqual(data['categories']['EXPENSE'][0]['name'], 'Hortifruti')
+
+    def test_writes_invalidate_only_affected_fragments(self, delay, recompute):
+        self._get()
+        response = self.client.post(reverse('transaction-list'), {
+            'type': Transaction.TransactionType.INCOME,
+            'description': 'Salário',
+            'amount': '1000.00',
+            'date': timezone.localdate().isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._get()['cached_fragments'], ['active_missions'])
+
+        rebuild_dashboard_task(self.user.id)
+        response = self.client.patch(reverse('profile'), {'target_tps': 25}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(self._get()['cached_fragments']),
+            {'summary', 'categories', 'cashflow', 'active_missions'},
+        )
+
+        data = self._get(refresh='true')
+        self.assertEqual(data['cached_fragments'], [])
+        self.assertFalse(data['stale'])
+
+    def test_hard_expiry_falls_back_to_inline_build(self, delay, recompute):
+        self._get()
+        self.client.patch(reverse('profile'), {'target_tps': 25}, format='json')
+        cache.delete(f'dashboard_snapshot_{self.user.id}')
+
+        data = self._get()
+        self.assertFalse(data['stale'])
+        self.assertEqual(data['insights']['tps']['target'], '25.00')
+        delay.assert_not_called()
+
+    def test_concurrent_inline_build_waits_for_the_first(self, delay, recompute):
+        self.assertTrue(acquire_dashboard_build(self.user.id))
+
+        with mock.patch('finance.services.dashboard.time.sleep') as sleep, \
+                mock.patch('finance.views.dashboard.calculate_summary', wraps=calculate_summary) as summary:
+            sleep.side_effect = lambda seconds: rebuild_dashboard(self.user)
+            data = self._get()
+
+        sleep.assert_called_once()
+        summary.assert_called_once()
+        self.assertTrue(data['from_cache'])
+        self.assertEqual(data['cached_fragments'], list(DASHBOARD_FRAGMENTS))
+        self.assertEqual(data['categories']['EXPENSE'][0]['name'], 'Feira')
+
+    @override_settings(DASHBOARD_BUILD_WAIT_SECONDS=0)
+    def test_concurrent_inline_build_times_out_with_202(self, delay, recompute):
+        self.assertTrue(acquire_dashboard_build(self.user.id))
+
+        with mock.patch('finance.views.dashboard.calculate_summary') as summary:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Retry-After'], '1')
+        summary.assert_not_called()
+
+        release_dashboard_build(self.user.id)
+        self.assertFalse(self._get()['from_cache'])
+
+    def test_only_one_rebuild_is_queued_per_user(self, delay, recompute):
+        self.assertTrue(schedule_dashboard_rebuild(self.user.id))
+        self.assertFalse(schedule_dashboard_rebuild(self.user.id))
+        delay.assert_called_once_with(args=[self.user.id], countdown=0)
+
+        rebuild_dashboard_task(self.user.id)
+        self.assertTrue(schedule_dashboard_rebuild(self.user.id))
+
+    def test_commit_triggers_coalesced_precompute(self, delay, recompute):
+        self._get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for amount in ('10.00', '20.00'):
+                Transaction.objects.create(
+                    user=self.user,
+                    type=Transaction.TransactionType.EXPENSE,
+                    description='Lanche',
+                    amount=Decimal(amount),
+                    date=timezone.localdate(),
+                    category=self.category,
+                )
+        delay.assert_called_once_with(args=[self.user.id], countdown=2)
+
+        rebuild_dashboard_task(self.user.id)
+        with mock.patch('finance.views.dashboard.calculate_summary') as summary:
+            data = self._get()
+        summary.assert_not_called()
+        self.assertFalse(data['stale'])
+        self.assertEqual(data['cached_fragments'], list(DASHBOARD_FRAGMENTS))
+        self.assertEqual(data['summary']['total_expense'], '110.00')
+
+    def test_indicator_refresh_on_profile_does_not_trigger_precompute(self, delay, recompute):
+        profile = self.user.userprofile
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save(update_fields=['indicators_updated_at'])
+        delay.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.target_rdr = 30
+            profile.save()
+        delay.assert_called_once_with(args=[self.user.id], countdown=2)
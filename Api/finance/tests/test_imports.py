@@ -0,0 +1,188 @@
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from finance.models import Category, Transaction, UserMonthlyLedger
+from finance.services import import_transactions
+from finance.services import imports
+from finance.services.imports import CategoryResolver
+from finance.tasks import import_transactions_async
+
+User = get_user_model()
+
+CSV_STATEMENT = """data;descricao;valor;categoria
+05/03/2026;Supermercado;-250,40;Mercado
+06/03/2026;Salário;3.500,00;
+07/03/2026;Linha ruim;abc;
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260310120000[-3:BRT]<TRNAMT>-89.90<FITID>1<MEMO>Farmácia</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260311
+<TRNAMT>150.00
+<FITID>2
+<NAME>Pix recebido
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class StorageTestMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        storage_settings = override_settings(MEDIA_ROOT=media_root)
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+
+class ImportTransactionsTest(StorageTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='importuser',
+            email='import@example.com',
+            password='password123',
+        )
+        self.market = Category.objects.create(
+            user=self.user, name='Mercado Importado', type=Category.CategoryType.EXPENSE
+        )
+
+    def test_csv_import_with_categories_ledger_and_errors(self):
+        statement = CSV_STATEMENT.replace(';Mercado\n', ';mercado importado\n')
+        result = import_transactions(self.user, io.StringIO(statement), 'csv')
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'], [{'line': 4, 'error': "valor inválido 'abc'"}])
+
+        expense = Transaction.objects.get(user=self.user, description='Supermercado')
+        self.assertEqual(expense.type, Transaction.TransactionType.EXPENSE)
+        self.assertEqual(expense.amount, Decimal('250.40'))
+        self.assertEqual(expense.category_id, self.market.id)
+        self.assertEqual(expense.date, date(2026, 3, 5))
+
+        row = UserMonthlyLedger.objects.get(
+            user=self.user, month=date(2026, 3, 1),
+            type=Transaction.TransactionType.EXPENSE, category=self.market,
+        )
+        self.assertEqual(row.total_amount, Decimal('250.40'))
+
+    def test_non_finite_and_huge_amounts_are_row_errors(self):
+        statement = CSV_STATEMENT + "08/03/2026;Nada;NaN;\n09/03/2026;Infinito;-Infinity;\n10/03/2026;Enorme;1e30;\n"
+        result = import_transactions(self.user, io.StringIO(statement), 'csv')
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'][1:], [
+            {'line': 5, 'error': "valor inválido 'NaN'"},
+            {'line': 6, 'error': "valor inválido '-Infinity'"},
+            {'line': 7, 'error': 'valor excede o limite máximo'},
+        ])
+
+    def test_ofx_import_is_idempotent(self):
+        first = import_transactions(self.user, io.StringIO(OFX_STATEMENT), 'ofx')
+        second = import_transactions(self.user, io.StringIO(OFX_STATEMENT), 'ofx')
+
+        self.assertEqual(first['created'], 2)
+        self.assertEqual(second['created'], 0)
+        self.assertEqual(second['skipped_duplicates'], 2)
+        self.assertEqual(
+            set(Transaction.objects.filter(user=self.user).values_list('description', 'type')),
+            {('Farmácia', 'EXPENSE'), ('Pix recebido', 'INCOME')},
+        )
+
+    def test_user_categories_win_over_global_ones(self):
+        global_market = Category.objects.create(
+            user=None, name='Mercado Importado', type=Category.CategoryType.EXPENSE
+        )
+
+        self.assertEqual(CategoryResolver(self.user).resolve('mercado importado', 'EXPENSE'), self.market.id)
+        other = User.objects.create_user(username='semcategoria', password='password123')
+        self.assertEqual(CategoryResolver(other).resolve('Mercado Importado', 'EXPENSE'), global_market.id)
+
+    def test_task_reports_progress_and_recomputes_once(self):
+        cache.clear()
+        upload_path = default_storage.save('imports/extrato.ofx', ContentFile(OFX_STATEMENT.encode('latin-1')))
+        with mock.patch('finance.tasks.refresh_user_missions_async') as refresh:
+            result = import_transactions_async.apply(
+                args=[self.user.id, upload_path, 'ofx'], task_id='import-test'
+            )
+
+        self.assertEqual(result.result['created'], 2)
+        self.assertFalse(default_storage.exists(upload_path))
+        refresh.assert_called_once_with(self.user.id)
+        status_data = cache.get('transaction_import_import-test')
+        self.assertEqual(status_data['status'], 'SUCCESS')
+        self.assertEqual(status_data['percent'], 100)
+
+    def test_task_failure_still_refreshes_committed_batches(self):
+        cache.clear()
+        upload_path = default_storage.save('imports/extrato.ofx', ContentFile(OFX_STATEMENT.encode('latin-1')))
+        save_batch = imports._save_batch
+        calls = []
+
+        def failing_save_batch(user, batch):
+            calls.append(len(batch))
+            if len(calls) > 1:
+                raise RuntimeError('banco indisponível')
+            return save_batch(user, batch)
+
+        with mock.patch.object(imports, 'IMPORT_BATCH_SIZE', 1), \
+                mock.patch.object(imports, '_save_batch', side_effect=failing_save_batch), \
+                mock.patch('finance.tasks.refresh_user_missions_async') as refresh, \
+                mock.patch('finance.views.base.invalidate_dashboard_fragments') as invalidate:
+            result = import_transactions_async.apply(
+                args=[self.user.id, upload_path, 'ofx'], task_id='import-falha'
+            )
+
+        self.assertTrue(result.failed())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        refresh.assert_called_once_with(self.user.id)
+        invalidate.assert_called_once_with(self.user.id, 'transactions')
+        status_data = cache.get('transaction_import_import-falha')
+        self.assertEqual(status_data['status'], 'FAILURE')
+        self.assertEqual(status_data['created'], 1)
+
+
+class ImportEndpointTest(StorageTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='importapi', password='password123')
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def test_upload_enqueues_and_status_is_private(self):
+        upload = SimpleUploadedFile('extrato.ofx', OFX_STATEMENT.encode('latin-1'))
+        with mock.patch.object(import_transactions_async, 'apply_async') as apply_async:
+            response = self.client.post(reverse('transaction-import-statement'), {'file': upload})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        task_id = response.data['task_id']
+        self.assertEqual(apply_async.call_args.kwargs['task_id'], task_id)
+        user_id, upload_path, statement_format = apply_async.call_args.kwargs['args']
+        self.assertEqual(statement_format, 'ofx')
+        # O broker recebe só o caminho; o arquivo fica no storage
+        with default_storage.open(upload_path, 'rb') as stored:
+            self.assertEqual(stored.read(), OFX_STATEMENT.encode('latin-1'))
+
+        status_url = reverse('transaction-import-status', kwargs={'task_id': task_id})
+        self.assertEqual(self.client.get(status_url).data['status'], 'PENDING')
+
+        other = User.objects.create_user(username='intruso', password='password123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(status_url).status_code, status.HTTP_404_NOT_FOUND)
@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 from finance.models import Transaction, Category, UserProfile, TransactionLink
 from finance.services.indicators import calculate_summary, invalidate_indicators_cache
+from finance.services.memo import request_memo
 
 User = get_user_model()
 
@@ -108,3 +109,82 @@ class IndicatorsTest(TestCase):
         summary = calculate_summary(self.user)
 
         self.assertEqual(summary['rdr'], Decimal("20.00"))
+
+    def test_uncategorized_expense_counts_as_regular_expense(self):
+        today = timezone.now().date()
+
+        Transaction.objects.create(
+            user=self.user, amount=Decimal("2000"), type=Transaction.TransactionType.INCOME,
+            date=today, category=self.cat_income, description="Salary"
+        )
+        Transaction.objects.create(
+            user=self.user, amount=Decimal("300"), type=Transaction.TransactionType.EXPENSE,
+            date=today, category=None, description="Uncategorized"
+        )
+        Transaction.objects.create(
+            user=self.user, amount=Decimal("200"), type=Transaction.TransactionType.EXPENSE,
+            date=today, category=self.cat_savings, description="Deposit"
+        )
+
+        summary = calculate_summary(self.user)
+
+        self.assertEqual(summary['total_expense'], Decimal("300.00"))
+        self.assertEqual(summary['total_aportes'], Decimal("200.00"))
+        self.assertEqual(summary['tps'], Decimal("85.00"))
+
+    def test_summary_uses_constant_number_of_queries(self):
+        today = timezone.now().date()
+
+        income = Transaction.objects.create(
+            user=self.user, amount=Decimal("5000"), type=Transaction.TransactionType.INCOME,
+            date=today, category=self.cat_income, description="Salary"
+        )
+        for idx in range(5):
+            Transaction.objects.create(
+                user=self.user, amount=Decimal("100"), type=Transaction.TransactionType.EXPENSE,
+                date=today, category=self.cat_essential, description=f"Rent {idx}"
+            )
+        bill = Transaction.objects.create(
+            user=self.user, amount=Decimal("400"), type=Transaction.TransactionType.EXPENSE,
+            date=today, category=self.cat_expense, description="Card"
+        )
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=income.id,
+            target_transaction_uuid=bill.id,
+            linked_amount=Decimal("400"),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT
+        )
+
+        invalidate_indicators_cache(self.user)
+
+        # Totais do mês + vínculos + reserva (consolidado) + UPDATE do perfil
+        with self.assertNumQueries(4):
+            summary = calculate_summary(self.user)
+
+        self.assertEqual(summary['rdr'], Decimal("8.00"))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.cached_rdr, Decimal("8.00"))
+
+    def test_summary_is_memoized_within_request_scope(self):
+        today = timezone.now().date()
+        Transaction.objects.create(
+            user=self.user, amount=Decimal("1000"), type=Transaction.TransactionType.INCOME,
+            date=today, category=self.cat_income, description="Salary"
+        )
+
+        with request_memo():
+            first = calculate_summary(self.user)
+            with self.assertNumQueries(0):
+                second = calculate_summary(self.user)
+            self.assertEqual(first, second)
+
+            # Nova escrita muda a versão de dados e força novo cálculo
+            Transaction.objects.create(
+                user=self.user, amount=Decimal("400"), type=Transaction.TransactionType.EXPENSE,
+                date=today, category=self.cat_expense, description="Food"
+            )
+            third = calculate_summary(self.user)
+
+        self.assertEqual(first['tps'], Decimal("100.00"))
+        self.assertEqual(third['tps'], Decimal("60.00"))
@@ -0,0 +1,127 @@
+from decimal import Decimal
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from finance.models import Transaction, Category, UserMonthlyLedger
+from finance.services import rebuild_monthly_ledger
+
+User = get_user_model()
+
+
+class UserMonthlyLedgerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='ledgeruser',
+            email='ledger@example.com',
+            password='password123',
+        )
+        self.cat_food = Category.objects.create(
+            user=self.user, name="Mercado", type=Category.CategoryType.EXPENSE
+        )
+        self.cat_rent = Category.objects.create(
+            user=self.user, name="Aluguel", type=Category.CategoryType.EXPENSE,
+            group=Category.CategoryGroup.ESSENTIAL_EXPENSE
+        )
+        self.today = timezone.now().date()
+        self.month = self.today.replace(day=1)
+
+    def _row(self, category, month=None, tx_type=Transaction.TransactionType.EXPENSE):
+        return UserMonthlyLedger.objects.filter(
+            user=self.user, month=month or self.month, type=tx_type, category=category
+        ).first()
+
+    def _create(self, amount, category=None, date=None):
+        return Transaction.objects.create(
+            user=self.user, amount=Decimal(amount),
+            type=Transaction.TransactionType.EXPENSE,
+            date=date or self.today, category=category, description="Compra"
+        )
+
+    def test_create_accumulates_totals(self):
+        self._create("100", self.cat_food)
+        self._create("50", self.cat_food)
+        self._create("30")
+
+        row = self._row(self.cat_food)
+        self.assertEqual(row.total_amount, Decimal("150.00"))
+        self.assertEqual(row.transaction_count, 2)
+
+        uncategorized = self._row(None)
+        self.assertEqual(uncategorized.total_amount, Decimal("30.00"))
+        self.assertEqual(uncategorized.transaction_count, 1)
+
+    def test_update_moves_amount_between_rows(self):
+        tx = self._create("100", self.cat_food)
+
+        tx.amount = Decimal("80")
+        tx.save()
+        self.assertEqual(self._row(self.cat_food).total_amount, Decimal("80.00"))
+
+        tx.category = self.cat_rent
+        tx.date = self.month - timedelta(days=1)
+        tx.save()
+
+        food = self._row(self.cat_food)
+        self.assertEqual(food.total_amount, Decimal("0.00"))
+        self.assertEqual(food.transaction_count, 0)
+
+        previous_month = (self.month - timedelta(days=1)).replace(day=1)
+        rent = self._row(self.cat_rent, month=previous_month)
+        self.assertEqual(rent.total_amount, Decimal("80.00"))
+        self.assertEqual(rent.transaction_count, 1)
+
+    def test_soft_delete_and_restore(self):
+        tx = self._create("100", self.cat_food)
+        self._create("40", self.cat_food)
+
+        tx.soft_delete()
+        row = self._row(self.cat_food)
+        self.assertEqual(row.total_amount, Decimal("40.00"))
+        self.assertEqual(row.transaction_count, 1)
+
+        tx.deleted_at = None
+        tx.save(update_fields=['deleted_at'])
+        row.refresh_from_db()
+        self.assertEqual(row.total_amount, Decimal("140.00"))
+        self.assertEqual(row.transaction_count, 2)
+
+    def test_hard_delete_removes_entry(self):
+        tx = self._create("100", self.cat_food)
+        tx.delete()
+
+        row = self._row(self.cat_food)
+        self.assertEqual(row.total_amount, Decimal("0.00"))
+        self.assertEqual(row.transaction_count, 0)
+
+    def test_rebuild_matches_incremental_state(self):
+        self._create("100", self.cat_food)
+        self._create("60", self.cat_rent, date=self.month - timedelta(days=1))
+        deleted = self._create("25", self.cat_food)
+        deleted.soft_delete()
+
+        expected = {
+            (row.month, row.type, row.category_id): (row.total_amount, row.transaction_count)
+            for row in UserMonthlyLedger.objects.filter(user=self.user, transaction_count__gt=0)
+        }
+
+        UserMonthlyLedger.objects.filter(user=self.user).update(total_amount=Decimal("999"))
+        created = rebuild_monthly_ledger([self.user.id])
+
+        rebuilt = {
+            (row.month, row.type, row.category_id): (row.total_amount, row.transaction_count)
+            for row in UserMonthlyLedger.objects.filter(user=self.user)
+        }
+        self.assertEqual(created, 2)
+        self.assertEqual(rebuilt, expected)
+
+    def test_category_delete_moves_totals_to_uncategorized(self):
+        self._create("100", self.cat_food)
+        self._create("20")
+
+        self.cat_food.delete()
+
+        self.assertFalse(UserMonthlyLedger.objects.filter(user=self.user, category__isnull=False).exists())
+        uncategorized = self._row(None)
+        self.assertEqual(uncategorized.total_amount, Decimal("120.00"))
+        self.assertEqual(uncategorized.transaction_count, 2)
@@ -0,0 +1,237 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from finance.models import Transaction, TransactionLink
+from finance.services import (
+    auto_link_recurring_transactions,
+    find_link_total_drift,
+    rebuild_link_totals,
+)
+from finance.tasks import auto_link_recurring_sweep
+
+User = get_user_model()
+
+
+class TransactionLinkTotalsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='linktotals',
+            email='linktotals@example.com',
+            password='password123',
+        )
+        self.income = self._create(Transaction.TransactionType.INCOME, "1000")
+        self.expense = self._create(Transaction.TransactionType.EXPENSE, "300")
+
+    def _create(self, tx_type, amount):
+        return Transaction.objects.create(
+            user=self.user, type=tx_type, amount=Decimal(amount),
+            date=timezone.now().date(), description="Teste"
+        )
+
+    def _link(self, amount, target=None):
+        return TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=self.income.id,
+            target_transaction_uuid=(target or self.expense).id,
+            linked_amount=Decimal(amount),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+        )
+
+    def _refresh(self):
+        self.income.refresh_from_db()
+        self.expense.refresh_from_db()
+
+    def test_create_update_delete_keep_totals(self):
+        link = self._link("100")
+        self._refresh()
+        self.assertEqual(self.income.linked_total, Decimal("100.00"))
+        self.assertEqual(self.expense.received_total, Decimal("100.00"))
+
+        link.linked_amount = Decimal("250")
+        link.save()
+        self._refresh()
+        self.assertEqual(self.income.available_amount, Decimal("750.00"))
+        self.assertEqual(self.expense.available_amount, Decimal("50.00"))
+
+        link.delete()
+        self._refresh()
+        self.assertEqual(self.income.linked_total, Decimal("0.00"))
+        self.assertEqual(self.expense.received_total, Decimal("0.00"))
+
+    def test_moving_link_to_another_target(self):
+        other = self._create(Transaction.TransactionType.EXPENSE, "200")
+        link = self._link("150")
+
+        link.target_transaction_uuid = other.id
+        link.save()
+
+        self._refresh()
+        other.refresh_from_db()
+        self.assertEqual(self.expense.received_total, Decimal("0.00"))
+        self.assertEqual(other.received_total, Decimal("150.00"))
+        self.assertEqual(self.income.linked_total, Decimal("150.00"))
+
+    def test_rejects_link_above_pending_balance(self):
+        self._link("200")
+
+        with self.assertRaises(ValidationError):
+            self._link("150")
+
+        self._refresh()
+        self.assertEqual(self.income.linked_total, Decimal("200.00"))
+        self.assertEqual(self.expense.received_total, Decimal("200.00"))
+
+    def test_rejects_over_allocation_for_any_link_type(self):
+        savings = self._create(Transaction.TransactionType.INCOME, "300")
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=self.expense.id,
+            target_transaction_uuid=savings.id,
+            linked_amount=Decimal("250"),
+            link_type=TransactionLink.LinkType.INTERNAL_TRANSFER,
+        )
+
+        with self.assertRaises(ValidationError):
+            TransactionLink.objects.create(
+                user=self.user,
+                source_transaction_uuid=self.expense.id,
+                target_transaction_uuid=self.income.id,
+                linked_amount=Decimal("100"),
+                link_type=TransactionLink.LinkType.INTERNAL_TRANSFER,
+            )
+
+        self._refresh()
+        self.assertEqual(self.expense.linked_total, Decimal("250.00"))
+        self.assertEqual(self.income.received_total, Decimal("0.00"))
+
+    def test_balance_reads_do_not_query(self):
+        self._link("100")
+        self._refresh()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.income.available_amount, Decimal("900.00"))
+            self.assertEqual(self.expense.link_percentage, Decimal("100.00") / Decimal("3"))
+
+    def test_stale_instance_save_keeps_totals(self):
+        stale = Transaction.objects.get(id=self.income.id)
+        self._link("100")
+
+        stale.description = "Salário"
+        stale.save()
+
+        self.income.refresh_from_db()
+        self.assertEqual(self.income.linked_total, Decimal("100.00"))
+
+    def test_rebuild_fixes_drift(self):
+        self._link("100")
+        Transaction.objects.filter(id=self.income.id).update(linked_total=Decimal("5"))
+
+        drift = find_link_total_drift([self.user.id])
+        self.assertEqual([row["id"] for row in drift], [self.income.id])
+
+        self.assertEqual(rebuild_link_totals([self.user.id]), 1)
+        self.assertEqual(find_link_total_drift([self.user.id]), [])
+        self.income.refresh_from_db()
+        self.assertEqual(self.income.linked_total, Decimal("100.00"))
+
+
+class AutoLinkRecurringTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='autolink',
+            email='autolink@example.com',
+            password='password123',
+        )
+        self.today = timezone.now().date()
+
+    def _recurring(self, tx_type, description, amount, months_ago):
+        return Transaction.objects.create(
+            user=self.user, type=tx_type, amount=Decimal(amount),
+            date=self.today - timedelta(days=30 * months_ago), description=description,
+            is_recurring=True, recurrence_value=1,
+            recurrence_unit=Transaction.RecurrenceUnit.MONTHS,
+        )
+
+    def test_links_next_occurrences_in_date_order(self):
+        salaries = [self._recurring(Transaction.TransactionType.INCOME, "Salário", "3000", m) for m in (2, 1, 0)]
+        rents = [self._recurring(Transaction.TransactionType.EXPENSE, "Aluguel", "1200", m) for m in (2, 1, 0)]
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=salaries[0].id,
+            target_transaction_uuid=rents[0].id,
+            linked_amount=Decimal("1200"),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+            is_recurring=True,
+        )
+
+        self.assertEqual(auto_link_recurring_transactions(self.user), 1)
+        link = TransactionLink.objects.get(source_transaction_uuid=salaries[1].id)
+        self.assertEqual(link.target_transaction_uuid, rents[1].id)
+        self.assertTrue(link.is_recurring)
+
+        salaries[1].refresh_from_db()
+        rents[1].refresh_from_db()
+        self.assertEqual(salaries[1].linked_total, Decimal("1200.00"))
+        self.assertEqual(rents[1].received_total, Decimal("1200.00"))
+
+        # A nova ocorrência vinculada também é recorrente e puxa a seguinte
+        self.assertEqual(auto_link_recurring_transactions(self.user), 1)
+        self.assertTrue(TransactionLink.objects.filter(
+            source_transaction_uuid=salaries[2].id, target_transaction_uuid=rents[2].id
+        ).exists())
+        self.assertEqual(auto_link_recurring_transactions(self.user), 0)
+        self.assertEqual(find_link_total_drift([self.user.id]), [])
+
+    def test_rechecks_balance_under_lock(self):
+        salaries = [self._recurring(Transaction.TransactionType.INCOME, "Salário", "3000", m) for m in (1, 0)]
+        rents = [self._recurring(Transaction.TransactionType.EXPENSE, "Aluguel", "1200", m) for m in (1, 0)]
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=salaries[0].id,
+            target_transaction_uuid=rents[0].id,
+            linked_amount=Decimal("1200"),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+            is_recurring=True,
+        )
+
+        # Outro vínculo consome o saldo do aluguel entre o casamento e a gravação
+        real_atomic = db_transaction.atomic
+        concurrent = []
+
+        def atomic(*args, **kwargs):
+            if not concurrent:
+                concurrent.append(True)
+                Transaction.objects.filter(id=rents[1].id).update(received_total=Decimal("1000"))
+            return real_atomic(*args, **kwargs)
+
+        with mock.patch('finance.services.transactions.db_transaction.atomic', side_effect=atomic):
+            self.assertEqual(auto_link_recurring_transactions(self.user), 0)
+
+        rents[1].refresh_from_db()
+        salaries[1].refresh_from_db()
+        self.assertEqual(rents[1].received_total, Decimal("1000.00"))
+        self.assertEqual(salaries[1].linked_total, Decimal("0.00"))
+
+    def test_sweep_task_covers_all_users(self):
+        salary = self._recurring(Transaction.TransactionType.INCOME, "Salário", "100", 1)
+        rent = self._recurring(Transaction.TransactionType.EXPENSE, "Aluguel", "100", 1)
+        self._recurring(Transaction.TransactionType.INCOME, "Salário", "100", 0)
+        self._recurring(Transaction.TransactionType.EXPENSE, "Aluguel", "100", 0)
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=salary.id,
+            target_transaction_uuid=rent.id,
+            linked_amount=Decimal("100"),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+            is_recurring=True,
+        )
+
+        result = auto_link_recurring_sweep()
+
+        self.assertEqual(result['users'], 1)
+        self.assertEqual(result['links_created'], 1)
@@ -1,6 +1,8 @@
 
 from decimal import Decimal
+from unittest import mock
 from datetime import timedelta
+from django.core.exceptions import FieldError
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -15,9 +17,9 @@ from finance.mission_types import (
     CategoryReductionValidator,
     CategoryLimitValidator,
     TransactionConsistencyValidator,
-    PaymentDisciplineValidator,
     MultiCriteriaValidator,
     MissionValidatorFactory,
+    MetricsContext,
 )
 
 
@@ -316,3 +318,143 @@ class MissionValidatorFactoryTest(TestCase):
         )
         
         self.assertIsInstance(validator, MultiCriteriaValidator)
+
+
+class MetricsContextTest(TestCase):
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='contexttest',
+            email='context@example.com',
+            password='testpass123'
+        )
+        self.food = Category.objects.get(user=self.user, name='Alimentação', type='EXPENSE')
+        self.savings = Category.objects.create(
+            user=self.user,
+            name='Reserva Teste',
+            type='EXPENSE',
+            group=Category.CategoryGroup.SAVINGS
+        )
+        started_at = timezone.now() - timedelta(days=14)
+        
+        missions = [
+            Mission.objects.create(
+                title='Primeiros Passos', description='Teste', mission_type='ONBOARDING',
+                validation_type='TRANSACTION_COUNT', transaction_type_filter='ALL',
+                min_transactions=5, duration_days=30, reward_points=50
+            ),
+            Mission.objects.create(
+                title='Consistência', description='Teste', mission_type='INCOME_TRACKING',
+                validation_type='TRANSACTION_CONSISTENCY', transaction_type_filter='ALL',
+                min_transaction_frequency=2, duration_days=28, reward_points=100
+            ),
+            Mission.objects.create(
+                title='Limite', description='Teste', mission_type='EXPENSE_CONTROL',
+                validation_type='CATEGORY_LIMIT', target_category=self.food,
+                category_spending_limit=Decimal('500.00'), duration_days=30, reward_points=100
+            ),
+            Mission.objects.create(
+                title='Poupar', description='Teste', mission_type='SAVINGS',
+                validation_type='SAVINGS_INCREASE', savings_increase_amount=Decimal('200.00'),
+                duration_days=30, reward_points=100
+            ),
+            Mission.objects.create(
+                title='TPS', description='Teste', mission_type='TPS_IMPROVEMENT',
+                validation_type='INDICATOR_THRESHOLD', target_tps=Decimal('20.00'),
+                duration_days=30, reward_points=100
+            ),
+        ]
+        self.progresses = [
+            MissionProgress.objects.create(
+                user=self.user, mission=mission,
+                status=MissionProgress.Status.ACTIVE, started_at=started_at
+            )
+            for mission in missions
+        ]
+        
+        # Validadores que também consultam o banco por outros motivos
+        # (categorias-alvo etc.); ficam fora do teste de zero consultas
+        multi_criteria = Mission.objects.create(
+            title='Várias metas', description='Teste', mission_type='ADVANCED',
+            validation_type='MULTI_CRITERIA', category_spending_limit=Decimal('400.00'),
+            duration_days=30, reward_points=100
+        )
+        multi_criteria.target_categories.add(self.food)
+        other_missions = [
+            Mission.objects.create(
+                title='Reduzir', description='Teste', mission_type='CATEGORY_REDUCTION',
+                validation_type='CATEGORY_REDUCTION', target_category=self.food,
+                target_reduction_percent=Decimal('10.00'), duration_days=30, reward_points=100
+            ),
+            Mission.objects.create(
+                title='Variação', description='Teste', mission_type='EXPENSE_CONTROL',
+                validation_type='PERCENTAGE_CHANGE', transaction_type_filter='EXPENSE',
+                duration_days=30, reward_points=100
+            ),
+            multi_criteria,
+        ]
+        self.other_progresses = [
+            MissionProgress.objects.create(
+                user=self.user, mission=mission,
+                status=MissionProgress.Status.ACTIVE, started_at=started_at
+            )
+            for mission in other_missions
+        ]
+        
+        for day in range(-20, 10):
+            Transaction.objects.create(
+                user=self.user, category=self.food, type='EXPENSE',
+                amount=Decimal('30.00'), date=(started_at + timedelta(days=day)).date(),
+                description=f'Mercado {day}'
+            )
+        Transaction.objects.create(
+            user=self.user, category=self.savings, type='EXPENSE',
+            amount=Decimal('250.00'), date=timezone.now().date(), description='Aporte'
+        )
+    
+    def _results(self, context=None, progresses=None):
+        return [
+            MissionValidatorFactory.create_validator(
+                progress.mission, self.user, progress, context
+            ).calculate_progress()
+            for progress in (self.progresses if progresses is None else progresses)
+        ]
+    
+    def test_context_matches_direct_queries(self):
+        progresses = self.progresses + self.other_progresses
+        context = MetricsContext.for_progresses(self.user, progresses)
+        
+        self.assertEqual(self._results(context, progresses), self._results(None, progresses))
+    
+    def test_fields_outside_context_go_to_database(self):
+        context = MetricsContext.for_progresses(self.user, self.progresses)
+        
+        self.assertFalse(context.covers(is_paid=True, date__gte=context.date_since))
+        self.assertTrue(context.covers(type='EXPENSE', date__gte=context.date_since))
+        with self.assertRaises(FieldError):
+            context.select(is_paid=True)
+    
+    def test_context_evaluates_all_missions_without_extra_queries(self):
+        context = MetricsContext.for_progresses(self.user, self.progresses)
+        context.summary
+        
+        with self.assertNumQueries(0):
+            results = self._results(context)
+        
+        self.assertEqual(len(results), len(self.progresses))
+    
+    def test_validate_completion_reuses_computed_result(self):
+        context = MetricsContext.for_progresses(self.user, self.progresses)
+        
+        for progress in self.progresses:
+            validator = MissionValidatorFactory.create_validator(
+                progress.mission, self.user, progress, context
+            )
+            with mock.patch.object(
+                validator, 'calculate_progress', wraps=validator.calculate_progress
+            ) as calculate:
+                result = validator.evaluate()
+                validator.validate_completion(result)
+                validator.validate_completion()
+            
+            self.assertEqual(calculate.call_count, 1)
@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from finance.models import ScheduledOccurrence, Transaction
+from finance.services import cashflow_series, occurrence_dates, refresh_scheduled_occurrences
+from finance.tasks import refresh_scheduled_occurrences_task
+
+User = get_user_model()
+
+MONTHS = Transaction.RecurrenceUnit.MONTHS
+WEEKS = Transaction.RecurrenceUnit.WEEKS
+DAYS = Transaction.RecurrenceUnit.DAYS
+
+
+class OccurrenceDatesTest(TestCase):
+    def test_months_keep_anchor_day_and_respect_value(self):
+        dates = occurrence_dates(date(2026, 1, 31), MONTHS, 2, after=date(2026, 1, 31), until=date(2026, 12, 31))
+        self.assertEqual(dates, [
+            date(2026, 3, 31), date(2026, 5, 31), date(2026, 7, 31),
+            date(2026, 9, 30), date(2026, 11, 30),
+        ])
+
+    def test_months_start_after_window_start(self):
+        dates = occurrence_dates(date(2020, 1, 31), MONTHS, 1, after=date(2026, 2, 10), until=date(2026, 4, 30))
+        self.assertEqual(dates, [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)])
+
+    def test_weeks_and_days_with_end_date_and_limit(self):
+        self.assertEqual(
+            occurrence_dates(date(2026, 3, 2), WEEKS, 2, after=date(2026, 3, 10), until=date(2026, 6, 1),
+                             end_date=date(2026, 4, 14)),
+            [date(2026, 3, 16), date(2026, 3, 30), date(2026, 4, 13)],
+        )
+        self.assertEqual(
+            occurrence_dates(date(2000, 1, 1), DAYS, 3, after=date(2026, 3, 1), until=date(2026, 12, 31), limit=2),
+            [date(2026, 3, 3), date(2026, 3, 6)],
+        )
+
+    def test_invalid_or_finished_recurrences(self):
+        self.assertEqual(occurrence_dates(date(2026, 1, 1), MONTHS, 0, date(2026, 1, 1), date(2026, 6, 1)), [])
+        self.assertEqual(occurrence_dates(date(2026, 1, 1), 'YEARS', 1, date(2026, 1, 1), date(2027, 6, 1)), [])
+        self.assertEqual(
+            occurrence_dates(date(2026, 1, 1), MONTHS, 1, date(2026, 5, 1), date(2026, 9, 1), end_date=date(2026, 4, 1)),
+            [],
+        )
+
+
+class ScheduledOccurrenceTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='scheduleuser',
+            email='schedule@example.com',
+            password='password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.localdate()
+
+    def _recurring(self, **overrides):
+        data = {
+            'user': self.user,
+            'type': Transaction.TransactionType.EXPENSE,
+            'description': 'Aluguel',
+            'amount': Decimal('1000.00'),
+            'date': self.today,
+            'is_recurring': True,
+            'recurrence_value': 1,
+            'recurrence_unit': MONTHS,
+        }
+        data.update(overrides)
+        return Transaction.objects.create(**data)
+
+    def test_saving_recurring_transaction_refreshes_schedule(self):
+        with mock.patch('finance.tasks.refresh_scheduled_occurrences_task.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            rent = self._recurring()
+        delay.assert_called_once_with([self.user.id])
+        self.assertFalse(ScheduledOccurrence.objects.exists())
+
+        refresh_scheduled_occurrences_task(*delay.call_args.args)
+        dates = list(ScheduledOccurrence.objects.filter(transaction=rent).values_list('date', flat=True))
+        self.assertGreaterEqual(len(dates), 3)
+        self.assertTrue(all(day > self.today for day in dates))
+
+    def test_refreshes_inline_when_broker_is_unavailable(self):
+        with mock.patch('finance.tasks.refresh_scheduled_occurrences_task.delay', side_effect=OSError), \
+                self.captureOnCommitCallbacks(execute=True):
+            rent = self._recurring()
+
+        self.assertTrue(ScheduledOccurrence.objects.filter(transaction=rent).exists())
+
+    def test_copies_of_a_series_are_expanded_once(self):
+        self._recurring(date=self.today - timedelta(days=62))
+        latest = self._recurring(date=self.today - timedelta(days=31))
+        refresh_scheduled_occurrences()
+
+        self.assertEqual(
+            set(ScheduledOccurrence.objects.filter(user=self.user).values_list('transaction_id', flat=True)),
+            {latest.id},
+        )
+
+    def test_full_refresh_drops_users_without_recurrences(self):
+        rent = self._recurring()
+        refresh_scheduled_occurrences()
+        self.assertTrue(ScheduledOccurrence.objects.filter(user=self.user).exists())
+
+        rent.is_recurring = False
+        rent.save()
+        refresh_scheduled_occurrences()
+        self.assertFalse(ScheduledOccurrence.objects.filter(user=self.user).exists())
+
+    def test_upcoming_endpoint_and_projection_read_precomputed_rows(self):
+        self._recurring()
+        self._recurring(
+            type=Transaction.TransactionType.INCOME, description='Freela', amount=Decimal('100.00'),
+            recurrence_unit=WEEKS,
+        )
+        ended = self._recurring(description='Academia', amount=Decimal('90.00'))
+        refresh_scheduled_occurrences([self.user.id])
+        ended.soft_delete()
+
+        response = self.client.get(reverse('transaction-upcoming'), {'days': 14, 'type': 'EXPENSE'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(row['description'] == 'Aluguel' for row in response.data['results']))
+
+        response = self.client.get(reverse('transaction-upcoming'), {'days': 14})
+        freelas = [row for row in response.data['results'] if row['description'] == 'Freela']
+        self.assertEqual(len(freelas), 2)
+
+        projections = [point for point in cashflow_series(self.user) if point['is_projection']]
+        self.assertEqual(len(projections), 3)
+        for point in projections:
+            self.assertEqual(point['expense'], Decimal('1000.00'))
+            self.assertIn(point['income'], (Decimal('400.00'), Decimal('500.00')))
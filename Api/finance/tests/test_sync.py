@@ -0,0 +1,326 @@
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from finance.models import Category, Transaction, TransactionLink, UserMonthlyLedger
+from finance.services import decode_sync_cursor, encode_sync_cursor, record_sync_tombstones
+
+User = get_user_model()
+
+
+class TransactionSyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='syncuser',
+            email='sync@example.com',
+            password='password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(
+            user=self.user, name='Mercado Offline', type=Category.CategoryType.EXPENSE
+        )
+        self.url = reverse('transaction-sync')
+
+    def _item(self, **overrides):
+        item = {
+            'id': str(uuid.uuid4()),
+            'type': Transaction.TransactionType.EXPENSE,
+            'description': 'Compra offline',
+            'amount': '40.00',
+            'date': '2026-03-10',
+            'category_id': self.category.id,
+            'updated_at': timezone.now().isoformat(),
+        }
+        item.update(overrides)
+        return item
+
+    def _ledger_total(self, month=date(2026, 3, 1)):
+        row = UserMonthlyLedger.objects.filter(
+            user=self.user, month=month, type=Transaction.TransactionType.EXPENSE, category=self.category
+        ).first()
+        return (row.total_amount, row.transaction_count) if row else (Decimal('0'), 0)
+
+    def test_creates_batch_with_client_ids_and_single_side_effects(self):
+        items = [self._item(amount='40.00'), self._item(amount='60.00')]
+
+        with mock.patch('finance.tasks.schedule_mission_recompute') as schedule, \
+                mock.patch('finance.signals.update_missions_on_transaction') as signal:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {'transactions': items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'created'])
+        self.assertEqual(response.data['summary'], {'created': 2})
+        self.assertTrue(decode_sync_cursor(response.data['cursor']))
+        self.assertEqual(
+            set(Transaction.objects.filter(user=self.user).values_list('id', flat=True)),
+            {uuid.UUID(item['id']) for item in items},
+        )
+        self.assertEqual(self._ledger_total(), (Decimal('100.00'), 2))
+        schedule.assert_called_once_with(self.user.id)
+        signal.assert_not_called()
+
+    def test_update_conflict_and_delete(self):
+        tx = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Conta',
+            amount=Decimal('50.00'),
+            date=date(2026, 3, 5),
+            category=self.category,
+        )
+        stale = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Editada no servidor',
+            amount=Decimal('30.00'),
+            date=date(2026, 3, 6),
+            category=self.category,
+        )
+        doomed = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Apagar',
+            amount=Decimal('20.00'),
+            date=date(2026, 3, 7),
+            category=self.category,
+        )
+        later = (timezone.now() + timedelta(seconds=5)).isoformat()
+        earlier = (stale.updated_at - timedelta(minutes=5)).isoformat()
+
+        response = self.client.post(self.url, {'transactions': [
+            {'id': str(tx.id), 'amount': '75.00', 'updated_at': later},
+            {'id': str(stale.id), 'amount': '99.00', 'updated_at': earlier},
+            {'id': str(doomed.id), 'deleted': True, 'updated_at': later},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['updated', 'conflict', 'deleted'])
+        self.assertEqual(results[1]['server']['amount'], '30.00')
+
+        tx.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(tx.amount, Decimal('75.00'))
+        self.assertEqual(tx.description, 'Conta')
+        self.assertEqual(stale.amount, Decimal('30.00'))
+        self.assertFalse(Transaction.objects.filter(id=doomed.id).exists())
+        self.assertEqual(self._ledger_total(), (Decimal('105.00'), 2))
+
+    def test_item_errors_do_not_block_the_batch(self):
+        other = User.objects.create_user(username='othersync', email='o@example.com', password='x12345678')
+        foreign = Transaction.objects.create(
+            user=other,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Alheia',
+            amount=Decimal('10.00'),
+            date=date(2026, 3, 1),
+        )
+        income = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.INCOME,
+            description='Salário',
+            amount=Decimal('100.00'),
+            date=date(2026, 3, 1),
+        )
+        expense = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Aluguel',
+            amount=Decimal('80.00'),
+            date=date(2026, 3, 2),
+        )
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=income.id,
+            target_transaction_uuid=expense.id,
+            linked_amount=Decimal('50.00'),
+        )
+        later = (timezone.now() + timedelta(seconds=5)).isoformat()
+
+        response = self.client.post(self.url, {'transactions': [
+            self._item(),
+            {'id': str(foreign.id), 'amount': '1.00', 'updated_at': later},
+            {'id': str(expense.id), 'amount': '20.00', 'updated_at': later},
+            {'id': str(expense.id), 'deleted': True, 'updated_at': later},
+            self._item(amount='-5'),
+            {'updated_at': later},
+            self._item(description=''),
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error', 'error', 'error', 'error', 'error'])
+        self.assertIn('amount', response.data['results'][2]['errors'])
+        self.assertEqual(response.data['summary'], {'created': 1, 'error': 6})
+
+        foreign.refresh_from_db()
+        expense.refresh_from_db()
+        self.assertEqual(foreign.amount, Decimal('10.00'))
+        self.assertEqual(expense.amount, Decimal('80.00'))
+        self.assertIsNone(expense.deleted_at)
+
+    def test_rejects_oversized_or_malformed_batches(self):
+        response = self.client.post(self.url, {'transactions': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch('finance.views.transactions.SYNC_MAX_ITEMS', 1):
+            response = self.client.post(
+                self.url, {'transactions': [self._item(), self._item()]}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+
+@mock.patch('finance.services.sync.SYNC_CURSOR_OVERLAP', timedelta(0))
+class SyncChangesTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='deltauser',
+            email='delta@example.com',
+            password='password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('sync-changes')
+        self.income = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.INCOME,
+            description='Salário',
+            amount=Decimal('1000.00'),
+            date=date(2026, 3, 1),
+        )
+        self.expense = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Aluguel',
+            amount=Decimal('400.00'),
+            date=date(2026, 3, 2),
+        )
+        self.unchanged = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Sem mudanças',
+            amount=Decimal('15.00'),
+            date=date(2026, 3, 3),
+        )
+        self.category = Category.objects.create(
+            user=self.user, name='Temporária', type=Category.CategoryType.EXPENSE
+        )
+
+    def test_full_snapshot_then_delta_with_tombstones(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['full'])
+        self.assertEqual(len(response.data['transactions']), 3)
+        cursor = response.data['cursor']
+
+        link = TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=self.income.id,
+            target_transaction_uuid=self.expense.id,
+            linked_amount=Decimal('100.00'),
+        )
+        doomed = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Apagada',
+            amount=Decimal('5.00'),
+            date=date(2026, 3, 4),
+        )
+        doomed.soft_delete()
+        category_id = self.category.id
+        response = self.client.delete(reverse('category-detail', args=[category_id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(self.url, {'since': cursor})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['full'])
+        self.assertEqual(
+            {tx['id'] for tx in response.data['transactions']},
+            {str(self.income.id), str(self.expense.id)},
+        )
+        self.assertEqual([item['id'] for item in response.data['links']], [str(link.id)])
+        self.assertEqual(response.data['categories'], [])
+        self.assertEqual(response.data['deleted']['transactions'], [str(doomed.id)])
+        self.assertEqual(response.data['deleted']['categories'], [str(category_id)])
+
+        link_id = link.id
+        cursor = response.data['cursor']
+        response = self.client.delete(reverse('transaction-link-detail', args=[link_id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.data['deleted']['links'], [str(link_id)])
+        self.assertEqual(len(response.data['transactions']), 2)
+
+    def test_tombstones_are_written_in_bulk(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(record_sync_tombstones(Transaction.objects.filter(user=self.user)), 3)
+
+        response = self.client.get(self.url, {'since': encode_sync_cursor(timezone.now() - timedelta(minutes=1))})
+        self.assertEqual(len(response.data['deleted']['transactions']), 3)
+
+    def test_invalid_or_expired_cursor(self):
+        response = self.client.get(self.url, {'since': 'nao-e-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        expired = encode_sync_cursor(timezone.now() - timedelta(days=365))
+        response = self.client.get(self.url, {'since': expired})
+        self.assertTrue(response.data['full'])
+        self.assertEqual(len(response.data['transactions']), 3)
+
+    def test_list_etag_returns_304_until_data_changes(self):
+        url = reverse('transaction-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, {'type': 'INCOME'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.unchanged.soft_delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        links_url = reverse('transaction-link-list')
+        etag = self.client.get(links_url)['ETag']
+        self.assertEqual(
+            self.client.get(links_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.expense.amount = Decimal('450.00')
+        self.expense.save()
+        self.assertEqual(
+            self.client.get(links_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_200_OK,
+        )
+
+        # O progresso das missões é calculado a partir das transações
+        progress_url = reverse('mission-progress-list')
+        etag = self.client.get(progress_url)['ETag']
+        self.assertEqual(
+            self.client.get(progress_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            description='Nova',
+            amount=Decimal('12.00'),
+            date=date(2026, 3, 6),
+        )
+        self.assertEqual(
+            self.client.get(progress_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_200_OK,
+        )
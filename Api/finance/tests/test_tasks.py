@@ -0,0 +1,163 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from finance.models import Mission, MissionProgress, Transaction
+from finance.services import read_dashboard, user_cache_key
+from finance.tasks import (
+    check_expired_missions,
+    recompute_user_missions,
+    refresh_user_missions_async,
+    schedule_mission_recompute,
+)
+
+User = get_user_model()
+
+
+@override_settings(MISSION_RECOMPUTE_DEBOUNCE_SECONDS=30)
+class MissionRecomputeDebounceTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='debounceuser',
+            email='debounce@example.com',
+            password='testpass123'
+        )
+        cache.clear()
+
+    def test_burst_of_writes_enqueues_single_job(self):
+        with mock.patch.object(recompute_user_missions, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(20):
+                    Transaction.objects.create(
+                        user=self.user,
+                        type=Transaction.TransactionType.EXPENSE,
+                        amount=Decimal('10.00'),
+                        date=timezone.now().date(),
+                        description=f'Compra {i}'
+                    )
+
+        apply_async.assert_called_once_with(args=[self.user.id], countdown=30)
+
+    def test_scheduled_transactions_still_enqueue_recompute(self):
+        with mock.patch.object(recompute_user_missions, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                Transaction.objects.create(
+                    user=self.user,
+                    type=Transaction.TransactionType.EXPENSE,
+                    amount=Decimal('10.00'),
+                    date=timezone.now().date() + timedelta(days=5),
+                    description='Conta futura'
+                )
+
+        # A atribuição de missões vale também para transações agendadas
+        apply_async.assert_called_once_with(args=[self.user.id], countdown=30)
+
+    def test_moving_transaction_to_future_removes_it_from_progress(self):
+        mission = Mission.objects.create(
+            title='Primeiros Passos', description='Teste', mission_type='ONBOARDING',
+            validation_type='TRANSACTION_COUNT', transaction_type_filter='ALL',
+            min_transactions=2, duration_days=30, reward_points=50
+        )
+        progress = MissionProgress.objects.create(
+            user=self.user, mission=mission, status=MissionProgress.Status.ACTIVE,
+            started_at=timezone.now() - timedelta(days=1)
+        )
+        tx = Transaction.objects.create(
+            user=self.user,
+            type=Transaction.TransactionType.EXPENSE,
+            amount=Decimal('10.00'),
+            date=timezone.now().date(),
+            description='Conta'
+        )
+        refresh_user_missions_async(self.user.id)
+        progress.refresh_from_db()
+        self.assertEqual(progress.progress, Decimal('50.00'))
+
+        with mock.patch.object(recompute_user_missions, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                tx.date = timezone.now().date() + timedelta(days=5)
+                tx.save()
+        apply_async.assert_called_once()
+
+        refresh_user_missions_async(self.user.id)
+        progress.refresh_from_db()
+        self.assertEqual(progress.progress, Decimal('0.00'))
+
+    def test_job_clears_pending_marker(self):
+        with mock.patch.object(recompute_user_missions, 'apply_async') as apply_async:
+            self.assertTrue(schedule_mission_recompute(self.user.id))
+            self.assertFalse(schedule_mission_recompute(self.user.id))
+
+            with mock.patch('finance.tasks.refresh_user_missions_async') as refresh:
+                recompute_user_missions(self.user.id)
+            refresh.assert_called_once_with(self.user.id)
+
+            self.assertTrue(schedule_mission_recompute(self.user.id))
+
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_broker_failure_runs_inline(self):
+        with mock.patch.object(recompute_user_missions, 'apply_async', side_effect=ConnectionError):
+            with mock.patch('finance.tasks.refresh_user_missions_async') as refresh:
+                self.assertFalse(schedule_mission_recompute(self.user.id))
+
+        refresh.assert_called_once_with(self.user.id)
+        self.assertIsNone(cache.get(f'mission_recompute_pending_{self.user.id}'))
+
+
+class CheckExpiredMissionsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='expireuser',
+            email='expire@example.com',
+            password='testpass123'
+        )
+
+    def _progress(self, duration_days, days_ago, status=MissionProgress.Status.ACTIVE):
+        mission = Mission.objects.create(
+            title=f'Missão {Mission.objects.count()}', description='Teste',
+            mission_type='ONBOARDING', duration_days=duration_days, reward_points=10
+        )
+        return MissionProgress.objects.create(
+            user=self.user, mission=mission, status=status,
+            started_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_expires_only_overdue_open_missions_in_chunks(self):
+        overdue = [self._progress(7, 10) for _ in range(3)]
+        overdue.append(self._progress(7, 8, MissionProgress.Status.PENDING))
+        within_deadline = self._progress(60, 10)
+        completed = self._progress(7, 10, MissionProgress.Status.COMPLETED)
+
+        result = check_expired_missions(chunk_size=3)
+
+        self.assertEqual(result['expired_count'], 4)
+        self.assertEqual(result['chunks'], [3, 1])
+        for progress in overdue:
+            progress.refresh_from_db()
+            self.assertEqual(progress.status, MissionProgress.Status.FAILED)
+        within_deadline.refresh_from_db()
+        completed.refresh_from_db()
+        self.assertEqual(within_deadline.status, MissionProgress.Status.ACTIVE)
+        self.assertEqual(completed.status, MissionProgress.Status.COMPLETED)
+
+    def test_expiration_invalidates_affected_users_caches(self):
+        other = User.objects.create_user(username='semexpirar', password='testpass123')
+        self._progress(7, 10)
+        _, versions, _ = read_dashboard(self.user.id)
+        _, other_versions, _ = read_dashboard(other.id)
+        key = user_cache_key('tier_progression', self.user.id)
+
+        check_expired_missions()
+
+        _, new_versions, _ = read_dashboard(self.user.id)
+        self.assertNotEqual(new_versions['active_missions'], versions['active_missions'])
+        self.assertEqual(new_versions['summary'], versions['summary'])
+        self.assertNotEqual(user_cache_key('tier_progression', self.user.id), key)
+        self.assertEqual(read_dashboard(other.id)[1], other_versions)
@@ -0,0 +1,474 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from finance.models import Category, Transaction, TransactionLink
+
+User = get_user_model()
+
+
+class TransactionKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cursoruser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('transaction-list')
+
+        today = timezone.now().date()
+        # Várias transações na mesma data exercitam o desempate por created_at/id
+        for i in range(7):
+            Transaction.objects.create(
+                user=self.user,
+                description=f"Compra {i}",
+                amount=Decimal('10.00') + i,
+                type=Transaction.TransactionType.EXPENSE,
+                date=today - timedelta(days=i // 3),
+            )
+
+    def _walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_cursor_pages_cover_all_rows_in_offset_order(self):
+        ids, pages = self._walk(f"{self.list_url}?pagination=cursor&limit=3")
+
+        expected = [
+            str(pk) for pk in Transaction.objects.filter(user=self.user)
+            .order_by('-date', '-created_at', '-id')
+            .values_list('id', flat=True)
+        ]
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, expected)
+
+    def test_default_list_keeps_limit_offset(self):
+        response = self.client.get(f"{self.list_url}?limit=3")
+
+        self.assertEqual(response.data['count'], 7)
+        self.assertIn('previous', response.data)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(f"{self.list_url}?cursor=nao-e-um-cursor")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TransactionLinkQueryCountTests(APITestCase):
+    """Listas que renderizam TransactionSerializer não fazem consultas por linha."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='querycountuser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+        self._add_pairs(2)
+
+    def _add_pairs(self, count):
+        for i in range(count):
+            income = Transaction.objects.create(
+                user=self.user,
+                description=f"Receita {i}",
+                amount=Decimal('500.00'),
+                type=Transaction.TransactionType.INCOME,
+                date=self.today,
+            )
+            expense = Transaction.objects.create(
+                user=self.user,
+                description=f"Despesa {i}",
+                amount=Decimal('300.00'),
+                type=Transaction.TransactionType.EXPENSE,
+                date=self.today,
+            )
+            TransactionLink.objects.create(
+                user=self.user,
+                source_transaction_uuid=income.id,
+                target_transaction_uuid=expense.id,
+                linked_amount=Decimal('100.00'),
+                link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+            )
+
+    def _assert_constant_queries(self, url):
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self._add_pairs(3)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def _results(self, response):
+        data = response.data
+        return data['results'] if isinstance(data, dict) else data
+
+    def test_transaction_list(self):
+        response = self._assert_constant_queries(reverse('transaction-list'))
+
+        incomes = [
+            item for item in self._results(response)
+            if item['type'] == Transaction.TransactionType.INCOME
+        ]
+        self.assertEqual(len(incomes), 5)
+        for item in incomes:
+            self.assertEqual(item['linked_amount'], 100.0)
+            self.assertEqual(item['available_amount'], 400.0)
+            self.assertEqual(item['outgoing_links_count'], 1)
+
+    def test_transaction_cursor_list(self):
+        self._assert_constant_queries(f"{reverse('transaction-list')}?pagination=cursor")
+
+    def test_transaction_link_list(self):
+        response = self._assert_constant_queries(reverse('transaction-link-list'))
+
+        results = self._results(response)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]['source_transaction']['linked_amount'], 100.0)
+        self.assertEqual(results[0]['target_transaction']['incoming_links_count'], 1)
+
+    def test_available_sources(self):
+        response = self._assert_constant_queries(
+            f"{reverse('transaction-link-available-sources')}?min_amount=399"
+        )
+
+        self.assertEqual(len(response.data), 5)
+        self.assertTrue(all(item['available_amount'] == 400.0 for item in response.data))
+
+    def test_available_targets(self):
+        response = self._assert_constant_queries(
+            f"{reverse('transaction-link-available-targets')}?max_amount=300"
+        )
+
+        self.assertEqual(len(response.data), 5)
+
+
+class PendingSummaryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='pendinguser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-link-pending-summary')
+
+        today = timezone.now().date()
+        self.income = Transaction.objects.create(
+            user=self.user, description="Salário", amount=Decimal('2000.00'),
+            type=Transaction.TransactionType.INCOME, date=today,
+        )
+        self.debts = {}
+        for name, amount, paid in [('Aluguel', '1000', '900'), ('Luz', '200', '0'),
+                                   ('Cartão', '500', '100'), ('Quitada', '50', '50')]:
+            debt = Transaction.objects.create(
+                user=self.user, description=name, amount=Decimal(amount),
+                type=Transaction.TransactionType.EXPENSE, date=today,
+            )
+            if Decimal(paid):
+                TransactionLink.objects.create(
+                    user=self.user,
+                    source_transaction_uuid=self.income.id,
+                    target_transaction_uuid=debt.id,
+                    linked_amount=Decimal(paid),
+                    link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+                )
+            self.debts[name] = debt
+
+    def test_totals_and_urgency_ordering(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_pending'], 700.0)
+        self.assertEqual(response.data['urgent_count'], 1)
+        self.assertEqual(response.data['available_income'], 950.0)
+        self.assertEqual(
+            [debt['description'] for debt in response.data['debts']],
+            ['Aluguel', 'Cartão', 'Luz'],
+        )
+        rent = response.data['debts'][0]
+        self.assertEqual(rent['paid_amount'], 900.0)
+        self.assertEqual(rent['payment_percentage'], 90.0)
+        self.assertTrue(rent['is_urgent'])
+
+    def test_filter_sort_and_paginate_in_database(self):
+        url = f"{self.url}?sort_by=amount&min_remaining=150&limit=1&offset=1"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        # Agregado, COUNT da paginação, página e saldo das receitas
+        transaction_queries = [q for q in queries.captured_queries if 'finance_transaction' in q['sql']]
+        self.assertEqual(len(transaction_queries), 4)
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([debt['description'] for debt in response.data['debts']], ['Luz'])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual(response.data['total_pending'], 600.0)
+
+
+class BulkPaymentTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='bulkpayuser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-link-bulk-payment')
+
+        today = timezone.now().date()
+        self.income = Transaction.objects.create(
+            user=self.user, description="Salário", amount=Decimal('1000.00'),
+            type=Transaction.TransactionType.INCOME, date=today,
+        )
+        self.expenses = [
+            Transaction.objects.create(
+                user=self.user, description=f"Conta {i}", amount=Decimal('100.00'),
+                type=Transaction.TransactionType.EXPENSE, date=today,
+            )
+            for i in range(6)
+        ]
+
+    def _payments(self, amounts):
+        return [
+            {'source_id': str(self.income.id), 'target_id': str(expense.id), 'amount': amount}
+            for expense, amount in zip(self.expenses, amounts)
+        ]
+
+    def test_batch_uses_running_balances_and_constant_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {'payments': self._payments(['100', '50', '100', '100', '100', '100'])},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created_count'], 6)
+        self.assertEqual(len(response.data['summary']['fully_paid_expenses']), 5)
+        self.assertEqual(response.data['links'][-1]['source_transaction']['available_amount'], 450.0)
+
+        # Trava, bulk_create, bulk_update e recarga para a resposta
+        transaction_queries = [
+            q for q in queries.captured_queries
+            if 'finance_transaction' in q['sql'] and 'finance_transactionlink' not in q['sql']
+        ]
+        self.assertLessEqual(len(transaction_queries), 4)
+
+        self.income.refresh_from_db()
+        self.assertEqual(self.income.linked_total, Decimal('550.00'))
+        self.assertEqual(TransactionLink.objects.filter(user=self.user).count(), 6)
+
+    def test_running_balance_rejects_whole_batch(self):
+        response = self.client.post(
+            self.url,
+            {'payments': self._payments(['100', '100']) + [
+                {'source_id': str(self.income.id), 'target_id': str(self.expenses[0].id), 'amount': '1'}
+            ]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Pagamento #3', response.data['error'])
+        self.assertFalse(TransactionLink.objects.filter(user=self.user).exists())
+        self.income.refresh_from_db()
+        self.assertEqual(self.income.linked_total, Decimal('0.00'))
+
+
+class PaymentReportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reportuser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-link-payment-report')
+
+        today = timezone.now().date()
+        self.category = Category.objects.create(
+            user=self.user, name='Financiamento Casa', type=Category.CategoryType.EXPENSE
+        )
+        income = Transaction.objects.create(
+            user=self.user, description="Salário", amount=Decimal('5000.00'),
+            type=Transaction.TransactionType.INCOME, date=today,
+        )
+        self.rent = Transaction.objects.create(
+            user=self.user, description="Aluguel", amount=Decimal('1000.00'),
+            type=Transaction.TransactionType.EXPENSE, date=today, category=self.category,
+        )
+        self.card = Transaction.objects.create(
+            user=self.user, description="Cartão", amount=Decimal('800.00'),
+            type=Transaction.TransactionType.EXPENSE, date=today,
+        )
+        for debt, amounts in [(self.rent, ['100', '200', '300']), (self.card, ['50'])]:
+            for amount in amounts:
+                TransactionLink.objects.create(
+                    user=self.user,
+                    source_transaction_uuid=income.id,
+                    target_transaction_uuid=debt.id,
+                    linked_amount=Decimal(amount),
+                    link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+                )
+
+    def test_groups_and_totals(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary'], {
+            'total_paid': 650.0, 'total_remaining': 1150.0, 'payment_count': 4,
+        })
+        # Dívida com pagamento mais recente primeiro
+        self.assertEqual([d['debt_description'] for d in response.data['by_debt']], ['Cartão', 'Aluguel'])
+        rent = response.data['by_debt'][1]
+        self.assertEqual(rent['paid_amount'], 600.0)
+        self.assertEqual(rent['payment_percentage'], 60.0)
+        self.assertEqual([p['amount'] for p in rent['payments']], [300.0, 200.0, 100.0])
+        self.assertEqual(rent['payments'][0]['source'], 'Salário')
+
+    def test_category_filter_pagination_and_payment_cap(self):
+        response = self.client.get(
+            f"{self.url}?category={self.category.id}&payments_limit=2&limit=1"
+        )
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(response.data['summary']['payment_count'], 3)
+        rent = response.data['by_debt'][0]
+        self.assertEqual(rent['debt_id'], self.rent.id)
+        self.assertEqual(rent['payments_count'], 3)
+        self.assertEqual([p['amount'] for p in rent['payments']], [300.0, 200.0])
+
+
+class TransactionExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exportuser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-export')
+
+        today = timezone.now().date()
+        self.income = Transaction.objects.create(
+            user=self.user, description="Salário, março", amount=Decimal('1000.00'),
+            type=Transaction.TransactionType.INCOME, date=today,
+        )
+        self.old_expense = Transaction.objects.create(
+            user=self.user, description="Aluguel", amount=Decimal('400.00'),
+            type=Transaction.TransactionType.EXPENSE, date=today - timedelta(days=40),
+        )
+        TransactionLink.objects.create(
+            user=self.user,
+            source_transaction_uuid=self.income.id,
+            target_transaction_uuid=self.old_expense.id,
+            linked_amount=Decimal('150.00'),
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+        )
+
+    def _body(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_stream_with_balances(self):
+        response = self.client.get(f"{self.url}?format=csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(self._body(response))))
+        self.assertEqual([row['description'] for row in rows], ["Salário, março", "Aluguel"])
+        self.assertEqual(rows[0]['linked_amount'], '150.00')
+        self.assertEqual(rows[0]['available_amount'], '850.00')
+        self.assertEqual(rows[1]['available_amount'], '250.00')
+
+    def test_ndjson_respects_list_filters(self):
+        start = (timezone.now().date() - timedelta(days=7)).isoformat()
+        response = self.client.get(f"{self.url}?format=ndjson&start_date={start}")
+
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in self._body(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(self.income.id)])
+        self.assertEqual(rows[0]['type'], Transaction.TransactionType.INCOME)
+
+    def test_link_export(self):
+        response = self.client.get(f"{reverse('transaction-link-export')}?format=ndjson")
+
+        rows = [json.loads(line) for line in self._body(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['target_transaction_id'], str(self.old_expense.id))
+        self.assertEqual(rows[0]['linked_amount'], '150.00')
+
+    def test_invalid_dates_return_400(self):
+        for url in (self.url, reverse('transaction-link-export')):
+            for params in ('start_date=2024-13-01', 'end_date=ontem'):
+                response = self.client.get(f"{url}?format=csv&{params}")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TransactionSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searchuser',
+            password='testpassword123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-list')
+        self.category = Category.objects.create(
+            user=self.user, name='Transporte Urbano', type=Category.CategoryType.EXPENSE
+        )
+        today = timezone.now().date()
+        self.market = Transaction.objects.create(
+            user=self.user, description="Supermercado Central", amount=Decimal('80.00'),
+            type=Transaction.TransactionType.EXPENSE, date=today,
+        )
+        self.ride = Transaction.objects.create(
+            user=self.user, description="Corrida", amount=Decimal('25.00'),
+            type=Transaction.TransactionType.EXPENSE, date=today, category=self.category,
+        )
+
+    def test_fallback_search_on_description_and_category(self):
+        response = self.client.get(self.url, {'search': 'mercado'})
+        self.assertEqual([tx['id'] for tx in response.data['results']], [str(self.market.id)])
+
+        response = self.client.get(self.url, {'search': 'urbano'})
+        self.assertEqual([tx['id'] for tx in response.data['results']], [str(self.ride.id)])
+
+    def test_postgres_search_ranks_by_similarity(self):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from finance.search import TrigramSearchFilter
+
+        request = Request(APIRequestFactory().get(self.url, {'search': 'mercdo'}))
+        request.user = self.user
+        queryset = Transaction.objects.filter(user=self.user).order_by('-date')
+
+        with mock.patch('finance.search.connections') as connections:
+            connections.__getitem__.return_value.vendor = 'postgresql'
+            filtered = TrigramSearchFilter().filter_queryset(request, queryset, view=None)
+
+        self.assertIn('search_rank', filtered.query.annotations)
+        self.assertEqual(filtered.query.order_by, ('-search_rank', '-date'))
+
+        request = Request(APIRequestFactory().get(self.url, {'search': 'mercdo', 'ordering': 'amount'}))
+        request.user = self.user
+        with mock.patch('finance.search.connections') as connections:
+            connections.__getitem__.return_value.vendor = 'postgresql'
+            filtered = TrigramSearchFilter().filter_queryset(request, queryset, view=None)
+        self.assertEqual(filtered.query.order_by, ('-date',))
@@ -9,6 +9,7 @@ from .views import (
     ProfileView,
     RegisterView,
     SimplifiedOnboardingView,
+    SyncChangesView,
     TransactionLinkViewSet,
     TransactionViewSet,
     UserProfileViewSet,
@@ -47,6 +48,7 @@ urlpatterns = [
     path("profile/", ProfileView.as_view(), name="profile-alias"),
     path("onboarding/simplified/", SimplifiedOnboardingView.as_view(), name="simplified-onboarding"),
     path("xp-history/", XPHistoryView.as_view(), name="xp-history"),
+    path("sync/changes/", SyncChangesView.as_view(), name="sync-changes"),
     
     path("admin-panel/", AdminDashboardView.as_view(), name="admin-dashboard"),
     path("admin-panel/missoes/", AdminMissionsView.as_view(), name="admin-missions"),
@@ -10,6 +10,7 @@ from .categories import CategoryViewSet
 from .dashboard import DashboardViewSet
 from .missions import MissionProgressViewSet, MissionViewSet
 from .transactions import TransactionLinkViewSet, TransactionViewSet
+from .sync import SyncChangesView
 from .admin_panel import (
     AdminDashboardView,
     AdminMissionsView,
@@ -35,6 +36,7 @@ __all__ = [
     'MissionViewSet',
     'MissionProgressViewSet',
     'DashboardViewSet',
+    'SyncChangesView',
     'ProfileView',
     'XPHistoryView',
     'SimplifiedOnboardingView',
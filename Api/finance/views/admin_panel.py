@@ -10,6 +10,7 @@ Desenvolvido para o TCC - Sistema de Educação Financeira Gamificada.
 import logging
 
 from django.contrib.auth import get_user_model
+from django.db import transaction as db_transaction
 from django.db.models import Count, Avg, Q
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -27,6 +28,7 @@ from ..serializers import (
     CategorySerializer,
     MissionSerializer,
 )
+from ..services import bump_catalog_generation, record_sync_tombstones
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -243,7 +245,9 @@ class AdminMissionDetailView(APIView):
         try:
             mission = Mission.objects.get(pk=pk)
             titulo = mission.title
-            mission.delete()
+            with db_transaction.atomic():
+                record_sync_tombstones(MissionProgress.objects.filter(mission=mission))
+                mission.delete()
             
             logger.info(f"Missão '{titulo}' excluída por {request.user.username}")
             
@@ -274,7 +278,9 @@ class AdminDeletePendingMissionsView(APIView):
                 'excluidas': 0,
             })
         
-        pending_missions.delete()
+        with db_transaction.atomic():
+            record_sync_tombstones(MissionProgress.objects.filter(mission__in=pending_missions))
+            pending_missions.delete()
         
         logger.info(f"{count} missões pendentes excluídas por {request.user.username}")
         
@@ -303,6 +309,8 @@ class AdminApprovePendingMissionsView(APIView):
             })
         
         pending_missions.update(is_active=True)
+        # update() não dispara post_save
+        bump_catalog_generation()
         
         logger.info(f"{count} missões pendentes aprovadas por {request.user.username}")
         
@@ -660,7 +668,9 @@ class AdminCategoryDetailView(APIView):
         try:
             category = Category.objects.get(pk=pk, is_system_default=True)
             nome = category.name
-            category.delete()
+            with db_transaction.atomic():
+                record_sync_tombstones(Category.objects.filter(pk=category.pk))
+                category.delete()
             
             logger.info(f"Categoria '{nome}' removida por {request.user.username}")
             
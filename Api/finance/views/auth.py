@@ -22,10 +22,12 @@ from .base import (
     MissionProgress,
     Transaction,
     TransactionLink,
+    UserMonthlyLedger,
     UserProfile,
     UserProfileSerializer,
     invalidate_user_dashboard_cache,
     profile_snapshot,
+    record_sync_tombstones,
 )
 
 logger = logging.getLogger(__name__)
@@ -59,7 +61,7 @@ class ProfileView(APIView):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         # Invalidate cache after profile update
-        invalidate_user_dashboard_cache(request.user)
+        invalidate_user_dashboard_cache(request.user, 'profile')
         data = {
             "profile": serializer.data,
             "snapshot": profile_snapshot(request.user),
@@ -94,7 +96,7 @@ class ProfileView(APIView):
         
         # Invalidar cache se metas foram atualizadas
         if updating_goals:
-            invalidate_user_dashboard_cache(request.user)
+            invalidate_user_dashboard_cache(request.user, 'profile')
             logger.info(
                 f"User {request.user.id} updated financial goals - cache invalidated"
             )
@@ -469,9 +471,15 @@ class UserProfileViewSet(
         """Reseta conta do usuário (apenas para desenvolvimento)."""
         user = request.user
         
-        Transaction.objects.filter(user=user).delete()
-        TransactionLink.objects.filter(user=user).delete()
-        MissionProgress.objects.filter(user=user).delete()
+        with db_transaction.atomic():
+            for queryset in (
+                Transaction.objects.filter(user=user),
+                TransactionLink.objects.filter(user=user),
+                MissionProgress.objects.filter(user=user),
+            ):
+                record_sync_tombstones(queryset)
+                queryset.delete()
+            UserMonthlyLedger.objects.filter(user=user).delete()
         
         profile = UserProfile.objects.get(user=user)
         profile.level = 1
@@ -505,7 +513,7 @@ class UserProfileViewSet(
         
         profile.save()
         # Invalidate cache after XP change
-        invalidate_user_dashboard_cache(user)
+        invalidate_user_dashboard_cache(user, 'profile')
         
         return Response({
             'success': True,
@@ -575,7 +583,7 @@ class UserProfileViewSet(
             )
             created.append(str(tx.id))
         
-        invalidate_user_dashboard_cache(user)
+        invalidate_user_dashboard_cache(user, 'transactions')
         
         return Response({
             'success': True,
@@ -3,7 +3,6 @@ import logging
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from django.db import transaction as db_transaction
 from django.db.models import Q, Sum
 from django.utils import timezone
@@ -22,10 +21,14 @@ from ..models import (
     MissionProgress,
     Transaction,
     TransactionLink,
+    UserMonthlyLedger,
     UserProfile,
 )
+from ..exports import EXPORT_RENDERERS, CSVRenderer, NDJSONRenderer, stream_export
+from ..pagination import OptionalLimitOffsetPagination, TransactionKeysetPagination
+from ..search import TrigramSearchFilter
 from ..permissions import IsOwnerPermission, IsOwnerOrReadOnly
-from ..mixins import UUIDLookupMixin, UUIDResponseMixin
+from ..mixins import ETagListMixin, UUIDLookupMixin, UUIDResponseMixin
 from ..throttling import (
     BurstRateThrottle,
     CategoryCreateThrottle,
@@ -39,7 +42,9 @@ from ..serializers import (
     MissionProgressSerializer,
     MissionSerializer,
     TransactionSerializer,
+    ScheduledOccurrenceSerializer,
     TransactionLinkSerializer,
+    TransactionSyncItemSerializer,
     UserProfileSerializer,
 )
 from ..services import (
@@ -47,29 +52,51 @@ from ..services import (
     apply_mission_reward,
     assign_missions_automatically,
     assign_missions_smartly,
+    acquire_dashboard_build,
+    bump_data_version,
+    bump_user_generation,
     calculate_mission_priorities,
     calculate_summary,
     cashflow_series,
     category_breakdown,
+    create_bulk_payments,
+    DASHBOARD_FRAGMENTS,
+    decode_statement,
+    detect_statement_format,
     identify_improvement_opportunities,
     indicator_insights,
-    invalidate_indicators_cache,
+    invalidate_dashboard_fragments,
     profile_snapshot,
+    read_dashboard,
+    record_sync_tombstones,
+    release_dashboard_build,
+    sync_transactions,
+    upcoming_occurrences,
     update_mission_progress,
+    wait_for_dashboard,
+    write_dashboard,
 )
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-def invalidate_user_dashboard_cache(user):
-    cache_keys = [
-        f'dashboard_main_{user.id}',
-        f'summary_{user.id}',
-        f'dashboard_summary_{user.id}',
-    ]
-    
-    for key in cache_keys:
-        cache.delete(key)
-    
-    invalidate_indicators_cache(user)
+def invalidate_user_dashboard_cache(user, change=None):
+    """
+    Invalida os caches do usuário após uma escrita.
+
+    `change` é uma chave de DASHBOARD_CHANGES ('transactions', 'links',
+    'categories', 'missions' ou 'profile') e limita os fragmentos do
+    dashboard invalidados; sem ele, todos. As demais chaves do usuário
+    (análises, contexto de missões) saem com um único incremento da geração
+    do usuário. Depois do commit, o dashboard é reconstruído em background
+    (job coalescido por usuário), para a próxima leitura já encontrar os
+    fragmentos prontos.
+    """
+    from ..tasks import schedule_dashboard_precompute
+
+    fragments = invalidate_dashboard_fragments(user.id, change)
+    bump_user_generation(user.id)
+    if 'summary' in fragments:
+        bump_data_version(user.id)
+    db_transaction.on_commit(lambda: schedule_dashboard_precompute(user.id))
@@ -1,6 +1,7 @@
 
 import logging
 
+from django.db import transaction as db_transaction
 from django.db.models import Q
 from rest_framework import permissions, viewsets
 from rest_framework.exceptions import ValidationError
@@ -11,13 +12,15 @@ from .base import (
     Transaction,
     BurstRateThrottle,
     CategoryCreateThrottle,
+    ETagListMixin,
     invalidate_user_dashboard_cache,
+    record_sync_tombstones,
 )
 
 logger = logging.getLogger(__name__)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ETagListMixin, viewsets.ModelViewSet):
     
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -106,7 +109,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         
         serializer.save(user=user, is_system_default=False)
         # Invalidate category cache for user
-        invalidate_user_dashboard_cache(user)
+        invalidate_user_dashboard_cache(user, 'categories')
     
     def perform_update(self, serializer):
         instance = self.get_object()
@@ -116,9 +119,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
         self._validate_name_uniqueness(instance, user, serializer.validated_data)
         self._validate_system_default_unchanged(instance, serializer.validated_data)
         
-        serializer.save()
-        # Invalidate cache after category update
-        invalidate_user_dashboard_cache(user)
+        previous = (instance.type, instance.group)
+        category = serializer.save()
+        # Renomear só muda o detalhamento por categoria; tipo e grupo mudam
+        # os totais (essenciais, aportes) e o fluxo de caixa
+        if (category.type, category.group) != previous:
+            invalidate_user_dashboard_cache(user, 'transactions')
+        else:
+            invalidate_user_dashboard_cache(user, 'categories')
     
     def _validate_update_permission(self, instance, user):
         if instance.user is None and not user.is_staff:
@@ -178,10 +186,12 @@ class CategoryViewSet(viewsets.ModelViewSet):
         self._validate_no_linked_transactions(instance)
         
         logger.info(f"Deletando categoria {instance.name}")
-        instance.delete()
+        with db_transaction.atomic():
+            record_sync_tombstones(Category.objects.filter(pk=instance.pk))
+            instance.delete()
         logger.info(f"Categoria {instance.name} deletada com sucesso")
         # Invalidate cache after category deletion
-        invalidate_user_dashboard_cache(user)
+        invalidate_user_dashboard_cache(user, 'transactions')
     
     def _validate_delete_permission(self, instance, user):
         if instance.user is None and not user.is_staff:
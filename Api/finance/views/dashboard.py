@@ -1,65 +1,48 @@
 
 import logging
 
-from django.core.cache import cache
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .base import (
+    DASHBOARD_FRAGMENTS,
     DashboardRefreshThrottle,
     DashboardSerializer,
     MissionProgress,
     MissionProgressSerializer,
     UserProfile,
+    acquire_dashboard_build,
     assign_missions_automatically,
     calculate_summary,
     cashflow_series,
     category_breakdown,
     indicator_insights,
+    read_dashboard,
+    release_dashboard_build,
     update_mission_progress,
+    wait_for_dashboard,
+    write_dashboard,
 )
 
 logger = logging.getLogger(__name__)
 
 
-class DashboardViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
-    permission_classes = [permissions.IsAuthenticated]
-    throttle_classes = [DashboardRefreshThrottle]
-
-    def list(self, request, *args, **kwargs):
-        user = request.user
-        force_refresh = request.query_params.get('refresh', 'false').lower() == 'true'
-        cache_key = f'dashboard_main_{user.id}'
-        
-        # Trigger async mission refresh in background (non-blocking)
-        from ..tasks import refresh_user_missions_async
-        
-        if not force_refresh:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                cached_data['from_cache'] = True
-                cache_ttl = cache.ttl(cache_key) if hasattr(cache, 'ttl') else 300
-                cached_data['cache_ttl_seconds'] = cache_ttl
-                
-                # If cache is getting stale (< 2 min remaining), trigger background refresh
-                if cache_ttl < 120:
-                    refresh_user_missions_async.delay(user.id)
-                
-                return Response(cached_data)
-        
-        # For fresh requests, still process missions synchronously for first load
-        # but schedule async refresh for next cycle
-        update_mission_progress(user)
-        assign_missions_automatically(user)
-        
-        summary = calculate_summary(user)
-        breakdown = category_breakdown(user)
-        cashflow = cashflow_series(user)
-        profile, _ = UserProfile.objects.get_or_create(user=user)
-        insights = indicator_insights(summary, profile)
-        
-        active_missions = (
+def build_dashboard_fragments(user, names):
+    """Calcula e serializa os fragmentos do dashboard em `names`."""
+    values = {}
+    if {'summary', 'insights'} & set(names):
+        values['summary'] = calculate_summary(user)
+    if {'profile', 'insights'} & set(names):
+        values['profile'], _ = UserProfile.objects.get_or_create(user=user)
+    if 'insights' in names:
+        values['insights'] = indicator_insights(values['summary'], values['profile'])
+    if 'categories' in names:
+        values['categories'] = category_breakdown(user)
+    if 'cashflow' in names:
+        values['cashflow'] = cashflow_series(user)
+    if 'active_missions' in names:
+        values['active_missions'] = (
             MissionProgress.objects.filter(
                 user=user,
                 status__in=[MissionProgress.Status.PENDING, MissionProgress.Status.ACTIVE]
@@ -67,26 +50,98 @@ class DashboardViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
             .select_related("mission")
             .order_by("mission__priority")
         )
-        
-        recommendations = []
-        
-        serializer = DashboardSerializer(
-            {
-                "summary": summary,
-                "categories": breakdown,
-                "cashflow": cashflow,
-                "insights": insights,
-                "active_missions": active_missions,
-                "recommended_missions": recommendations,
-                "profile": profile,
-            },
-            context={"request": request},
+
+    fields = DashboardSerializer().fields
+    return {name: fields[name].to_representation(values[name]) for name in names}
+
+
+def rebuild_dashboard(user, force=False, evaluate_missions=False):
+    """
+    Recalcula os fragmentos desatualizados (ou todos, com `force`) e grava
+    o dashboard serializado no cache.
+
+    Avaliar missões é caro e só acontece com `evaluate_missions`; roda antes
+    da leitura das versões, para as invalidações que ela provoca já valerem.
+
+    Retorna (fragmentos, nomes recalculados).
+    """
+    if evaluate_missions:
+        update_mission_progress(user)
+        assign_missions_automatically(user)
+
+    snapshot, versions, fresh = read_dashboard(user.id)
+    missing = [name for name in DASHBOARD_FRAGMENTS if force or name not in fresh]
+    if missing:
+        snapshot = write_dashboard(
+            user.id, snapshot, versions, build_dashboard_fragments(user, missing)
         )
-        
-        response_data = serializer.data
-        response_data['from_cache'] = False
-        cache.set(cache_key, response_data, timeout=300)
-        
+    return snapshot['fragments'], missing
+
+
+class DashboardViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [DashboardRefreshThrottle]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Dashboard lido do cache, normalmente em uma única consulta.
+
+        Escritas invalidam só os fragmentos que afetam (DASHBOARD_CHANGES) e
+        disparam a reconstrução em background, então a leitura costuma
+        encontrar tudo pronto. Se algum fragmento estiver desatualizado, a
+        versão anterior é servida na hora (`stale`) e a reconstrução vai
+        para a fila, uma por usuário. Só sem versão anterior (expiração
+        definitiva) o cálculo é feito na requisição, ainda sem avaliar
+        missões e por uma requisição de cada vez: as concorrentes esperam o
+        resultado e, se demorar, recebem 202. `?refresh=true` recalcula tudo
+        na hora, missões incluídas.
+        """
+        user = request.user
+        force_refresh = request.query_params.get('refresh', 'false').lower() == 'true'
+
+        from ..tasks import schedule_dashboard_rebuild, schedule_mission_recompute
+
+        stale = False
+        if force_refresh:
+            fragments, missing = rebuild_dashboard(user, force=True, evaluate_missions=True)
+        else:
+            snapshot, versions, fresh = read_dashboard(user.id)
+            fragments = snapshot['fragments']
+            missing = [name for name in DASHBOARD_FRAGMENTS if name not in fresh]
+
+            if missing and all(name in fragments for name in DASHBOARD_FRAGMENTS):
+                stale = True
+                schedule_dashboard_rebuild(user.id)
+            elif missing and acquire_dashboard_build(user.id):
+                try:
+                    fragments = write_dashboard(
+                        user.id, snapshot, versions, build_dashboard_fragments(user, missing)
+                    )['fragments']
+                finally:
+                    release_dashboard_build(user.id)
+                if 'active_missions' in missing:
+                    schedule_mission_recompute(user.id)
+            elif missing:
+                # Outra requisição já está montando o dashboard deste usuário
+                built = wait_for_dashboard(user.id)
+                if built is None:
+                    return Response(
+                        {'status': 'building', 'detail': 'Dashboard em preparação. Tente novamente.'},
+                        status=status.HTTP_202_ACCEPTED,
+                        headers={'Retry-After': '1'},
+                    )
+                snapshot, versions, fresh = built
+                fragments = snapshot['fragments']
+                missing = [name for name in DASHBOARD_FRAGMENTS if name not in fresh]
+                stale = bool(missing)
+
+        response_data = {name: fragments[name] for name in DASHBOARD_FRAGMENTS}
+        response_data['recommended_missions'] = []
+        response_data['from_cache'] = stale or not missing
+        response_data['stale'] = stale
+        response_data['cached_fragments'] = [
+            name for name in DASHBOARD_FRAGMENTS if name not in missing
+        ]
         return Response(response_data)
 
     @action(detail=False, methods=["get"], url_path="missions")
@@ -3,7 +3,7 @@ import logging
 from collections import Counter, defaultdict
 from decimal import Decimal
 
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from .base import (
     Category,
     CategorySerializer,
+    ETagListMixin,
     invalidate_user_dashboard_cache,
     Mission,
     MissionProgress,
@@ -94,19 +95,14 @@ class MissionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         mission = serializer.save()
         logger.info(f"Missão '{mission.title}' criada por admin {self.request.user.username}")
-        invalidate_user_dashboard_cache(self.request.user)
         return mission
     
     def perform_update(self, serializer):
         mission = serializer.save()
         logger.info(f"Missão '{mission.title}' atualizada por admin {self.request.user.username}")
-        for progress in MissionProgress.objects.filter(mission=mission).select_related('user'):
-            invalidate_user_dashboard_cache(progress.user)
         return mission
     
     def perform_destroy(self, instance):
-        for progress in MissionProgress.objects.filter(mission=instance).select_related('user'):
-            invalidate_user_dashboard_cache(progress.user)
         instance.is_active = False
         instance.save()
         logger.info(f"Missão '{instance.title}' desativada por admin {self.request.user.username}")
@@ -125,7 +121,7 @@ class MissionViewSet(viewsets.ModelViewSet):
                 mission.id,
                 selected_category_ids=selected_category_ids
             )
-            invalidate_user_dashboard_cache(request.user)
+            invalidate_user_dashboard_cache(request.user, 'missions')
             return Response(MissionProgressSerializer(progress).data)
         except MissionProgress.DoesNotExist:
             return Response(
@@ -143,7 +139,7 @@ class MissionViewSet(viewsets.ModelViewSet):
         try:
             mission = self.get_object()
             progress = skip_mission(request.user, mission.id)
-            invalidate_user_dashboard_cache(request.user)
+            invalidate_user_dashboard_cache(request.user, 'missions')
             return Response(MissionProgressSerializer(progress).data)
         except MissionProgress.DoesNotExist:
             return Response(
@@ -874,10 +870,22 @@ class MissionViewSet(viewsets.ModelViewSet):
             )
 
 
-class MissionProgressViewSet(viewsets.ModelViewSet):
+class MissionProgressViewSet(ETagListMixin, viewsets.ModelViewSet):
     serializer_class = MissionProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'put', 'patch', 'head', 'options']
+    etag_timestamp_fields = ('updated_at', 'mission__updated_at')
+
+    def get_list_fingerprint(self):
+        # As métricas do progresso são calculadas na hora a partir das
+        # transações; escritas e exclusões delas também mudam a lista
+        fingerprint = super().get_list_fingerprint()
+        fingerprint.update(Transaction.all_objects.filter(user=self.request.user).aggregate(
+            transactions_count=Count('pk'),
+            transactions_updated_at=Max('updated_at'),
+            transactions_deleted_at=Max('deleted_at'),
+        ))
+        return fingerprint
 
     def get_queryset(self):
         qs = MissionProgress.objects.filter(user=self.request.user).select_related("mission")
@@ -924,7 +932,7 @@ class MissionProgressViewSet(viewsets.ModelViewSet):
             apply_mission_reward(progress)
             
             assign_missions_automatically(self.request.user)
-            invalidate_user_dashboard_cache(self.request.user)
+            invalidate_user_dashboard_cache(self.request.user, 'missions')
 
     
     @action(detail=True, methods=['get'])
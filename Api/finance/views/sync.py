@@ -0,0 +1,54 @@
+"""
+Sincronização incremental com o app móvel.
+"""
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..services import collect_sync_changes, decode_sync_cursor
+from .base import (
+    CategorySerializer,
+    MissionProgressSerializer,
+    TransactionLinkSerializer,
+    TransactionSerializer,
+)
+from .transactions import attach_link_transactions
+
+
+class SyncChangesView(APIView):
+    """
+    Alterações desde `?since=<cursor>`: transações, vínculos, categorias e
+    progresso de missões, mais os ids excluídos em `deleted`.
+
+    O `cursor` da resposta (ou o de `transactions/sync/`) é o `since` da
+    próxima chamada. Sem `since`, ou com cursor expirado, a resposta vem com
+    `full: true` e traz o estado completo.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = decode_sync_cursor(since)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            since = None
+
+        changes = collect_sync_changes(request.user, since)
+        context = {'request': request}
+        links = attach_link_transactions(list(changes['links']))
+
+        return Response({
+            'cursor': changes['cursor'],
+            'full': changes['full'],
+            'transactions': TransactionSerializer(changes['transactions'], many=True, context=context).data,
+            'links': TransactionLinkSerializer(links, many=True, context=context).data,
+            'categories': CategorySerializer(changes['categories'], many=True, context=context).data,
+            'mission_progress': MissionProgressSerializer(
+                changes['mission_progress'], many=True, context=context
+            ).data,
+            'deleted': changes['deleted'],
+        })
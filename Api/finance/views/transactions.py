@@ -7,30 +7,90 @@ from collections import defaultdict
 from decimal import Decimal
 
 from django.db import transaction as db_transaction
-from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
-from django.db.models.functions import Coalesce
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import RowNumber
 import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from ..services.imports import IMPORT_FORMATS, IMPORT_UPLOAD_DIR
+from ..services.sync import SYNC_MAX_ITEMS
 from .base import (
+    EXPORT_RENDERERS,
     BurstRateThrottle,
+    CSVRenderer,
     Category,
+    ETagListMixin,
     IsOwnerPermission,
+    NDJSONRenderer,
+    OptionalLimitOffsetPagination,
     Transaction,
     TransactionCreateThrottle,
+    TransactionKeysetPagination,
     TransactionLink,
     TransactionLinkSerializer,
     TransactionSerializer,
+    ScheduledOccurrenceSerializer,
+    TransactionSyncItemSerializer,
+    TrigramSearchFilter,
+    create_bulk_payments,
+    decode_statement,
+    detect_statement_format,
     invalidate_user_dashboard_cache,
+    record_sync_tombstones,
+    stream_export,
+    sync_transactions,
+    upcoming_occurrences,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def attach_link_transactions(links):
+    """
+    Carrega, em uma consulta, as transações de origem e destino dos links.
+
+    As transações vêm com Transaction.objects.with_link_totals(), então os
+    TransactionSerializer aninhados não consultam o banco por linha.
+    """
+    uuids = set()
+    for link in links:
+        uuids.add(link.source_transaction_uuid)
+        uuids.add(link.target_transaction_uuid)
+    
+    transactions_map = {
+        tx.id: tx
+        for tx in Transaction.objects.filter(
+            id__in=uuids
+        ).select_related('category').with_link_totals()
+    }
+    
+    for link in links:
+        if link.source_transaction_uuid in transactions_map:
+            link._source_transaction_cache = transactions_map[link.source_transaction_uuid]
+        if link.target_transaction_uuid in transactions_map:
+            link._target_transaction_cache = transactions_map[link.target_transaction_uuid]
+    return links
 
 
 class TransactionFilter(django_filters.FilterSet):
@@ -41,13 +101,24 @@ class TransactionFilter(django_filters.FilterSet):
         model = Transaction
         fields = ['type', 'is_recurring', 'category']
 
-class TransactionViewSet(viewsets.ModelViewSet):
+
+class TransactionLinkExportFilter(django_filters.FilterSet):
+    start_date = django_filters.DateFilter(field_name='created_at', lookup_expr='date__gte')
+    end_date = django_filters.DateFilter(field_name='created_at', lookup_expr='date__lte')
+
+    class Meta:
+        model = TransactionLink
+        fields = ['link_type']
+
+class TransactionViewSet(ETagListMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerPermission]
+    # Exclusões (soft delete) e categorias renomeadas também mudam a lista
+    etag_timestamp_fields = ('updated_at', 'deleted_at', 'category__updated_at')
     
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        TrigramSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = TransactionFilter
@@ -55,46 +126,32 @@ class TransactionViewSet(viewsets.ModelViewSet):
     ordering_fields = ['date', 'amount', 'created_at']
 
     
+    @property
+    def paginator(self):
+        # Listagem com ?pagination=cursor usa keyset em vez de LIMIT/OFFSET
+        if (
+            not hasattr(self, '_paginator')
+            and self.action == 'list'
+            and TransactionKeysetPagination.is_requested(self.request)
+        ):
+            self._paginator = TransactionKeysetPagination()
+        return super().paginator
+    
     def get_throttles(self):
         if self.action in ['create', 'update', 'partial_update']:
             return [TransactionCreateThrottle(), BurstRateThrottle()]
-        elif self.action == 'destroy':
+        elif self.action in ['destroy', 'import_statement', 'sync']:
             return [BurstRateThrottle()]
         return super().get_throttles()
 
     def get_queryset(self):
-        outgoing_sum = TransactionLink.objects.filter(
-            source_transaction_uuid=OuterRef('id')
-        ).values('source_transaction_uuid').annotate(
-            total=Coalesce(Sum('linked_amount'), Value(Decimal('0')))
-        ).values('total')
-        
-        incoming_sum = TransactionLink.objects.filter(
-            target_transaction_uuid=OuterRef('id')
-        ).values('target_transaction_uuid').annotate(
-            total=Coalesce(Sum('linked_amount'), Value(Decimal('0')))
-        ).values('total')
-        
-        outgoing_count = TransactionLink.objects.filter(
-            source_transaction_uuid=OuterRef('id')
-        ).values('source_transaction_uuid').annotate(
-            cnt=Count('id')
-        ).values('cnt')
-        
-        incoming_count = TransactionLink.objects.filter(
-            target_transaction_uuid=OuterRef('id')
-        ).values('target_transaction_uuid').annotate(
-            cnt=Count('id')
-        ).values('cnt')
-        
         return Transaction.objects.filter(
             user=self.request.user
-        ).select_related('category').annotate(
-            outgoing_links_amount=Coalesce(Subquery(outgoing_sum), Value(Decimal('0'))),
-            incoming_links_amount=Coalesce(Subquery(incoming_sum), Value(Decimal('0'))),
-            outgoing_links_count=Coalesce(Subquery(outgoing_count), Value(0)),
-            incoming_links_count=Coalesce(Subquery(incoming_count), Value(0)),
-        ).order_by('-date', '-created_at')
+        ).select_related('category').with_link_totals().order_by('-date', '-created_at')
+    
+    def get_etag_queryset(self):
+        # Sem filtros nem anotações: a agregação usa o índice (user, updated_at)
+        return Transaction.all_objects.filter(user=self.request.user)
     
     def create(self, request, *args, **kwargs):
         """Criar transação com XP reward."""
@@ -102,7 +159,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         
-        invalidate_user_dashboard_cache(request.user)
+        invalidate_user_dashboard_cache(request.user, 'transactions')
         
         headers = self.get_success_headers(serializer.data)
         response_data = serializer.data
@@ -119,15 +176,9 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 'category': 'A categoria selecionada não pertence a você.'
             })
         
-        if 'amount' in data or 'type' in data:
-            TransactionLink.objects.filter(source_transaction_uuid=instance.id).count()
-            TransactionLink.objects.filter(target_transaction_uuid=instance.id).count()
-        
         if 'amount' in data:
             new_amount = data['amount']
-            paid_amount = TransactionLink.objects.filter(
-                target_transaction_uuid=instance.id
-            ).aggregate(total=Sum('linked_amount'))['total'] or Decimal('0')
+            paid_amount = instance.received_total
             
             if new_amount < paid_amount:
                 raise ValidationError({
@@ -135,7 +186,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 })
         
         serializer.save()
-        invalidate_user_dashboard_cache(self.request.user)
+        invalidate_user_dashboard_cache(self.request.user, 'transactions')
     
     def perform_destroy(self, instance):
         links_as_source = TransactionLink.objects.filter(source_transaction_uuid=instance.id).count()
@@ -152,7 +203,257 @@ class TransactionViewSet(viewsets.ModelViewSet):
             })
         
         instance.soft_delete()
-        invalidate_user_dashboard_cache(self.request.user)
+        invalidate_user_dashboard_cache(self.request.user, 'transactions')
+    
+    EXPORT_FIELDS = (
+        'id', 'date', 'type', 'description', 'amount', 'category_id', 'category',
+        'is_recurring', 'recurrence_value', 'recurrence_unit', 'recurrence_end_date',
+        'linked_amount', 'available_amount', 'created_at', 'updated_at',
+    )
+    
+    @staticmethod
+    def _export_row(row):
+        if row['type'] == Transaction.TransactionType.INCOME:
+            linked = row.pop('linked_total')
+        elif row['type'] == Transaction.TransactionType.EXPENSE:
+            linked = row.pop('received_total')
+        else:
+            linked = Decimal('0')
+        row['linked_amount'] = linked
+        row['available_amount'] = row['amount'] - linked
+        row['category'] = row.pop('category__name')
+        return row
+    
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Exporta as transações em streaming (`?format=csv` ou `?format=ndjson`).
+        
+        Aceita os mesmos filtros da listagem; `start_date`/`end_date` permitem
+        exportações incrementais por período. Os saldos vêm de
+        linked_total/received_total, sem consultas por linha.
+        """
+        export_format = request.accepted_renderer.format
+        if export_format not in EXPORT_RENDERERS:
+            export_format = CSVRenderer.format
+        
+        queryset = self.filter_queryset(
+            Transaction.objects.filter(user=request.user).order_by('-date', '-created_at', '-id')
+        ).values(
+            'id', 'date', 'type', 'description', 'amount', 'category_id', 'category__name',
+            'is_recurring', 'recurrence_value', 'recurrence_unit', 'recurrence_end_date',
+            'linked_total', 'received_total', 'created_at', 'updated_at',
+        )
+        
+        return stream_export(
+            queryset, self.EXPORT_FIELDS, export_format, 'transacoes', transform=self._export_row
+        )
+    
+    IMPORT_MAX_BYTES = 5 * 1024 * 1024
+    
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_statement(self, request):
+        """
+        Importa um extrato bancário (CSV ou OFX) enviado em `file`.
+        
+        O arquivo é gravado no storage e a task Celery recebe só o caminho;
+        o progresso é consultado em `import_status/<task_id>/`. Sem broker
+        disponível, importa na hora.
+        """
+        import uuid
+        from django.core.cache import cache
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from ..tasks import import_transactions_async, transaction_import_key
+        
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'Envie o extrato no campo "file".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload.size > self.IMPORT_MAX_BYTES:
+            return Response(
+                {'error': 'Arquivo maior que 5 MB.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        head = decode_statement(upload.read(512))
+        statement_format = request.data.get('format') or detect_statement_format(upload.name, head)
+        if statement_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': 'Formato deve ser csv ou ofx.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        task_id = str(uuid.uuid4())
+        upload.seek(0)
+        upload_path = default_storage.save(
+            f'{IMPORT_UPLOAD_DIR}/{task_id}.{statement_format}', ContentFile(upload.read())
+        )
+        cache.set(transaction_import_key(task_id), {
+            'task_id': task_id,
+            'user_id': request.user.id,
+            'status': 'PENDING',
+            'current': 0,
+            'total': 0,
+            'percent': 0,
+            'created': 0,
+            'message': 'Aguardando worker disponível...',
+            'format': statement_format,
+        }, timeout=3600)
+        
+        args = [request.user.id, upload_path, statement_format]
+        try:
+            import_transactions_async.apply_async(args=args, task_id=task_id)
+        except Exception as e:
+            logger.warning(f"Falha ao enfileirar importação {task_id}, executando inline: {e}")
+            result = import_transactions_async.apply(args=args, task_id=task_id)
+            if result.failed():
+                return Response(
+                    {'error': 'Erro ao importar extrato', 'detail': str(result.result)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response({
+                'success': True,
+                'task_id': task_id,
+                'status': 'SUCCESS',
+                'result': result.result,
+            }, status=status.HTTP_201_CREATED)
+        
+        return Response({
+            'success': True,
+            'task_id': task_id,
+            'status': 'PENDING',
+            'poll_url': f'/api/transactions/import_status/{task_id}/',
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path='import_status/(?P<task_id>[^/.]+)')
+    def import_status(self, request, task_id=None):
+        from django.core.cache import cache
+        from ..tasks import transaction_import_key
+        
+        cached_data = cache.get(transaction_import_key(task_id))
+        if not cached_data or cached_data.get('user_id') != request.user.id:
+            return Response(
+                {'error': 'Importação não encontrada'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(cached_data)
+    
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        """
+        Envio em lote das transações criadas ou editadas offline.
+        
+        Recebe `{"transactions": [...]}` com até SYNC_MAX_ITEMS itens
+        identificados pelo UUID gerado no app e devolve o resultado de cada um
+        (`created`, `updated`, `deleted`, `unchanged`, `conflict` ou `error`)
+        e o `cursor` para buscar as alterações seguintes. Itens em conflito
+        trazem a versão do servidor em `server`.
+        
+        O lote é gravado de uma vez: cache e missões são atualizados uma única
+        vez ao final, e não há limite por transação como no POST comum.
+        """
+        from ..tasks import schedule_mission_recompute, schedule_occurrences_refresh
+        
+        items = request.data.get('transactions') if isinstance(request.data, dict) else None
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Envie a lista de transações em "transactions".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > SYNC_MAX_ITEMS:
+            return Response(
+                {'error': f'Máximo de {SYNC_MAX_ITEMS} transações por sincronização.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        valid_items = []
+        invalid = {}
+        for index, raw in enumerate(items):
+            item_serializer = TransactionSyncItemSerializer(data=raw)
+            if item_serializer.is_valid():
+                valid_items.append(item_serializer.validated_data)
+            else:
+                invalid[index] = {
+                    'id': raw.get('id') if isinstance(raw, dict) else None,
+                    'status': 'error',
+                    'errors': item_serializer.errors,
+                }
+        
+        outcome = sync_transactions(request.user, valid_items)
+        
+        applied = iter(outcome['results'])
+        results = [
+            invalid[index] if index in invalid else next(applied)
+            for index in range(len(items))
+        ]
+        
+        conflicts = {result['id']: result for result in results if result['status'] == 'conflict'}
+        if conflicts:
+            server_versions = Transaction.all_objects.filter(
+                id__in=list(conflicts)
+            ).select_related('category').with_link_totals()
+            for tx in server_versions:
+                conflict = conflicts[str(tx.id)]
+                conflict['server'] = TransactionSerializer(tx, context={'request': request}).data
+                conflict['server']['deleted'] = tx.deleted_at is not None
+        
+        if outcome['changed']:
+            invalidate_user_dashboard_cache(request.user, 'transactions')
+            user_id = request.user.id
+            db_transaction.on_commit(lambda: schedule_mission_recompute(user_id))
+            if outcome['recurring_changed']:
+                db_transaction.on_commit(lambda: schedule_occurrences_refresh(user_id))
+        
+        summary = dict(outcome['summary'])
+        if invalid:
+            summary['error'] = summary.get('error', 0) + len(invalid)
+        
+        return Response({
+            'cursor': outcome['cursor'],
+            'summary': summary,
+            'results': results,
+        })
+    
+    UPCOMING_MAX_DAYS = 90
+    
+    @action(detail=False, methods=['get'])
+    def upcoming(self, request):
+        """
+        Próximas ocorrências das transações recorrentes (`?days=30`, até 90,
+        e `?type=EXPENSE` para as contas a pagar).
+        
+        Lê as ocorrências pré-calculadas em ScheduledOccurrence.
+        """
+        try:
+            days = int(request.query_params.get('days', 30))
+        except (TypeError, ValueError):
+            days = 30
+        days = max(1, min(days, self.UPCOMING_MAX_DAYS))
+        
+        tx_type = request.query_params.get('type')
+        if tx_type and tx_type not in Transaction.TransactionType.values:
+            return Response(
+                {'error': 'Tipo deve ser INCOME ou EXPENSE.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        occurrences = list(upcoming_occurrences(request.user, days=days, tx_type=tx_type))
+        total = sum((occurrence.amount for occurrence in occurrences), Decimal('0'))
+        
+        return Response({
+            'days': days,
+            'count': len(occurrences),
+            'total_amount': total,
+            'results': ScheduledOccurrenceSerializer(occurrences, many=True).data,
+        })
     
     @action(detail=True, methods=['get'])
     def details(self, request, pk=None):
@@ -398,7 +699,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         })
 
 
-class TransactionLinkViewSet(viewsets.ModelViewSet):
+class TransactionLinkViewSet(ETagListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar vinculações entre transações.
     Usa UUID como identificador primário.
@@ -406,40 +707,37 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
     serializer_class = TransactionLinkSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerPermission]
     
+    PENDING_SUMMARY_ORDERINGS = {
+        'urgency': ('-is_urgent', '-remaining_amount', '-id'),
+        'amount': ('-remaining_amount', '-id'),
+        'date': ('-created_at', '-id'),
+    }
+    
     def get_queryset(self):
         qs = TransactionLink.objects.filter(user=self.request.user)
         return qs.order_by('-created_at')
     
-    def list(self, request, *args, **kwargs):
+    def get_list_fingerprint(self):
+        # Os vínculos trazem as transações aninhadas, com totais e categoria
+        fingerprint = super().get_list_fingerprint()
+        fingerprint.update(Transaction.all_objects.filter(user=self.request.user).aggregate(
+            transactions_updated_at=Max('updated_at'),
+            categories_updated_at=Max('category__updated_at'),
+        ))
+        return fingerprint
+    
+    def get_serializer(self, *args, **kwargs):
         """
-        Override list para fazer prefetch manual de transactions relacionadas.
+        Listagens fazem prefetch manual das transações relacionadas.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        links_list = list(queryset)
-        source_uuids = {link.source_transaction_uuid for link in links_list}
-        target_uuids = {link.target_transaction_uuid for link in links_list}
-        
-        all_uuids = source_uuids | target_uuids
-        transactions_map = {
-            tx.id: tx 
-            for tx in Transaction.objects.filter(
-                id__in=all_uuids
-            ).select_related('category')
-        }
-        
-        for link in links_list:
-            if link.source_transaction_uuid in transactions_map:
-                link._source_transaction_cache = transactions_map[link.source_transaction_uuid]
-            if link.target_transaction_uuid in transactions_map:
-                link._target_transaction_cache = transactions_map[link.target_transaction_uuid]
-        
-        page = self.paginate_queryset(links_list)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(links_list, many=True)
+        if kwargs.get('many') and args:
+            args = (attach_link_transactions(list(args[0])),) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        attach_link_transactions([instance])
+        serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     def create(self, request, *args, **kwargs):
@@ -507,16 +805,18 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-        invalidate_user_dashboard_cache(self.request.user)
+        invalidate_user_dashboard_cache(self.request.user, 'links')
     
     def perform_update(self, serializer):
         serializer.save()
-        invalidate_user_dashboard_cache(self.request.user)
+        invalidate_user_dashboard_cache(self.request.user, 'links')
     
     def perform_destroy(self, instance):
         user = instance.user
-        instance.delete()
-        invalidate_user_dashboard_cache(user)
+        with db_transaction.atomic():
+            record_sync_tombstones(TransactionLink.objects.filter(pk=instance.pk))
+            instance.delete()
+        invalidate_user_dashboard_cache(user, 'links')
     
     @action(detail=False, methods=['get'])
     def available_sources(self, request):
@@ -526,13 +826,13 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
         transactions = Transaction.objects.filter(
             user=request.user,
             type=Transaction.TransactionType.INCOME
-        ).select_related('category')
+        ).select_related('category').with_link_totals()
         
         category_id = request.query_params.get('category')
         if category_id:
             transactions = transactions.filter(category_id=category_id)
         
-        available = [tx for tx in transactions if tx.available_amount > Decimal(min_amount)]
+        available = transactions.filter(available_amount_annotated__gt=Decimal(min_amount))
         
         serializer = TransactionSerializer(available, many=True, context={'request': request})
         return Response(serializer.data)
@@ -543,21 +843,50 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
         transactions = Transaction.objects.filter(
             user=request.user,
             type=Transaction.TransactionType.EXPENSE
-        ).select_related('category')
+        ).select_related('category').with_link_totals()
         
         category_id = request.query_params.get('category')
         if category_id:
             transactions = transactions.filter(category_id=category_id)
         
+        available = transactions.filter(available_amount_annotated__gt=0)
         max_amount = request.query_params.get('max_amount')
-        available = [
-            tx for tx in transactions 
-            if tx.available_amount > 0 and (not max_amount or tx.available_amount <= Decimal(max_amount))
-        ]
+        if max_amount:
+            available = available.filter(available_amount_annotated__lte=Decimal(max_amount))
         
         serializer = TransactionSerializer(available, many=True, context={'request': request})
         return Response(serializer.data)
     
+    LINK_EXPORT_FIELDS = (
+        'id', 'source_transaction_id', 'target_transaction_id', 'linked_amount',
+        'link_type', 'description', 'is_recurring', 'created_at', 'updated_at',
+    )
+    
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Exporta as vinculações em streaming (`?format=csv` ou `?format=ndjson`).
+        
+        Filtros: `link_type` e `start_date`/`end_date` sobre a data de criação.
+        """
+        export_format = request.accepted_renderer.format
+        if export_format not in EXPORT_RENDERERS:
+            export_format = CSVRenderer.format
+        
+        filterset = TransactionLinkExportFilter(
+            request.query_params, queryset=TransactionLink.objects.filter(user=request.user)
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        
+        queryset = filterset.qs.order_by('-created_at', '-id').values(
+            'id', 'linked_amount', 'link_type', 'description', 'is_recurring', 'created_at', 'updated_at',
+            source_transaction_id=F('source_transaction_uuid'),
+            target_transaction_id=F('target_transaction_uuid'),
+        )
+        
+        return stream_export(queryset, self.LINK_EXPORT_FIELDS, export_format, 'vinculacoes')
+    
     @action(detail=False, methods=['post'])
     def quick_link(self, request):
         """Criar vinculação rapidamente com validações."""
@@ -572,13 +901,32 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def payment_report(self, request):
-        """Gera relatório de pagamentos de dívidas por período."""
+        """
+        Gera relatório de pagamentos de dívidas por período.
+        
+        Agrupamento, totais e filtro por categoria rodam no banco. `limit` e
+        `offset` paginam as dívidas; `payments_limit` limita os pagamentos
+        listados em cada dívida (os mais recentes primeiro).
+        """
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
+        category_id = request.query_params.get('category')
+        payments_limit = request.query_params.get('payments_limit')
+        
+        try:
+            payments_limit = int(payments_limit) if payments_limit else None
+            category_id = int(category_id) if category_id else None
+        except ValueError:
+            raise ValidationError({'error': 'category e payments_limit devem ser inteiros.'})
+        
+        debts = Transaction.objects.filter(user=request.user)
+        if category_id is not None:
+            debts = debts.filter(category_id=category_id)
         
         links = TransactionLink.objects.filter(
             user=request.user,
-            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT
+            link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
+            target_transaction_uuid__in=debts.values('id'),
         )
         
         if start_date:
@@ -586,83 +934,90 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
         if end_date:
             links = links.filter(created_at__lte=end_date)
         
-        links_list = list(links)
-        source_uuids = {link.source_transaction_uuid for link in links_list}
-        target_uuids = {link.target_transaction_uuid for link in links_list}
-        all_uuids = source_uuids | target_uuids
-        
-        transactions_map = {
-            tx.id: tx 
-            for tx in Transaction.objects.filter(
-                id__in=all_uuids
-            ).select_related('category')
+        totals = links.aggregate(
+            total_paid=Sum('linked_amount'),
+            payment_count=Count('id'),
+        )
+        total_paid = totals['total_paid'] or Decimal('0')
+        debts_amount = debts.filter(
+            id__in=links.values('target_transaction_uuid')
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        
+        groups = links.order_by().values('target_transaction_uuid').annotate(
+            paid_amount=Sum('linked_amount'),
+            payments_count=Count('id'),
+            last_payment_at=Max('created_at'),
+        ).order_by('-last_payment_at', 'target_transaction_uuid')
+        
+        paginator = OptionalLimitOffsetPagination()
+        page = paginator.paginate_queryset(groups, request, view=self)
+        if page is None:
+            page = list(groups)
+        
+        debt_ids = [group['target_transaction_uuid'] for group in page]
+        debt_rows = {
+            row['id']: row
+            for row in Transaction.objects.filter(id__in=debt_ids).values('id', 'description', 'amount')
         }
         
-        category_id = request.query_params.get('category')
-        if category_id:
-            filtered_links = []
-            for link in links_list:
-                target = transactions_map.get(link.target_transaction_uuid)
-                if target and target.category_id == int(category_id):
-                    filtered_links.append(link)
-            links_list = filtered_links
-        
-        by_debt = defaultdict(lambda: {
-            'debt_id': None,
-            'debt_description': '',
-            'total_amount': Decimal('0'),
-            'paid_amount': Decimal('0'),
-            'remaining_amount': Decimal('0'),
-            'payment_percentage': Decimal('0'),
-            'payments': []
-        })
-        
-        total_paid = Decimal('0')
+        payments = links.filter(target_transaction_uuid__in=debt_ids).annotate(
+            source_description=Subquery(
+                Transaction.objects.filter(
+                    id=OuterRef('source_transaction_uuid')
+                ).values('description')[:1]
+            ),
+        )
+        if payments_limit is not None:
+            payments = payments.annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F('target_transaction_uuid')],
+                    order_by=[F('created_at').desc(), F('id').desc()],
+                ),
+            ).filter(position__lte=payments_limit)
+        
+        payments_by_debt = defaultdict(list)
+        for payment in payments.order_by('-created_at', '-id').values(
+            'id', 'target_transaction_uuid', 'linked_amount', 'created_at', 'source_description',
+        ):
+            payments_by_debt[payment['target_transaction_uuid']].append({
+                'id': payment['id'],
+                'amount': float(payment['linked_amount']),
+                'date': payment['created_at'].isoformat(),
+                'source': payment['source_description'] or 'N/A',
+            })
         
-        for link in links_list:
-            debt = transactions_map.get(link.target_transaction_uuid)
-            if not debt:
+        by_debt = []
+        for group in page:
+            debt_id = group['target_transaction_uuid']
+            debt = debt_rows.get(debt_id)
+            if debt is None:
                 continue
-                
-            debt_id = debt.id
-            
-            if by_debt[debt_id]['debt_id'] is None:
-                by_debt[debt_id]['debt_id'] = debt_id
-                by_debt[debt_id]['debt_description'] = debt.description
-                by_debt[debt_id]['total_amount'] = debt.amount
-            
-            by_debt[debt_id]['paid_amount'] += link.linked_amount
-            total_paid += link.linked_amount
-            
-            source = transactions_map.get(link.source_transaction_uuid)
-            by_debt[debt_id]['payments'].append({
-                'id': link.id,
-                'amount': float(link.linked_amount),
-                'date': link.created_at.isoformat(),
-                'source': source.description if source else 'N/A'
+            total_amount = debt['amount']
+            paid_amount = group['paid_amount']
+            by_debt.append({
+                'debt_id': debt_id,
+                'debt_description': debt['description'],
+                'total_amount': float(total_amount),
+                'paid_amount': float(paid_amount),
+                'remaining_amount': float(total_amount - paid_amount),
+                'payment_percentage': (
+                    float(paid_amount / total_amount * Decimal('100')) if total_amount > 0 else 0.0
+                ),
+                'payments_count': group['payments_count'],
+                'payments': payments_by_debt[debt_id],
             })
         
-        total_remaining = Decimal('0')
-        for debt_data in by_debt.values():
-            debt_data['remaining_amount'] = debt_data['total_amount'] - debt_data['paid_amount']
-            total_remaining += debt_data['remaining_amount']
-            
-            if debt_data['total_amount'] > 0:
-                debt_data['payment_percentage'] = float(
-                    (debt_data['paid_amount'] / debt_data['total_amount']) * Decimal('100')
-                )
-            
-            debt_data['total_amount'] = float(debt_data['total_amount'])
-            debt_data['paid_amount'] = float(debt_data['paid_amount'])
-            debt_data['remaining_amount'] = float(debt_data['remaining_amount'])
-        
         return Response({
             'summary': {
                 'total_paid': float(total_paid),
-                'total_remaining': float(total_remaining),
-                'payment_count': links.count()
+                'total_remaining': float(debts_amount - total_paid),
+                'payment_count': totals['payment_count'],
             },
-            'by_debt': list(by_debt.values())
+            'by_debt': by_debt,
+            'count': getattr(paginator, 'count', len(by_debt)),
+            'next': paginator.get_next_link() if paginator.limit is not None else None,
+            'previous': paginator.get_previous_link() if paginator.limit is not None else None,
         })
     
     @action(detail=False, methods=['get'])
@@ -673,65 +1028,70 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
         min_remaining = Decimal(request.query_params.get('min_remaining', '0.01'))
         sort_by = request.query_params.get('sort_by', 'urgency')
         
+        # Urgente: 80% ou mais já pago (received_total / amount >= 0.8)
+        urgent = Q(amount__gt=0, received_total__gte=F('amount') * Decimal('0.8'))
         debts = Transaction.objects.filter(
-            user=request.user
-        ).filter(
-            Q(type=Transaction.TransactionType.EXPENSE)
-        ).select_related('category')
+            user=request.user,
+            type=Transaction.TransactionType.EXPENSE,
+        ).annotate(
+            remaining_amount=ExpressionWrapper(
+                F('amount') - F('received_total'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            is_urgent=Case(
+                When(urgent, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        ).filter(remaining_amount__gte=min_remaining)
+        
+        totals = debts.aggregate(
+            total_pending=Sum('remaining_amount'),
+            urgent_count=Count('id', filter=urgent),
+        )
+        total_pending = totals['total_pending'] or Decimal('0')
+        
+        ordering = self.PENDING_SUMMARY_ORDERINGS.get(sort_by)
+        if ordering:
+            debts = debts.order_by(*ordering)
+        rows = debts.values(
+            'id', 'description', 'amount', 'received_total', 'remaining_amount',
+            'is_urgent', 'created_at', 'category_id', 'category__name', 'category__type',
+        )
         
-        pending_debts = []
-        total_pending = Decimal('0')
-        urgent_count = 0
+        paginator = OptionalLimitOffsetPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        if page is None:
+            page = list(rows)
         
-        for debt in debts:
-            remaining = debt.available_amount
-            if remaining < min_remaining:
-                continue
-            
-            payment_pct = float(debt.link_percentage)
-            is_urgent = payment_pct >= 80
-            from django.utils import timezone as tz
-            days_since = (tz.now() - debt.created_at).days
-            
+        now = timezone.now()
+        pending_debts = []
+        for row in page:
+            amount = row['amount']
+            payment_pct = float(row['received_total'] / amount * 100) if amount else 0.0
             pending_debts.append({
-                'id': str(debt.id),
-                'description': debt.description,
+                'id': str(row['id']),
+                'description': row['description'],
                 'category': {
-                    'id': debt.category.id if debt.category else None,
-                    'name': debt.category.name if debt.category else 'Sem categoria',
-                    'type': debt.category.type if debt.category else None,
+                    'id': row['category_id'],
+                    'name': row['category__name'] or 'Sem categoria',
+                    'type': row['category__type'],
                 },
-                'total_amount': float(debt.amount),
-                'paid_amount': float(debt.linked_amount),
-                'remaining_amount': float(remaining),
+                'total_amount': float(amount),
+                'paid_amount': float(row['received_total']),
+                'remaining_amount': float(row['remaining_amount']),
                 'payment_percentage': payment_pct,
-                'is_urgent': is_urgent,
-                'days_since_created': days_since,
-                'created_at': debt.created_at.isoformat(),
+                'is_urgent': bool(row['is_urgent']),
+                'days_since_created': (now - row['created_at']).days,
+                'created_at': row['created_at'].isoformat(),
             })
-            
-            total_pending += remaining
-            if is_urgent:
-                urgent_count += 1
-        
-        if sort_by == 'urgency':
-            pending_debts.sort(
-                key=lambda x: (-int(x['is_urgent']), -x['remaining_amount'])
-            )
-        elif sort_by == 'amount':
-            pending_debts.sort(key=lambda x: -x['remaining_amount'])
-        elif sort_by == 'date':
-            pending_debts.sort(key=lambda x: x['created_at'], reverse=True)
         
-        incomes = Transaction.objects.filter(
+        available_income = Transaction.objects.filter(
             user=request.user,
             type=Transaction.TransactionType.INCOME
-        )
-        
-        available_income = sum(
-            (income.available_amount for income in incomes),
-            Decimal('0')
-        )
+        ).aggregate(
+            total=Sum(F('amount') - F('linked_total'))
+        )['total'] or Decimal('0')
         
         coverage_pct = 0.0
         if total_pending > 0:
@@ -741,8 +1101,11 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
         
         return Response({
             'total_pending': float(total_pending),
-            'urgent_count': urgent_count,
+            'urgent_count': totals['urgent_count'],
             'debts': pending_debts,
+            'count': getattr(paginator, 'count', len(pending_debts)),
+            'next': paginator.get_next_link() if paginator.limit is not None else None,
+            'previous': paginator.get_previous_link() if paginator.limit is not None else None,
             'available_income': float(available_income),
             'coverage_percentage': coverage_pct,
         })
@@ -750,10 +1113,6 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def bulk_payment(self, request):
         """Cria múltiplas vinculações de pagamento de uma vez."""
-        from uuid import UUID
-        
-        from ..payment_validator import PaymentValidator
-        
         payments_data = request.data.get('payments', [])
         description = request.data.get('description', 'Pagamento em lote')
         
@@ -775,107 +1134,11 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        created_links = []
-        total_amount = Decimal('0')
-        sources_used = set()
-        targets_paid = set()
-        fully_paid_expenses = []
-        
         try:
-            with db_transaction.atomic():
-                for idx, payment in enumerate(payments_data):
-                    if not isinstance(payment, dict):
-                        raise ValueError(
-                            f"Pagamento #{idx+1} inválido: deve ser um objeto"
-                        )
-                    
-                    source_id = payment.get('source_id')
-                    target_id = payment.get('target_id')
-                    amount = payment.get('amount')
-                    
-                    if not source_id or not target_id or amount is None:
-                        raise ValueError(
-                            f"Pagamento #{idx+1} inválido: faltam campos obrigatórios"
-                        )
-                    
-                    try:
-                        UUID(str(source_id))
-                        UUID(str(target_id))
-                    except (ValueError, AttributeError):
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: IDs devem ser UUIDs válidos"
-                        )
-                    
-                    if source_id == target_id:
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: source_id e target_id não podem ser iguais"
-                        )
-                    
-                    try:
-                        amount = Decimal(str(amount))
-                    except (ValueError, TypeError):
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: valor inválido '{amount}'"
-                        )
-                    
-                    if amount <= 0:
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: valor deve ser positivo"
-                        )
-                    
-                    if amount > Decimal('999999999.99'):
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: valor muito alto"
-                        )
-                
-                for idx, payment in enumerate(payments_data):
-                    source_id = payment.get('source_id')
-                    target_id = payment.get('target_id')
-                    amount = Decimal(str(payment.get('amount')))
-                    
-                    try:
-                        source = Transaction.objects.select_for_update().get(
-                            id=source_id,
-                            user=request.user
-                        )
-                        target = Transaction.objects.select_for_update().get(
-                            id=target_id,
-                            user=request.user
-                        )
-                    except Transaction.DoesNotExist:
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: transação não encontrada"
-                        )
-                    
-                    validator = PaymentValidator(request.user)
-                    is_valid, errors = validator.validate_payment(source, target, amount)
-                    
-                    if not is_valid:
-                        error_messages = [f"{k}: {v}" for k, v in errors.items()]
-                        raise ValueError(
-                            f"Pagamento #{idx+1}: {'; '.join(error_messages)}"
-                        )
-                    
-                    link = TransactionLink.objects.create(
-                        user=request.user,
-                        source_transaction_uuid=source_id,
-                        target_transaction_uuid=target_id,
-                        linked_amount=amount,
-                        link_type=TransactionLink.LinkType.EXPENSE_PAYMENT,
-                        description=description
-                    )
-                    
-                    created_links.append(link)
-                    total_amount += amount
-                    sources_used.add(str(source_id))
-                    targets_paid.add(str(target_id))
-                    
-                    target.refresh_from_db()
-                    if target.available_amount == 0:
-                        fully_paid_expenses.append(str(target_id))
-                
-                invalidate_user_dashboard_cache(request.user)
+            result = create_bulk_payments(request.user, payments_data, description)
+            invalidate_user_dashboard_cache(request.user, 'links')
             
+            created_links = attach_link_transactions(result['links'])
             serializer = TransactionLinkSerializer(
                 created_links,
                 many=True,
@@ -885,12 +1148,12 @@ class TransactionLinkViewSet(viewsets.ModelViewSet):
             return Response({
                 'success': True,
                 'created_count': len(created_links),
-                'total_amount': float(total_amount),
+                'total_amount': float(result['total_amount']),
                 'links': serializer.data,
                 'summary': {
-                    'sources_used': len(sources_used),
-                    'targets_paid': len(targets_paid),
-                    'fully_paid_expenses': fully_paid_expenses
+                    'sources_used': result['sources_used'],
+                    'targets_paid': result['targets_paid'],
+                    'fully_paid_expenses': result['fully_paid_expenses']
                 }
             }, status=status.HTTP_201_CREATED)
             